@@ -0,0 +1 @@
+# 性能基准测试包
\ No newline at end of file
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+订单簿HTML解析基准（不需要浏览器）
+在保存的订单簿页面快照上检查HTML解析结果与标准答案（即parse_orderbook_from_page的输出）完全一致，
+并比较各解析引擎的单次耗时，以及工作进程池与当前线程解析的吞吐
+
+用法: python -m benchmarks.bench_html_parser [--rounds 500] [--workers 2]
+"""
+
+import argparse
+import time
+
+from benchmarks.replay_server import SNAPSHOT_DIR, load_lighter_snapshots
+from core.html_orderbook_parser import LXML_AVAILABLE, HtmlOrderBookParser, parse_orderbook_html
+from core.orderbook_utils import parse_orderbook_arrays
+
+
+def levels_of(orderbook) -> tuple:
+    """全部档位字段（价格、数量、累计数量、方向），按OrderBook中的顺序"""
+    return tuple((level.price, level.size, level.total_size, level.order_type)
+                 for level in list(orderbook.asks) + list(orderbook.bids))
+
+
+def bench_engine(page_html: str, engine: str, rounds: int) -> float:
+    """返回当前线程中每次解析的平均耗时（微秒）"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        parse_orderbook_html(page_html, engine=engine)
+    return (time.perf_counter() - start) * 1e6 / rounds
+
+
+def bench_pool(pages: list, workers: int, rounds: int) -> float:
+    """返回工作进程池的解析吞吐（次/秒），所有任务同时提交，模拟多个市场并行抓取"""
+    parser = HtmlOrderBookParser(workers=workers)
+    try:
+        # 先让每个工作进程完成启动和导入
+        for future in [parser.submit(pages[0]) for _ in range(workers)]:
+            future.result()
+        start = time.perf_counter()
+        futures = [parser.submit(pages[i % len(pages)]) for i in range(rounds)]
+        for future in futures:
+            future.result()
+        return rounds / (time.perf_counter() - start)
+    finally:
+        parser.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="订单簿HTML解析基准")
+    parser.add_argument('--rounds', type=int, default=500, help="每项的解析次数")
+    parser.add_argument('--workers', type=int, default=2, help="工作进程数")
+    parser.add_argument('--snapshot-dir', default=SNAPSHOT_DIR, help="订单簿页面快照目录")
+    args = parser.parse_args()
+
+    snapshots = load_lighter_snapshots(args.snapshot_dir)
+    engines = ["regex"] + (["lxml"] if LXML_AVAILABLE else [])
+    print(f"=== 订单簿HTML解析基准 ({len(snapshots)}个快照 x {args.rounds}次) ===")
+    if not LXML_AVAILABLE:
+        print("⚠️  lxml未安装，跳过lxml引擎")
+
+    for name, snapshot in snapshots.items():
+        if snapshot["truth"] is None:
+            print(f"{name}: 没有标准答案，跳过一致性检查")
+        else:
+            expected = levels_of(parse_orderbook_arrays(snapshot["truth"]["asks"], snapshot["truth"]["bids"]))
+            for engine in engines:
+                same = levels_of(parse_orderbook_html(snapshot["html"], engine=engine)) == expected
+                print(f"{name} [{engine}] 结果一致性: {'✅ 一致' if same else '❌ 不一致'}")
+
+        for engine in engines:
+            us_per_parse = bench_engine(snapshot["html"], engine, args.rounds)
+            print(f"{name} [{engine}]: {us_per_parse:8.1f} us/次")
+
+    pages = [snapshot["html"] for snapshot in snapshots.values()]
+    start = time.perf_counter()
+    for i in range(args.rounds):
+        parse_orderbook_html(pages[i % len(pages)])
+    inline = args.rounds / (time.perf_counter() - start)
+    pooled = bench_pool(pages, args.workers, args.rounds)
+    print(f"当前线程: {inline:8.0f} 次/秒")
+    print(f"{args.workers}个工作进程: {pooled:8.0f} 次/秒  ({pooled / inline:.2f}x，含进程间传输)")
+
+
+if __name__ == "__main__":
+    main()
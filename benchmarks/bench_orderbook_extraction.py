@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+订单簿抓取基准
+在本地页面夹具（保存的订单簿快照 + 按频率变化的合成页面）上逐个运行各抓取函数，
+统计每秒抓取次数、单次耗时p50/p99和解析准确率，不需要访问网络
+
+准确率: 静态快照与同名.json标准答案比较；合成页面检查抓取结果是否为页面某个时刻真实渲染过的订单簿
+（逐元素抓取期间页面可能已变化，读到新旧混合的档位即计为错误）
+
+用法: python -m benchmarks.bench_orderbook_extraction [--extractors drission-js,selenium-js]
+      [--rates 0,10,100] [--duration 5] [--snapshot-dir 目录] [--headed]
+需要安装DrissionPage和/或selenium（含chromedriver）以及本地Chrome/Chromium
+"""
+
+import argparse
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.replay_server import SNAPSHOT_DIR, lighter_fixture_server, load_lighter_snapshots
+from core.lighter_client import DRISSION_AVAILABLE, build_chromium_options
+from core.lighter_selenium_client import SELENIUM_AVAILABLE, LighterSeleniumClient, build_chrome_options
+from core.orderbook_utils import parse_orderbook_from_page, parse_orderbook_via_js, wait_for_orderbook
+from core.html_orderbook_parser import ORDERBOOK_HTML_JS, get_html_parser, parse_orderbook_via_html
+from data.models import AnyOrderBook
+
+if DRISSION_AVAILABLE:
+    from DrissionPage import ChromiumPage
+if SELENIUM_AVAILABLE:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+# 合成页面上检查指纹是否渲染过（不计入抓取耗时）
+HISTORY_CHECK_JS = "return window.__obHistory ? window.__obHistory.has(arguments[0]) : null;"
+
+
+class DrissionBackend:
+    """DrissionPage浏览器"""
+    name = "drissionpage"
+    available = DRISSION_AVAILABLE
+
+    def __init__(self, headless: bool):
+        options = build_chromium_options(headless)
+        options.auto_port()  # 不占用监控程序正在使用的调试端口
+        self.page = ChromiumPage(options)
+
+    def open(self, url: str):
+        self.page.get(url)
+
+    def run_js(self, script: str, *args) -> Any:
+        return self.page.run_js(script, *args)
+
+    def close(self):
+        self.page.quit()
+
+
+class SeleniumBackend:
+    """Selenium Chrome，抓取函数复用LighterSeleniumClient的解析方法"""
+    name = "selenium"
+    available = SELENIUM_AVAILABLE
+
+    def __init__(self, headless: bool):
+        self.driver = webdriver.Chrome(service=Service(), options=build_chrome_options(headless))
+        self.client = LighterSeleniumClient(None)
+        self.client.driver = self.driver
+
+    def open(self, url: str):
+        self.driver.get(url)
+
+    def run_js(self, script: str, *args) -> Any:
+        return self.driver.execute_script(script, *args)
+
+    def close(self):
+        self.driver.quit()
+
+
+BACKENDS = {backend.name: backend for backend in (DrissionBackend, SeleniumBackend)}
+
+# 抓取函数: 名称 -> (浏览器, 抓取函数(backend) -> 订单簿)；新的抓取方式在这里注册即可参与对比
+EXTRACTORS: Dict[str, Tuple[str, Callable[[Any], Optional[AnyOrderBook]]]] = {
+    "drission-dom": ("drissionpage", lambda backend: parse_orderbook_from_page(backend.page)),
+    "drission-js": ("drissionpage", lambda backend: parse_orderbook_via_js(backend.page)),
+    "drission-html": ("drissionpage", lambda backend: parse_orderbook_via_html(backend.page)),
+    "selenium-dom": ("selenium", lambda backend: backend.client._parse_orderbook()),
+    "selenium-js": ("selenium", lambda backend: backend.client._parse_orderbook_js()),
+    "selenium-html": ("selenium", lambda backend: get_html_parser().parse(backend.run_js(ORDERBOOK_HTML_JS))),
+}
+
+
+def book_fingerprint(asks: List[Tuple[float, float]], bids: List[Tuple[float, float]]) -> str:
+    """订单簿指纹: 卖单从低到高、买单从高到低的 价格:数量，与合成页面的记录格式一致"""
+    def side(levels, reverse):
+        return ",".join(f"{price:.1f}:{size:.4f}" for price, size in sorted(levels, reverse=reverse))
+    return side(asks, False) + "|" + side(bids, True)
+
+
+def orderbook_fingerprint(orderbook: AnyOrderBook) -> str:
+    return book_fingerprint([(level.price, level.size) for level in orderbook.asks],
+                            [(level.price, level.size) for level in orderbook.bids])
+
+
+def truth_fingerprint(truth: Dict[str, List[List[float]]]) -> str:
+    return book_fingerprint([(row[0], row[1]) for row in truth["asks"]],
+                            [(row[0], row[1]) for row in truth["bids"]])
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """最近秩百分位数（输入已排序）"""
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_case(backend, extract: Callable, check: Optional[Callable[[AnyOrderBook], bool]],
+             duration: float, max_scrapes: int) -> Dict[str, Any]:
+    """
+    连续抓取一个页面
+
+    Args:
+        backend: 浏览器
+        extract: 抓取函数
+        check: 判断抓取结果是否正确，None表示没有标准答案
+        duration: 最长运行时间（秒）
+        max_scrapes: 最多抓取次数
+
+    Returns:
+        Dict: 抓取次数、每秒抓取次数（连续抓取的吞吐，不含准确率检查）、p50/p99耗时（毫秒）、准确率
+    """
+    latencies = []
+    correct = 0
+    deadline = time.monotonic() + duration
+    while len(latencies) < max_scrapes and time.monotonic() < deadline:
+        start = time.perf_counter()
+        orderbook = extract(backend)
+        latencies.append(time.perf_counter() - start)
+        if check and orderbook and orderbook.asks and orderbook.bids and check(orderbook):
+            correct += 1
+
+    latencies.sort()
+    return {
+        "scrapes": len(latencies),
+        "per_second": len(latencies) / sum(latencies) if latencies else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000 if latencies else None,
+        "p99_ms": percentile(latencies, 0.99) * 1000 if latencies else None,
+        "accuracy": correct / len(latencies) if check and latencies else None,
+    }
+
+
+def build_pages(server, snapshots: Dict[str, Dict[str, Any]], rates: List[float],
+                depth: int) -> List[Tuple[str, str, Optional[Dict]]]:
+    """页面列表: (名称, URL, 标准答案)；合成页面的标准答案为None，运行时在页面内检查"""
+    pages = [(f"snapshot:{name}", f"{server.http_url}/snapshot/{name}", snapshot["truth"])
+             for name, snapshot in snapshots.items()]
+    for rate in rates:
+        pages.append((f"synthetic:{rate:g}/s", f"{server.http_url}/synthetic?rate={rate:g}&depth={depth}", None))
+    return pages
+
+
+def make_check(backend, page_name: str, truth: Optional[Dict]) -> Optional[Callable[[AnyOrderBook], bool]]:
+    """生成准确率检查函数"""
+    if page_name.startswith("synthetic:"):
+        return lambda orderbook: bool(backend.run_js(HISTORY_CHECK_JS, orderbook_fingerprint(orderbook)))
+    if truth is None:
+        return None
+    expected = truth_fingerprint(truth)
+    return lambda orderbook: orderbook_fingerprint(orderbook) == expected
+
+
+def format_row(extractor: str, page_name: str, result: Dict[str, Any]) -> str:
+    if not result["scrapes"]:
+        return f"{extractor:>14}  {page_name:<36} 未渲染出订单簿"
+    accuracy = "   -" if result["accuracy"] is None else f"{result['accuracy'] * 100:5.1f}%"
+    return (f"{extractor:>14}  {page_name:<36} {result['per_second']:8.1f}/s  "
+            f"p50 {result['p50_ms']:7.2f}ms  p99 {result['p99_ms']:7.2f}ms  准确率 {accuracy}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="订单簿抓取基准（本地页面夹具）")
+    parser.add_argument('--extractors', default=",".join(EXTRACTORS),
+                        help=f"逗号分隔的抓取函数 ({', '.join(EXTRACTORS)})")
+    parser.add_argument('--rates', default="0,10,100", help="合成页面每秒变化次数，逗号分隔")
+    parser.add_argument('--depth', type=int, default=20, help="合成页面每侧档位数")
+    parser.add_argument('--duration', type=float, default=5.0, help="每个页面每种抓取函数的最长运行时间（秒）")
+    parser.add_argument('--max-scrapes', type=int, default=2000, help="每个页面每种抓取函数的最多抓取次数")
+    parser.add_argument('--snapshot-dir', default=SNAPSHOT_DIR, help="订单簿页面快照目录 (<名称>.html + <名称>.json)")
+    parser.add_argument('--ready-timeout', type=float, default=10.0, help="等待页面渲染出订单簿的时间（秒）")
+    parser.add_argument('--headed', action='store_true', help="显示浏览器窗口")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.extractors.split(",") if name.strip()]
+    unknown = [name for name in names if name not in EXTRACTORS]
+    if unknown:
+        parser.error(f"未知的抓取函数: {', '.join(unknown)}")
+
+    # 按浏览器分组，每种浏览器只启动一次
+    groups: Dict[str, List[str]] = {}
+    for name in names:
+        backend_name = EXTRACTORS[name][0]
+        if not BACKENDS[backend_name].available:
+            print(f"⚠️  {backend_name}未安装，跳过 {name}")
+            continue
+        groups.setdefault(backend_name, []).append(name)
+    if not groups:
+        print("❌ 没有可运行的抓取函数")
+        return
+
+    rates = [float(rate) for rate in args.rates.split(",") if rate.strip()]
+    snapshots = load_lighter_snapshots(args.snapshot_dir)
+
+    with lighter_fixture_server(snapshot_dir=args.snapshot_dir) as server:
+        pages = build_pages(server, snapshots, rates, args.depth)
+        print(f"=== 订单簿抓取基准 ({len(pages)}个页面, 每项最长{args.duration:g}秒/{args.max_scrapes}次) ===")
+
+        for backend_name, extractors in groups.items():
+            backend = BACKENDS[backend_name](not args.headed)
+            try:
+                for page_name, url, truth in pages:
+                    backend.open(url)
+                    check = make_check(backend, page_name, truth)
+                    for extractor in extractors:
+                        extract = EXTRACTORS[extractor][1]
+                        if not wait_for_orderbook(backend, args.ready_timeout, parse=extract):
+                            print(format_row(extractor, page_name, {"scrapes": 0}))
+                            continue
+                        result = run_case(backend, extract, check, args.duration, args.max_scrapes)
+                        print(format_row(extractor, page_name, result))
+            finally:
+                backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+订单簿数据结构基准
+比较逐档OrderBookLevel对象的OrderBook与数组存储的CompactOrderBook：保留历史时每份订单簿的内存、
+每次构建新增的内存块数和构建耗时（输入为快照标准答案的JSON，模拟run_js返回结果的反序列化）；
+以及一次发布中各消费者读取买一/卖一/中间价/价差时的Python函数调用数（派生字段为property与构建时预计算的对比）
+
+用法: python -m benchmarks.bench_orderbook_model [--books 2000]
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+
+from benchmarks.replay_server import load_fixture_text
+from core.orderbook_utils import parse_orderbook_arrays
+from data.models import BTCPriceData, LighterData, OrderBook, OrderBookLevel, OrderType
+
+
+def build_level_orderbook(raw_asks, raw_bids) -> OrderBook:
+    """逐档对象的构建方式（改为CompactOrderBook之前的parse_orderbook_arrays）"""
+    asks = [OrderBookLevel(price=row[0], size=row[1], total_size=row[2], order_type=OrderType.ASK)
+            for row in raw_asks if None not in row]
+    bids = [OrderBookLevel(price=row[0], size=row[1], total_size=row[2], order_type=OrderType.BID)
+            for row in raw_bids if None not in row]
+    asks.sort(key=lambda level: level.price)
+    bids.sort(key=lambda level: level.price, reverse=True)
+    return OrderBook(asks=asks, bids=bids)
+
+
+BUILDERS = {
+    "OrderBook": build_level_orderbook,
+    "CompactOrderBook": parse_orderbook_arrays,
+}
+
+
+def measure(build, payload: str, books: int) -> dict:
+    """构建并保留books份订单簿（每份独立反序列化，数值对象不共享）"""
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    inputs = [json.loads(payload) for _ in range(books)]
+    history = [build(raw["asks"], raw["bids"]) for raw in inputs]
+    # 释放输入后只剩订单簿引用的部分（逐档对象引用反序列化出的数值，紧凑结构已复制到数组）
+    del inputs
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sys.getallocatedblocks() - blocks_before
+
+    raw = json.loads(payload)
+    start = time.perf_counter()
+    for _ in range(books):
+        build(raw["asks"], raw["bids"])
+    elapsed = time.perf_counter() - start
+
+    del history
+    return {"bytes": retained / books, "blocks": blocks / books, "us": elapsed * 1e6 / books}
+
+
+@dataclass
+class PropertyOrderBook:
+    """派生字段每次访问都重新计算的订单簿（改为构建时预计算之前的OrderBook）"""
+    asks: List[OrderBookLevel] = field(default_factory=list)
+    bids: List[OrderBookLevel] = field(default_factory=list)
+    timestamp: datetime = field(default_factory=datetime.now)
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        return self.asks[0].price if self.asks else None
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        return self.bids[0].price if self.bids else None
+
+    @property
+    def mid_price(self) -> Optional[float]:
+        if self.best_ask and self.best_bid:
+            return (self.best_ask + self.best_bid) / 2
+        return None
+
+    @property
+    def spread(self) -> Optional[float]:
+        if self.best_ask and self.best_bid:
+            return self.best_ask - self.best_bid
+        return None
+
+
+def publish_update(orderbook):
+    """
+    一次发布后各消费者对同一份订单簿的读取: BTCPriceData.to_dict，
+    以及/api/lighter、WebSocket推送、SQLite记录各读一次 买一/卖一/中间价/价差
+    """
+    BTCPriceData(lighter=LighterData(orderbook=orderbook)).to_dict()
+    for _ in range(3):
+        (orderbook.best_bid, orderbook.best_ask, orderbook.mid_price, orderbook.spread)
+
+
+def count_calls(func, *args) -> int:
+    """func执行期间的Python函数调用次数（不含func本身）"""
+    calls = 0
+
+    def profiler(frame, event, arg):
+        nonlocal calls
+        if event == 'call':
+            calls += 1
+
+    sys.setprofile(profiler)
+    try:
+        func(*args)
+    finally:
+        sys.setprofile(None)
+    return calls - 1
+
+
+def bench_publish(payload: str, rounds: int):
+    """比较三种订单簿在一次发布中的函数调用数和耗时"""
+    raw = json.loads(payload)
+    levels = build_level_orderbook(raw["asks"], raw["bids"])
+    books = {
+        "property": PropertyOrderBook(asks=levels.asks, bids=levels.bids),
+        "OrderBook": levels,
+        "CompactOrderBook": parse_orderbook_arrays(raw["asks"], raw["bids"]),
+    }
+    print(f"--- 一次发布中读取派生字段 ({rounds}次) ---")
+    for name, book in books.items():
+        calls = count_calls(publish_update, book)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            publish_update(book)
+        us = (time.perf_counter() - start) * 1e6 / rounds
+        print(f"{name:>17}: {calls:4d} 次函数调用/发布  {us:6.2f} us/发布")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="订单簿数据结构基准")
+    parser.add_argument('--books', type=int, default=2000, help="保留的订单簿份数")
+    parser.add_argument('--snapshot', default='btc_depth20', help="lighter_snapshots中的快照名称")
+    parser.add_argument('--rounds', type=int, default=20000, help="发布读取的重复次数")
+    args = parser.parse_args()
+
+    payload = load_fixture_text(f"lighter_snapshots/{args.snapshot}.json")
+    levels = sum(len(side) for side in json.loads(payload).values())
+    print(f"=== 订单簿数据结构基准 ({args.snapshot}, {levels}档 x {args.books}份) ===")
+
+    baseline = None
+    for name, build in BUILDERS.items():
+        result = measure(build, payload, args.books)
+        baseline = baseline or result
+        print(f"{name:>17}: {result['bytes']:8.0f} 字节/份 ({baseline['bytes'] / result['bytes']:4.1f}x)  "
+              f"{result['blocks']:6.1f} 内存块/份 ({baseline['blocks'] / result['blocks']:4.1f}x)  "
+              f"构建 {result['us']:6.1f} us/份")
+
+    bench_publish(payload, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
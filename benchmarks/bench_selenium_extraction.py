@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Selenium订单簿抓取基准
+在本地模拟Lighter页面上比较逐个元素查询（'dom'）和单次execute_script（'js'）两种抓取方式的单次耗时
+
+用法: python -m benchmarks.bench_selenium_extraction [--rounds 20] [--headed]
+需要安装selenium和chromedriver
+"""
+
+import argparse
+import time
+
+from benchmarks.replay_server import lighter_server
+from core.lighter_selenium_client import SELENIUM_AVAILABLE, LighterSeleniumClient, build_chrome_options
+
+if SELENIUM_AVAILABLE:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+SCRAPE_MODES = ("dom", "js")
+
+
+def wait_for_book(client: LighterSeleniumClient, timeout: float = 30) -> bool:
+    """等待模拟页面渲染出订单簿"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if client.parse_orderbook():
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def book_levels(orderbook) -> tuple:
+    """(价格, 数量) 排序后的买卖档位，用于比较两种方式的结果"""
+    return (sorted((level.price, level.size) for level in orderbook.asks),
+            sorted((level.price, level.size) for level in orderbook.bids))
+
+
+def bench_mode(client: LighterSeleniumClient, rounds: int) -> tuple:
+    """返回 (每次抓取的平均耗时毫秒, 最后一次的档位数)"""
+    levels = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        orderbook = client.parse_orderbook()
+        levels = len(orderbook.asks) + len(orderbook.bids) if orderbook else 0
+    elapsed = time.perf_counter() - start
+    return elapsed * 1000 / rounds, levels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Selenium订单簿抓取基准")
+    parser.add_argument('--rounds', type=int, default=20, help="每种方式的抓取次数")
+    parser.add_argument('--headed', action='store_true', help="显示浏览器窗口")
+    args = parser.parse_args()
+
+    if not SELENIUM_AVAILABLE:
+        print("❌ Selenium未安装，请运行: pip3 install selenium")
+        return
+
+    # 消息重放完后页面停在最终状态，两种方式读取的是同一份订单簿
+    with lighter_server(frame_interval=0.001) as server:
+        driver = webdriver.Chrome(service=Service(), options=build_chrome_options(not args.headed))
+        try:
+            driver.get(server.http_url + "/")
+            clients = {mode: LighterSeleniumClient(None, scrape_mode=mode) for mode in SCRAPE_MODES}
+            for client in clients.values():
+                client.driver = driver
+
+            if not wait_for_book(clients["js"]):
+                print("❌ 模拟页面未渲染出订单簿")
+                return
+            time.sleep(1)
+
+            js_book = clients["js"].parse_orderbook()
+            dom_book = clients["dom"].parse_orderbook()
+            consistent = bool(js_book and dom_book) and book_levels(js_book) == book_levels(dom_book)
+            print(f"=== Selenium订单簿抓取基准 ({args.rounds}次) ===")
+            print(f"结果一致性: {'✅ 一致' if consistent else '❌ 不一致'}")
+
+            baseline = None
+            for mode in SCRAPE_MODES:
+                ms_per_scrape, levels = bench_mode(clients[mode], args.rounds)
+                baseline = baseline or ms_per_scrape
+                print(f"{mode:>4}: {ms_per_scrape:8.1f} ms/次  {levels}档  ({baseline / ms_per_scrape:.1f}x)")
+        finally:
+            driver.quit()
+
+
+if __name__ == "__main__":
+    main()
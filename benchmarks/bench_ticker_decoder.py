@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ticker解码器微基准
+对录制的币安/Backpack ticker消息比较各解码器的单条耗时
+
+用法: python -m benchmarks.bench_ticker_decoder [--rounds 200]
+"""
+
+import argparse
+import os
+import time
+
+from core.ticker_decoder import ORJSON_AVAILABLE, get_ticker_decoder
+
+FIXTURE_FILE = os.path.join(os.path.dirname(__file__), 'fixtures', 'ticker_frames.jsonl')
+
+
+def load_frames(path: str = FIXTURE_FILE) -> list:
+    """加载录制的WebSocket消息（每行一条）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def bench_decoder(name: str, frames: list, rounds: int) -> float:
+    """返回每条消息的平均解码耗时（纳秒）"""
+    decode = get_ticker_decoder(name).decode
+    start = time.perf_counter_ns()
+    for _ in range(rounds):
+        for frame in frames:
+            decode(frame)
+    elapsed = time.perf_counter_ns() - start
+    return elapsed / (rounds * len(frames))
+
+
+def check_consistency(frames: list, names: list) -> bool:
+    """确认各解码器对每条消息的结果一致"""
+    decoders = [get_ticker_decoder(name) for name in names]
+    for frame in frames:
+        results = {decoder.decode(frame) for decoder in decoders}
+        if len(results) != 1:
+            print(f"❌ 解码结果不一致: {frame[:80]}... -> {results}")
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ticker解码器微基准")
+    parser.add_argument('--rounds', type=int, default=200, help="重复轮数")
+    parser.add_argument('--fixture', default=FIXTURE_FILE, help="录制消息文件")
+    args = parser.parse_args()
+
+    frames = load_frames(args.fixture)
+    names = ["json", "fast"] + (["orjson"] if ORJSON_AVAILABLE else [])
+
+    print(f"=== Ticker解码器微基准 ({len(frames)}条消息 x {args.rounds}轮) ===")
+    if not ORJSON_AVAILABLE:
+        print("⚠️  orjson未安装，跳过orjson解码器")
+
+    consistent = check_consistency(frames, names)
+    print(f"结果一致性: {'✅ 一致' if consistent else '❌ 不一致'}")
+
+    baseline = None
+    for name in names:
+        ns_per_frame = bench_decoder(name, frames, args.rounds)
+        baseline = baseline or ns_per_frame
+        print(f"{name:>8}: {ns_per_frame:8.0f} ns/条  ({baseline / ns_per_frame:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
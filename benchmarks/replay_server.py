@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本地模拟交易所服务器
+HTTP接口返回固定的快照数据，WebSocket按固定间隔重放录制的消息，用于离线验证各客户端
+
+用法: python -m benchmarks.replay_server binance-depth
+      python -m benchmarks.replay_server lighter   # 浏览器客户端可直接打开 http://127.0.0.1:18080/
+      python -m benchmarks.replay_server lighter-fixtures   # /snapshot/<名称> 静态快照, /synthetic?rate=100 合成页面
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    import websockets
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    WEBSOCKETS_AVAILABLE = False
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+SNAPSHOT_DIR = os.path.join(FIXTURE_DIR, 'lighter_snapshots')
+
+
+def load_fixture_json(name: str) -> Any:
+    """读取fixtures目录下的JSON文件"""
+    with open(os.path.join(FIXTURE_DIR, name), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_fixture_frames(name: str) -> List[str]:
+    """读取fixtures目录下的录制消息（每行一条）"""
+    with open(os.path.join(FIXTURE_DIR, name), 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+class ReplayServer:
+    """本地模拟服务器 - HTTP + WebSocket各占一个端口"""
+
+    def __init__(self, http_routes: Optional[Dict[str, Any]] = None, ws_frames: Optional[List[str]] = None,
+                 frame_interval: float = 0.01, ws_handler: Optional[Callable] = None,
+                 host: str = '127.0.0.1', http_port: int = 0, ws_port: int = 0):
+        """
+        初始化模拟服务器
+
+        Args:
+            http_routes: 路径 -> 响应内容 (dict/list返回JSON，str返回HTML，可调用对象按查询参数生成)
+            ws_frames: WebSocket连接建立后依次发送的消息
+            frame_interval: 消息发送间隔（秒）
+            ws_handler: 自定义WebSocket处理协程 (server, websocket)，不传则重放ws_frames
+            host: 监听地址
+            http_port: HTTP端口，0表示自动分配
+            ws_port: WebSocket端口，0表示自动分配
+        """
+        self.http_routes = http_routes or {}
+        self.ws_frames = ws_frames or []
+        self.frame_interval = frame_interval
+        self.ws_handler = ws_handler
+        self.host = host
+        self.http_port = http_port
+        self.ws_port = ws_port
+        self.received: List[str] = []  # WebSocket客户端发来的消息
+
+        self._http_server = None
+        self._ws_loop = None
+        self._ws_thread = None
+        self._ws_stop = None
+
+    @property
+    def http_url(self) -> str:
+        return f"http://{self.host}:{self.http_port}"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://{self.host}:{self.ws_port}"
+
+    def start(self):
+        """启动HTTP和WebSocket服务"""
+        if self.http_routes:
+            self._start_http()
+        if self.ws_frames or self.ws_handler:
+            self._start_ws()
+        return self
+
+    def stop(self):
+        """停止服务"""
+        if self._http_server:
+            self._http_server.shutdown()
+            self._http_server.server_close()
+            self._http_server = None
+        if self._ws_loop:
+            self._ws_loop.call_soon_threadsafe(self._ws_stop.set)
+            self._ws_thread.join(timeout=5)
+            self._ws_loop = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _start_http(self):
+        """启动HTTP服务线程"""
+        routes = self.http_routes
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                body = routes.get(parts.path)
+                if callable(body):
+                    body = body(parts.query)
+                if body is None:
+                    self.send_error(404)
+                    return
+
+                if isinstance(body, str):
+                    payload, content_type = body.encode('utf-8'), 'text/html; charset=utf-8'
+                else:
+                    payload, content_type = json.dumps(body).encode('utf-8'), 'application/json'
+
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._http_server = ThreadingHTTPServer((self.host, self.http_port), Handler)
+        self.http_port = self._http_server.server_address[1]
+        threading.Thread(target=self._http_server.serve_forever, daemon=True).start()
+
+    def _start_ws(self):
+        """启动WebSocket服务线程"""
+        if not WEBSOCKETS_AVAILABLE:
+            raise RuntimeError("websockets未安装，无法启动WebSocket模拟服务")
+
+        ready = threading.Event()
+        self._ws_loop = asyncio.new_event_loop()
+
+        async def serve():
+            self._ws_stop = asyncio.Event()
+            async with websockets.serve(self._handle_ws, self.host, self.ws_port) as server:
+                self.ws_port = list(server.sockets)[0].getsockname()[1]
+                ready.set()
+                await self._ws_stop.wait()
+
+        self._ws_thread = threading.Thread(target=self._ws_loop.run_until_complete, args=(serve(),), daemon=True)
+        self._ws_thread.start()
+        ready.wait(timeout=5)
+
+    async def _handle_ws(self, websocket, path=None):
+        """WebSocket连接处理"""
+        if self.ws_handler:
+            await self.ws_handler(self, websocket)
+            return
+
+        for frame in self.ws_frames:
+            await websocket.send(frame)
+            await asyncio.sleep(self.frame_interval)
+        # 重放结束后保持连接，直到客户端断开
+        async for message in websocket:
+            self.received.append(message)
+
+
+def binance_depth_server(frame_interval: float = 0.01, **kwargs) -> ReplayServer:
+    """币安深度场景: /fapi/v1/depth 快照 + depthUpdate增量"""
+    return ReplayServer(
+        http_routes={'/fapi/v1/depth': load_fixture_json('binance_depth_snapshot.json')},
+        ws_frames=load_fixture_frames('binance_depth_frames.jsonl'),
+        frame_interval=frame_interval,
+        **kwargs
+    )
+
+
+def backpack_depth_server(frame_interval: float = 0.01, **kwargs) -> ReplayServer:
+    """Backpack深度场景: /api/v1/depth 快照 + depth.BTC_USDC_PERP增量"""
+    return ReplayServer(
+        http_routes={'/api/v1/depth': load_fixture_json('backpack_depth_snapshot.json')},
+        ws_frames=load_fixture_frames('backpack_depth_frames.jsonl'),
+        frame_interval=frame_interval,
+        **kwargs
+    )
+
+
+def load_fixture_text(name: str) -> str:
+    """读取fixtures目录下的文本文件"""
+    with open(os.path.join(FIXTURE_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+async def _lighter_stream_handler(server: ReplayServer, websocket):
+    """
+    模拟Lighter /stream: 收到订阅请求后推送全量+增量订单簿，之后记录客户端消息；
+    再次订阅（缺口后重新同步）时重发第一条全量消息
+    """
+    await websocket.send(json.dumps({"type": "connected", "session_id": "replay"}))
+    async for message in websocket:
+        server.received.append(message)
+        if json.loads(message).get('type') == 'subscribe':
+            break
+    else:
+        return
+
+    for frame in server.ws_frames:
+        await websocket.send(frame)
+        await asyncio.sleep(server.frame_interval)
+    async for message in websocket:
+        server.received.append(message)
+        if json.loads(message).get('type') == 'subscribe' and server.ws_frames:
+            await websocket.send(server.ws_frames[0])
+
+
+def lighter_server(frame_interval: float = 0.01, market_id: int = 1, **kwargs) -> ReplayServer:
+    """Lighter场景: / 为模拟交易页面（订单簿DOM结构与真实页面一致），/stream 推送order_book频道消息"""
+    page_template = load_fixture_text('lighter_standin.html')
+    server = ReplayServer(
+        ws_frames=load_fixture_frames('lighter_ws_frames.jsonl'),
+        frame_interval=frame_interval,
+        ws_handler=_lighter_stream_handler,
+        **kwargs
+    )
+    # 页面在请求时才填入WebSocket地址（端口在启动后才确定）
+    server.http_routes['/'] = lambda query: (page_template.replace('{ws_url}', f"{server.ws_url}/stream")
+                                             .replace('{market_id}', str(market_id)))
+    return server
+
+
+def load_lighter_snapshots(snapshot_dir: str = SNAPSHOT_DIR) -> Dict[str, Dict[str, Any]]:
+    """
+    读取订单簿页面快照: <名称>.html 为保存的页面，同名.json为标准答案 {"asks": [[价格, 数量, 累计], ...], "bids": [...]}
+
+    Returns:
+        Dict: 名称 -> {"html": 页面, "truth": 标准答案（没有.json时为None）}
+    """
+    snapshots = {}
+    for filename in sorted(os.listdir(snapshot_dir)):
+        name, ext = os.path.splitext(filename)
+        if ext != '.html':
+            continue
+        with open(os.path.join(snapshot_dir, filename), 'r', encoding='utf-8') as f:
+            html = f.read()
+        truth_path = os.path.join(snapshot_dir, name + '.json')
+        truth = None
+        if os.path.exists(truth_path):
+            with open(truth_path, 'r', encoding='utf-8') as f:
+                truth = json.load(f)
+        snapshots[name] = {"html": html, "truth": truth}
+    return snapshots
+
+
+def synthetic_page(query: str, template: Optional[str] = None) -> str:
+    """
+    按查询参数生成合成订单簿页面
+
+    查询参数: rate 每秒变化次数(0为静态), depth 每侧档位数, seed 随机种子, mid 初始中间价, history 保留的历史状态数
+    """
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    page = template or load_fixture_text('lighter_synthetic.html')
+    for key, default, convert in (('rate', 10, float), ('depth', 20, int), ('seed', 1, int),
+                                  ('mid', 60000.0, float), ('history', 5000, int)):
+        page = page.replace('{%s}' % key, str(convert(params.get(key, default))))
+    return page
+
+
+def lighter_fixture_server(snapshot_dir: str = SNAPSHOT_DIR, **kwargs) -> ReplayServer:
+    """Lighter页面夹具（无需网络和WebSocket）: /snapshot/<名称> 返回保存的页面快照，/synthetic 返回按频率变化的合成页面"""
+    template = load_fixture_text('lighter_synthetic.html')
+    routes: Dict[str, Any] = {'/synthetic': lambda query: synthetic_page(query, template)}
+    for name, snapshot in load_lighter_snapshots(snapshot_dir).items():
+        routes[f'/snapshot/{name}'] = snapshot["html"]
+    return ReplayServer(http_routes=routes, **kwargs)
+
+
+SCENARIOS = {
+    'binance-depth': binance_depth_server,
+    'backpack-depth': backpack_depth_server,
+    'lighter': lighter_server,
+    'lighter-fixtures': lighter_fixture_server,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟交易所服务器")
+    parser.add_argument('scenario', choices=sorted(SCENARIOS), help="模拟场景")
+    parser.add_argument('--http-port', type=int, default=18080, help="HTTP端口")
+    parser.add_argument('--ws-port', type=int, default=18081, help="WebSocket端口")
+    parser.add_argument('--interval', type=float, default=0.1, help="消息重放间隔（秒）")
+    args = parser.parse_args()
+
+    server = SCENARIOS[args.scenario](frame_interval=args.interval,
+                                      http_port=args.http_port, ws_port=args.ws_port)
+    server.start()
+    print(f"✅ 模拟服务器已启动 ({args.scenario})")
+    print(f"   HTTP: {server.http_url}")
+    print(f"   WebSocket: {server.ws_url}")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\n停止模拟服务器...")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ BTC价格监控程序
 import time
 import threading
 import json
+from dataclasses import replace
 from datetime import datetime
 from typing import Dict, Any, Optional
 from flask import Flask, jsonify, request
@@ -16,9 +17,16 @@ import pytz
 from data.models import BTCPriceData, BinanceData, BackpackData, LighterData
 from core.binance_client import BinanceClient
 from core.backpack_client import BackpackClient
+from core.binance_depth_client import BinanceDepthClient
+from core.backpack_depth_client import BackpackDepthClient
+from core.async_engine import AsyncIngestionEngine
+from core.update_bus import ConflatingUpdateBus
+from core.logger import setup_logging, shutdown_logging
 from core.lighter_manager import create_lighter_client
 from core.sqlite_price_recorder import SQLitePriceRecorder
-from config import PAGE_REFRESH_INTERVAL
+from core.resource_sampler import ResourceSampler
+from config import (PAGE_REFRESH_INTERVAL, BUS_SNAPSHOT_INTERVAL, BUS_RECORDER_INTERVAL, BINANCE_DEPTH_ENABLED,
+                    BACKPACK_DEPTH_ENABLED, LIGHTER_STANDBY_TYPE, RESOURCE_SAMPLE_INTERVAL)
 
 def get_china_time():
     """获取中国时间"""
@@ -35,11 +43,15 @@ class BTCPriceMonitor:
         Args:
             headless: 是否使用无头模式运行浏览器
         """
+        # 不可变价格快照：写入方生成新版本后整体替换引用，读取方无需加锁
         self.price_data = BTCPriceData()
         self.headless = headless
         self.clients = {}
         self.running = False
-        self.data_lock = threading.Lock()  # 数据锁，防止并发访问冲突
+        self.data_lock = threading.Lock()  # 写入锁，只用于串行化快照的生成
+
+        # 异步采集引擎：所有交易所WebSocket共享一个事件循环线程
+        self.engine = AsyncIngestionEngine(name="exchange-ingest")
         
         # 初始化API服务器和WebSocket
         self.app = Flask(__name__)
@@ -60,13 +72,20 @@ class BTCPriceMonitor:
         # 初始化SQLite价格记录器
         self.price_recorder = SQLitePriceRecorder("btc_price_data.db")
 
+        # 浏览器进程树资源采样（Lighter客户端启动后开始）
+        self.resource_sampler = None
+
+        # 合并更新总线：交易所回调只发布最新数据，快照和记录器各自按节奏取数
+        self.bus = ConflatingUpdateBus()
+        self.bus.subscribe('snapshot', self._apply_snapshot_update, BUS_SNAPSHOT_INTERVAL)
+        self.bus.subscribe('recorder', self._apply_recorder_update, BUS_RECORDER_INTERVAL)
+
 
     def setup_routes(self):
         """设置API路由"""
         @self.app.route('/api/btc-price', methods=['GET'])
         def get_btc_price():
-            with self.data_lock:
-                return jsonify(self.price_data.to_dict())
+            return jsonify(self.price_data.to_dict())
 
         @self.app.route('/api/btc-price/history', methods=['GET'])
         def get_btc_price_history():
@@ -141,22 +160,42 @@ class BTCPriceMonitor:
         @self.app.route('/api/lighter', methods=['GET'])
         def get_lighter_data():
             """获取当前Lighter数据"""
-            with self.data_lock:
-                if self.price_data.lighter and self.price_data.lighter.orderbook:
-                    return jsonify({
-                        'best_bid': self.price_data.lighter.orderbook.best_bid,
-                        'best_ask': self.price_data.lighter.orderbook.best_ask,
-                        'mid_price': self.price_data.lighter.orderbook.mid_price,
-                        'spread': self.price_data.lighter.orderbook.spread,
-                        'connected': self.price_data.lighter.connected,
-                        'timestamp': get_china_time().strftime("%Y-%m-%d %H:%M:%S")
-                    })
-                else:
-                    return jsonify({
-                        'error': 'No Lighter data available',
-                        'connected': False,
-                        'timestamp': get_china_time().strftime("%Y-%m-%d %H:%M:%S")
-                    })
+            lighter = self.price_data.lighter
+            if lighter and lighter.orderbook:
+                return jsonify({
+                    'best_bid': lighter.orderbook.best_bid,
+                    'best_ask': lighter.orderbook.best_ask,
+                    'mid_price': lighter.orderbook.mid_price,
+                    'spread': lighter.orderbook.spread,
+                    'connected': lighter.connected,
+                    'timestamp': get_china_time().strftime("%Y-%m-%d %H:%M:%S")
+                })
+            else:
+                return jsonify({
+                    'error': 'No Lighter data available',
+                    'connected': False,
+                    'timestamp': get_china_time().strftime("%Y-%m-%d %H:%M:%S")
+                })
+
+        @self.app.route('/api/feeds', methods=['GET'])
+        def get_feed_stats():
+            """获取各交易所WebSocket连接状态和重连统计"""
+            lighter = self.clients.get('lighter')
+            return jsonify({
+                'feeds': self.engine.supervisor.get_stats(),
+                'bus': self.bus.get_stats(),
+                'lighter': lighter.get_feed_stats() if lighter else {},
+                'timestamp': get_china_time().strftime("%Y-%m-%d %H:%M:%S")
+            })
+
+        @self.app.route('/api/resources', methods=['GET'])
+        def get_resource_stats():
+            """获取抓取浏览器进程树的内存和CPU占用"""
+            return jsonify({
+                'browsers': self.resource_sampler.get_stats() if self.resource_sampler else {},
+                'interval': RESOURCE_SAMPLE_INTERVAL,
+                'timestamp': get_china_time().strftime("%Y-%m-%d %H:%M:%S")
+            })
 
         @self.app.route('/api/history', methods=['GET'])
         def get_price_history():
@@ -237,12 +276,24 @@ class BTCPriceMonitor:
         """启动所有价格监控"""
         print("🚀 启动BTC价格监控...")
         self.running = True
+
+        # 启动更新总线消费者和异步采集引擎
+        self.bus.start()
+        self.engine.start()
         
         # 启动币安客户端
         self._start_binance_client()
+
+        # 启动币安深度订单簿（可选）
+        if BINANCE_DEPTH_ENABLED:
+            self._start_binance_depth_client()
         
         # 启动Backpack客户端
         self._start_backpack_client()
+
+        # 启动Backpack深度订单簿（可选，复用Backpack连接）
+        if BACKPACK_DEPTH_ENABLED:
+            self._start_backpack_depth_client()
         
         # 启动Lighter客户端
         self._start_lighter_client()
@@ -266,6 +317,13 @@ class BTCPriceMonitor:
                 client.stop()
                 print(f"已停止{name}客户端")
 
+        if self.resource_sampler:
+            self.resource_sampler.stop()
+
+        # 停止异步采集引擎和更新总线
+        self.engine.stop()
+        self.bus.stop()
+
         # 停止价格记录器
         if hasattr(self, 'price_recorder'):
             self.price_recorder.stop()
@@ -276,7 +334,7 @@ class BTCPriceMonitor:
         """启动币安客户端"""
         try:
             binance_client = BinanceClient(self._on_binance_data)
-            if binance_client.start():
+            if binance_client.start(self.engine):
                 self.clients['binance'] = binance_client
                 return True
             return False
@@ -284,11 +342,23 @@ class BTCPriceMonitor:
             print(f"启动币安客户端失败: {e}")
             return False
     
+    def _start_binance_depth_client(self):
+        """启动币安深度订单簿客户端"""
+        try:
+            depth_client = BinanceDepthClient(self._on_binance_depth)
+            if depth_client.start(self.engine):
+                self.clients['binance_depth'] = depth_client
+                return True
+            return False
+        except Exception as e:
+            print(f"启动币安深度客户端失败: {e}")
+            return False
+    
     def _start_backpack_client(self):
         """启动Backpack客户端"""
         try:
             backpack_client = BackpackClient(self._on_backpack_data)
-            if backpack_client.start():
+            if backpack_client.start(self.engine):
                 self.clients['backpack'] = backpack_client
                 return True
             return False
@@ -296,24 +366,45 @@ class BTCPriceMonitor:
             print(f"启动Backpack客户端失败: {e}")
             return False
     
+    def _start_backpack_depth_client(self):
+        """启动Backpack深度订单簿"""
+        backpack_client = self.clients.get('backpack')
+        if not backpack_client:
+            return False
+        try:
+            depth_client = BackpackDepthClient(backpack_client, self._on_backpack_depth)
+            if depth_client.start():
+                self.clients['backpack_depth'] = depth_client
+                return True
+            return False
+        except Exception as e:
+            print(f"启动Backpack深度订单簿失败: {e}")
+            return False
+    
     def _start_lighter_client(self):
         """启动Lighter客户端"""
         try:
             # 检查环境变量，允许强制使用特定客户端
             import os
             force_type = os.getenv('LIGHTER_CLIENT_TYPE', '').lower()
+            standby_type = os.getenv('LIGHTER_STANDBY_TYPE', LIGHTER_STANDBY_TYPE).lower()
 
             if force_type:
                 print(f"🔧 环境变量指定使用: {force_type}")
-                lighter_client = create_lighter_client(self._on_lighter_data, headless=self.headless, force_type=force_type, refresh_interval=PAGE_REFRESH_INTERVAL)
+                lighter_client = create_lighter_client(self._on_lighter_data, headless=self.headless, force_type=force_type,
+                                                       refresh_interval=PAGE_REFRESH_INTERVAL, standby_type=standby_type)
             else:
                 # 使用智能客户端管理器，自动选择最适合的实现
-                lighter_client = create_lighter_client(self._on_lighter_data, headless=self.headless, refresh_interval=PAGE_REFRESH_INTERVAL)
+                lighter_client = create_lighter_client(self._on_lighter_data, headless=self.headless,
+                                                       refresh_interval=PAGE_REFRESH_INTERVAL, standby_type=standby_type)
 
             print(f"🔧 使用{lighter_client.get_client_type()}客户端")
 
-            if lighter_client.start():
+            if lighter_client.start(engine=self.engine):
                 self.clients['lighter'] = lighter_client
+                if lighter_client.get_browser_pids():
+                    self.resource_sampler = ResourceSampler(lighter_client.get_browser_pids)
+                    self.resource_sampler.start()
                 return True
             return False
         except Exception as e:
@@ -335,40 +426,56 @@ class BTCPriceMonitor:
         print("   ⚡ Lighter接口: http://localhost:8080/api/lighter")
     
     def _on_binance_data(self, data: BinanceData):
-        """币安数据回调"""
-        with self.data_lock:
-            self.price_data.binance = data
-            self.price_data.timestamp = get_china_time()
-            # 更新价格记录器
-            self.price_recorder.update_binance_data(data)
+        """
+        币安数据回调（交易所线程中执行，只发布到总线）
+
+        客户端会原地修改自己的数据对象，在写入数据的同一线程中复制一份再发布，
+        消费者线程读到的价格和时间戳来自同一次更新（各回调相同）
+        """
+        self.bus.publish('binance', replace(data))
+    
+    def _on_binance_depth(self, orderbook):
+        """币安深度订单簿回调：挂到币安数据上，和ticker合并发布"""
+        binance_client = self.clients.get('binance')
+        if binance_client:
+            binance_client.data.orderbook = orderbook
+            self.bus.publish('binance', replace(binance_client.data))
     
     def _on_backpack_data(self, data: BackpackData):
-        """Backpack数据回调"""
-        with self.data_lock:
-            self.price_data.backpack = data
-            self.price_data.timestamp = get_china_time()
-            # 更新价格记录器
-            self.price_recorder.update_backpack_data(data)
+        """Backpack数据回调（交易所线程中执行，只发布到总线）"""
+        self.bus.publish('backpack', replace(data))
+    
+    def _on_backpack_depth(self, orderbook):
+        """Backpack深度订单簿回调：挂到Backpack数据上，和ticker合并发布"""
+        backpack_client = self.clients.get('backpack')
+        if backpack_client:
+            backpack_client.data.orderbook = orderbook
+            self.bus.publish('backpack', replace(backpack_client.data))
     
     def _on_lighter_data(self, data: LighterData):
-        """Lighter数据回调"""
+        """Lighter数据回调（抓取线程中执行，只发布到总线）"""
+        self.bus.publish('lighter', replace(data))
+
+    def _apply_snapshot_update(self, feed: str, data):
+        """总线消费者：生成新的价格快照并原子替换"""
         with self.data_lock:
-            self.price_data.lighter = data
-            self.price_data.timestamp = get_china_time()
-            # 更新价格记录器
-            self.price_recorder.update_lighter_data(data)
+            self.price_data = self.price_data.with_update(get_china_time(), **{feed: data})
 
+    def _apply_recorder_update(self, feed: str, data):
+        """总线消费者：更新价格记录器"""
+        getattr(self.price_recorder, f'update_{feed}_data')(data)
 
-    
     def get_current_data(self) -> Dict[str, Any]:
         """获取当前价格数据"""
-        with self.data_lock:
-            return self.price_data.to_dict()
+        return self.price_data.to_dict()
 
 # 主程序入口
 def main():
     """主程序入口"""
     print("=== BTC价格监控程序 ===\n")
+
+    # 初始化异步日志，行情日志由独立线程输出
+    setup_logging()
     
     # 创建监控器实例
     monitor = BTCPriceMonitor(headless=True)  # 默认使用无头模式
@@ -389,6 +496,7 @@ def main():
     finally:
         # 确保停止所有客户端
         monitor.stop()
+        shutdown_logging()
         print("程序已退出")
 
 if __name__ == "__main__":
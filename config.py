@@ -42,13 +42,62 @@ PRICE_RECORD_INTERVAL = 10  # 秒
 BINANCE_WS_URL = 'wss://fstream.binance.com/ws/btcusdc@ticker'
 BACKPACK_WS_URL = 'wss://ws.backpack.exchange'
 
+# 深度订单簿配置
+ORDERBOOK_DEPTH = 20            # 本地订单簿输出的每侧档位数
+BINANCE_DEPTH_ENABLED = False   # 是否同步币安深度订单簿（提供买一/卖一/中间价）
+BACKPACK_DEPTH_ENABLED = False  # 是否同步Backpack深度订单簿（与Lighter按中间价比较）
+
+# Ticker消息解码器: 'fast'（只提取所需字段）, 'orjson', 'json'
+TICKER_DECODER = 'fast'
+
 # Lighter配置
 LIGHTER_URL = 'https://app.lighter.xyz/trade/BTC?locale=zh'
 LIGHTER_HEADLESS = True  # 默认使用无头模式
+LIGHTER_WS_URL = 'wss://mainnet.zklighter.elliot.ai/stream'  # 原生客户端订阅的公开WebSocket
+
+# Lighter多市场标签页池：一个浏览器进程，每个市场一个标签页
+LIGHTER_MARKET_URL = 'https://app.lighter.xyz/trade/{symbol}?locale=zh'
+LIGHTER_MARKETS = ['BTC', 'ETH', 'SOL']
+
+# Lighter热备: 备用客户端类型 ('drissionpage'/'selenium'/'native')，为空不启用；也可用环境变量LIGHTER_STANDBY_TYPE指定
+LIGHTER_STANDBY_TYPE = ''
+LIGHTER_STALE_TIMEOUT = 1.0      # 当前数据源超过该时间（秒）无新订单簿且另一方有新数据时切换
+LIGHTER_WATCHDOG_INTERVAL = 0.2  # 停滞检测间隔（秒）
 
 # 浏览器配置
-BROWSER_WAIT_TIME = 10  # 页面加载等待时间（秒）
-SCRAPE_INTERVAL = 1     # 数据抓取间隔（秒）
+BROWSER_WAIT_TIME = 30  # 页面就绪最长等待时间（秒），订单簿出现即开始抓取
+READY_POLL_INTERVAL = 0.2  # 等待页面就绪时的轮询间隔（秒）
+SCRAPE_INTERVAL = 0.2   # 数据抓取间隔（秒）
+
+# Lighter订单簿抓取方式: 'js'（单次run_js返回全部档位）, 'dom'（逐个元素查询）,
+# 'observer'（页面内MutationObserver推送变化，观察器丢失时退回'js'轮询）,
+# 'network'（通过CDP监听页面自身收到的订单簿WebSocket消息，全精度，消息中断时退回'js'轮询）,
+# 'html'（单次run_js取回订单簿容器HTML，在工作进程中解析；多市场标签页池也支持）
+LIGHTER_SCRAPE_MODE = 'js'
+LIGHTER_OBSERVER_TIMEOUT = 5    # observer模式单次长轮询的最长等待（秒）
+LIGHTER_MARKET_ID = 1           # network模式监听的订单簿市场ID（BTC）
+LIGHTER_NETWORK_STALE_TIME = 5  # network模式超过该时间（秒）未收到订单簿消息时退回DOM抓取
+
+# HTML快照解析 (LIGHTER_SCRAPE_MODE='html')
+HTML_PARSER_WORKERS = 2       # 工作进程数，0为在抓取线程中解析
+HTML_PARSER_ENGINE = 'auto'   # 'regex'、'lxml'，'auto'为已安装lxml时使用lxml
+HTML_PARSER_TIMEOUT = 2       # 等待工作进程解析结果的最长时间（秒）
+
+# 抓取浏览器资源预算: 拦截与订单簿无关的请求，隐藏K线图表等面板（只影响渲染，不影响订单簿DOM读取）
+LIGHTER_RESOURCE_BUDGET = True
+LIGHTER_BLOCKED_URLS = [
+    '*.woff', '*.woff2', '*.ttf', '*.otf',                          # 字体
+    '*google-analytics.com*', '*googletagmanager.com*', '*segment.io*',
+    '*mixpanel.com*', '*sentry.io*', '*hotjar*',                    # 统计/埋点
+    '*charting_library*', '*tradingview*',                          # K线图表库
+]
+LIGHTER_BLOCKED_RESOURCE_TYPES = ['Font', 'Media']  # 按CDP资源类型拦截（图片已由no_imgs禁用）
+LIGHTER_HIDDEN_SELECTORS = ['iframe', 'canvas']     # 隐藏的面板（图表iframe和canvas绘图）
+RESOURCE_SAMPLE_INTERVAL = 5  # 浏览器进程树内存/CPU采样间隔（秒）
+
+# Selenium备选客户端: 'js'（单次execute_script返回全部档位）, 'dom'（逐个元素查询，每档位多次WebDriver往返）
+SELENIUM_SCRAPE_MODE = 'js'
+SELENIUM_SCRAPE_INTERVAL = 1.0  # Selenium抓取间隔（秒）
 
 def get_chrome_path():
     """
@@ -88,11 +137,28 @@ def validate_config():
     
     return True, "配置验证通过"
 
+# 更新总线消费者两次处理之间的最小间隔（秒），0表示发布后立即处理
+BUS_SNAPSHOT_INTERVAL = 0     # API价格快照
+BUS_RECORDER_INTERVAL = 1     # 价格记录器（期间的更新合并为一次）
+BUS_PUSH_INTERVAL = 0         # WebSocket推送
+
+# 日志配置
+LOG_LEVEL = 'INFO'             # 日志级别
+LOG_QUEUE_SIZE = 10000         # 异步日志队列容量，满时丢弃
+LOG_RATE_LIMIT_INTERVAL = 10   # 同一限流键的最小输出间隔（秒）
+
 # 调试模式
 DEBUG = False
 
-# 页面刷新间隔（秒），默认5分钟
-PAGE_REFRESH_INTERVAL = 300
+# 页面最长存活时间（秒），超过后即使资源未超预算也回收（兜底），默认1小时
+PAGE_REFRESH_INTERVAL = 3600
+
+# 标签页资源预算：按实测指标回收页面，任一项超出即回收（0表示不检查该项）
+TAB_MAX_JS_HEAP_MB = 512        # JS堆占用（CDP Performance.getMetrics）
+TAB_MAX_DOM_NODES = 50000       # DOM节点数
+TAB_MAX_RSS_MB = 1500           # 浏览器进程树内存（单页面客户端）
+TAB_MAX_LATENCY_DRIFT = 3.0     # 近期抓取耗时超过回收后基线的倍数
+TAB_METRICS_INTERVAL = 15       # 指标采样间隔（秒）
 
 # 数据库保存间隔（秒），默认1分钟
 DATABASE_SAVE_INTERVAL = 60
@@ -102,6 +168,12 @@ MAX_RECONNECT_ATTEMPTS = 3  # 最大重连尝试次数
 RECONNECT_DELAY = 10  # 重连延迟（秒）
 CONNECTION_CHECK_INTERVAL = 30  # 连接检查间隔（秒）
 
+# WebSocket重连监督配置（抖动指数退避）
+RECONNECT_BASE_DELAY = 1  # 退避基础延迟（秒）
+RECONNECT_MAX_DELAY = 60  # 退避最大延迟（秒）
+MAX_CONCURRENT_RECONNECTS = 4  # 同时进行的重连尝试上限
+STABLE_CONNECTION_TIME = 30  # 连接持续超过该时长视为稳定（秒）
+
 if __name__ == "__main__":
     print("=== BTC价格监控系统配置 ===")
     print(f"操作系统: {platform.system()}")
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+异步采集引擎
+单个asyncio事件循环统一管理所有交易所WebSocket连接
+"""
+
+import asyncio
+import json
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from core.reconnect_supervisor import ReconnectSupervisor
+
+try:
+    import websockets
+    from websockets.exceptions import ConnectionClosed
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    WEBSOCKETS_AVAILABLE = False
+
+
+class AsyncIngestionEngine:
+    """异步采集引擎 - 所有连接器共享一个后台事件循环线程"""
+
+    def __init__(self, name: str = "ingest"):
+        """
+        初始化采集引擎
+
+        Args:
+            name: 事件循环线程名称
+        """
+        self.name = name
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread = None
+        self.running = False
+        self.connectors: List["WebSocketConnector"] = []
+        self.supervisor = ReconnectSupervisor()
+        self._futures = {}
+        self._ready = threading.Event()
+
+    def start(self) -> bool:
+        """启动事件循环线程"""
+        if self.running:
+            return True
+
+        self.loop = asyncio.new_event_loop()
+        self.running = True
+        self._ready.clear()
+
+        self.loop_thread = threading.Thread(target=self._run_loop, name=self.name, daemon=True)
+        self.loop_thread.start()
+        self._ready.wait(timeout=5)
+
+        print(f"✅ 异步采集引擎已启动 (线程: {self.name})")
+        return True
+
+    def _run_loop(self):
+        """事件循环线程入口"""
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._ready.set)
+        try:
+            self.loop.run_forever()
+        finally:
+            # 取消残留任务，保证连接正常关闭
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.close()
+
+    def stop(self):
+        """停止所有连接器和事件循环"""
+        if not self.running:
+            return
+
+        for connector in list(self.connectors):
+            connector.running = False
+
+        for future in list(self._futures.values()):
+            future.cancel()
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.loop_thread:
+            self.loop_thread.join(timeout=5)
+
+        self.running = False
+        self.connectors.clear()
+        self._futures.clear()
+        print("✅ 异步采集引擎已停止")
+
+    def add_connector(self, connector: "WebSocketConnector"):
+        """
+        注册连接器并在事件循环中运行
+
+        Args:
+            connector: WebSocket连接器
+        """
+        if not self.running:
+            self.start()
+
+        self.connectors.append(connector)
+        future = self.submit(connector.run())
+        self._futures[id(connector)] = future
+        return future
+
+    def remove_connector(self, connector: "WebSocketConnector"):
+        """移除连接器并取消其任务"""
+        future = self._futures.pop(id(connector), None)
+        if future:
+            future.cancel()
+        if connector in self.connectors:
+            self.connectors.remove(connector)
+
+    def submit(self, coro):
+        """从任意线程向事件循环提交协程"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call_soon(self, callback, *args):
+        """从任意线程在事件循环中调度回调"""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+
+_default_engine: Optional[AsyncIngestionEngine] = None
+_default_engine_lock = threading.Lock()
+
+
+def get_default_engine() -> AsyncIngestionEngine:
+    """获取进程内共享的默认采集引擎（按需启动）"""
+    global _default_engine
+    with _default_engine_lock:
+        if _default_engine is None:
+            _default_engine = AsyncIngestionEngine()
+        if not _default_engine.running:
+            _default_engine.start()
+        return _default_engine
+
+
+class WebSocketConnector(ABC):
+    """WebSocket连接器基类 - 协程方式运行在采集引擎中，子类实现_on_message处理消息"""
+
+    # 日志中显示的交易所名称
+    exchange_name = "WebSocket"
+    # 重连统计中的数据源名称
+    feed_name = "websocket"
+
+    def __init__(self, ws_url: str, feed_name: Optional[str] = None):
+        """
+        初始化连接器
+
+        Args:
+            ws_url: WebSocket地址
+            feed_name: 重连统计中的数据源名称，不传使用类的feed_name；
+                       同名的多个连接器由重连监督器追加序号区分
+        """
+        if feed_name:
+            self.feed_name = feed_name
+        self.feed_key: Optional[str] = None  # 重连监督器中实际使用的统计名称
+        self.ws_url = ws_url
+        self.ws = None
+        self.running = False
+        self.engine: Optional[AsyncIngestionEngine] = None
+        self._wakeup: Optional[asyncio.Event] = None  # 没有订阅内容时等待的事件，由wake_up()设置
+
+    def start(self, engine: Optional[AsyncIngestionEngine] = None) -> bool:
+        """
+        在采集引擎中启动连接
+
+        Args:
+            engine: 采集引擎，不传则使用默认共享引擎
+        """
+        if not WEBSOCKETS_AVAILABLE:
+            print(f"❌ websockets未安装，无法启动{self.exchange_name}连接")
+            return False
+
+        try:
+            self.engine = engine or get_default_engine()
+            self.running = True
+            self.engine.add_connector(self)
+            return True
+        except Exception as e:
+            print(f"❌ {self.exchange_name} WebSocket连接失败: {e}")
+            self.running = False
+            return False
+
+    def stop(self):
+        """停止连接"""
+        self.running = False
+        if self.engine:
+            self.engine.remove_connector(self)
+
+    def _build_url(self) -> Optional[str]:
+        """每次连接前生成WebSocket地址，返回None表示当前没有需要订阅的内容，暂不连接"""
+        return self.ws_url
+
+    def wake_up(self):
+        """从任意线程唤醒因没有订阅内容而等待的连接循环（订阅内容变化后调用）"""
+        if self.engine is not None and self._wakeup is not None:
+            self.engine.call_soon(self._wakeup.set)
+
+    async def run(self):
+        """连接主循环：连接、接收消息，断线后由重连监督器决定等待时间"""
+        supervisor = self.engine.supervisor
+        self.feed_key = supervisor.register(self.feed_name, owner=self).name
+
+        self._wakeup = asyncio.Event()
+
+        while self.running:
+            url = self._build_url()
+            if url is None:
+                print(f"⏸️  {self.exchange_name}当前没有订阅内容，暂不连接")
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            close_code, close_msg = None, None
+            ws = None
+            try:
+                # 限制同时进行的握手数量，连接建立后立即释放名额
+                async with supervisor.attempt():
+                    ws = await websockets.connect(url, ping_interval=20, ping_timeout=20, close_timeout=5)
+                self.ws = ws
+                supervisor.on_connected(self.feed_key)
+                await self._on_open(ws)
+                async for message in ws:
+                    self._on_message(ws, message)
+                close_code, close_msg = ws.close_code, ws.close_reason
+            except asyncio.CancelledError:
+                raise
+            except ConnectionClosed as e:
+                close_code, close_msg = _close_info(e)
+            except Exception as e:
+                self._on_error(ws, e)
+            finally:
+                self.ws = None
+                if ws is not None:
+                    await ws.close()
+
+            self._on_close(None, close_code, close_msg)
+            delay = supervisor.on_disconnected(self.feed_key, close_code)
+
+            if self.running:
+                print(f"🔄 {delay:.1f}秒后重新连接{self.exchange_name} WebSocket...")
+                await asyncio.sleep(delay)
+
+    def send_json(self, payload: Dict[str, Any]) -> bool:
+        """从任意线程发送JSON消息"""
+        ws = self.ws
+        if ws is None or self.engine is None:
+            return False
+        self.engine.submit(ws.send(json.dumps(payload)))
+        return True
+
+    async def _on_open(self, ws):
+        """连接建立回调"""
+
+    @abstractmethod
+    def _on_message(self, ws, message):
+        """消息回调（在采集引擎的事件循环中执行）"""
+
+    def _on_error(self, ws, error):
+        """错误回调"""
+        print(f"❌ {self.exchange_name} WebSocket错误: {error}")
+
+    def _on_close(self, ws, close_status_code, close_msg):
+        """连接关闭回调"""
+        print(f"🔌 {self.exchange_name} WebSocket连接已关闭: {close_status_code} - {close_msg}")
+
+
+def _close_info(exc) -> tuple:
+    """从ConnectionClosed异常中提取关闭码和原因"""
+    rcvd = getattr(exc, 'rcvd', None)
+    if rcvd is not None:
+        return rcvd.code, rcvd.reason
+    return getattr(exc, 'code', None), getattr(exc, 'reason', None)
@@ -4,121 +4,213 @@ Backpack数据客户端
 """
 
 import json
-import threading
-import websocket
 from datetime import datetime
-from typing import Callable, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 from data.models import BackpackData
+from core.async_engine import AsyncIngestionEngine, WebSocketConnector
+from core.ticker_decoder import TickerFields, get_ticker_decoder
+from core.logger import get_logger, log_extra
+from config import BACKPACK_WS_URL
 
-class BackpackClient:
-    """Backpack数据客户端 - 使用WebSocket实时推送"""
+logger = get_logger("backpack")
 
-    def __init__(self, on_data_callback: Callable[[BackpackData], None], symbol: str = "BTC_USDC_PERP"):
+# 流处理函数: (数据对象, 快速解码字段, 原始消息)
+StreamHandler = Callable[[BackpackData, TickerFields, str], None]
+
+class BackpackClient(WebSocketConnector):
+    """Backpack数据客户端 - 使用WebSocket实时推送，单连接复用多个市场和数据流"""
+
+    exchange_name = "Backpack"
+    feed_name = "backpack"
+
+    def __init__(self, on_data_callback: Callable[[BackpackData], None], symbol: str = "BTC_USDC_PERP",
+                 symbols: Optional[List[str]] = None, streams: Sequence[str] = ("ticker",),
+                 on_depth_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                 decoder: Optional[str] = None, ws_url: str = BACKPACK_WS_URL,
+                 feed_name: Optional[str] = None):
         """
         初始化Backpack客户端
 
         Args:
-            on_data_callback: 数据回调函数
+            on_data_callback: 数据回调函数（ticker/bookTicker更新）
             symbol: 交易对符号
+            symbols: 交易对列表，不传则只订阅symbol
+            streams: 每个交易对订阅的流类型 ("ticker", "bookTicker", "depth")
+            on_depth_callback: 深度流回调函数 (交易对, 增量数据)
+            decoder: ticker解码器名称 ("fast", "orjson", "json")，不传使用配置
+            ws_url: WebSocket地址（测试时可指向本地模拟服务器）
+            feed_name: 重连统计中的数据源名称，不传为 "backpack"
         """
+        super().__init__(ws_url, feed_name)
         self.on_data_callback = on_data_callback
+        self.on_depth_callback = on_depth_callback
+        self.decoder = get_ticker_decoder(decoder)
         self.symbol = symbol
         self.data = BackpackData(symbol=symbol)
-        self.running = False
-        self.ws = None
-        self.ws_thread = None
-        # Backpack WebSocket URL
-        self.ws_url = "wss://ws.backpack.exchange"
-    
-    def start(self):
-        """启动Backpack WebSocket连接"""
-        try:
-            print(f"🔷 启动Backpack {self.symbol}价格监控 (WebSocket)...")
+        self.data_by_symbol: Dict[str, BackpackData] = {symbol: self.data}
 
-            self.running = True
+        # 流类型 -> 处理函数
+        self.stream_handlers: Dict[str, StreamHandler] = {
+            "ticker": self._handle_ticker,
+            "bookTicker": self._handle_book_ticker,
+            "depth": self._handle_depth,
+        }
 
-            # 创建WebSocket连接
-            self.ws = websocket.WebSocketApp(
-                self.ws_url,
-                on_message=self._on_message,
-                on_error=self._on_error,
-                on_close=self._on_close,
-                on_open=self._on_open
-            )
+        # 路由表: stream名称 (如 "ticker.BTC_USDC_PERP") -> (处理函数, 数据对象)
+        self._routes: Dict[str, Tuple[StreamHandler, BackpackData]] = {}
 
-            # 启动WebSocket线程
-            self.ws_thread = threading.Thread(target=self.ws.run_forever, daemon=True)
-            self.ws_thread.start()
+        for sym in (symbols or [symbol]):
+            for stream_type in streams:
+                self._add_route(stream_type, sym)
+    
+    def start(self, engine: Optional[AsyncIngestionEngine] = None):
+        """
+        启动Backpack WebSocket连接
 
-            print(f"✅ Backpack {self.symbol}价格监控已启动 (WebSocket)")
-            return True
+        Args:
+            engine: 共享的异步采集引擎，不传则使用默认引擎
+        """
+        print(f"🔷 启动Backpack价格监控 (WebSocket, {len(self._routes)}个数据流)...")
 
-        except Exception as e:
-            print(f"❌ Backpack WebSocket连接失败: {e}")
+        if not super().start(engine):
             return False
+
+        print(f"✅ Backpack价格监控已启动 (WebSocket)")
+        return True
     
     def stop(self):
         """停止Backpack WebSocket连接"""
-        self.running = False
-        if self.ws:
-            self.ws.close()
+        super().stop()
         print("✅ Backpack价格监控已停止")
+
+    def _add_route(self, stream_type: str, symbol: str, handler: Optional[StreamHandler] = None) -> str:
+        """登记路由并返回stream名称"""
+        handler = handler or self.stream_handlers.get(stream_type)
+        if handler is None:
+            raise ValueError(f"不支持的Backpack流类型: {stream_type}")
+
+        data = self.data_by_symbol.setdefault(symbol, BackpackData(symbol=symbol))
+        stream = f"{stream_type}.{symbol}"
+        self._routes[stream] = (handler, data)
+        return stream
+
+    def subscribe(self, symbols: List[str], streams: Sequence[str] = ("ticker",),
+                  handler: Optional[StreamHandler] = None) -> bool:
+        """
+        运行时订阅数据流（无需重连）
+
+        Args:
+            symbols: 交易对列表
+            streams: 流类型列表
+            handler: 自定义处理函数，不传则使用默认的流类型处理函数
+
+        Returns:
+            bool: 是否已发送订阅请求（未连接时会在下次连接时自动生效）
+        """
+        params = [self._add_route(stream_type, sym, handler) for sym in symbols for stream_type in streams]
+        sent = self.send_json({"method": "SUBSCRIBE", "params": params})
+        print(f"📡 Backpack订阅: {', '.join(params)}")
+        return sent
+
+    def unsubscribe(self, symbols: List[str], streams: Sequence[str] = ("ticker",)) -> bool:
+        """
+        运行时取消订阅数据流（无需重连）
+
+        Args:
+            symbols: 交易对列表
+            streams: 流类型列表
+        """
+        params = [f"{stream_type}.{sym}" for sym in symbols for stream_type in streams]
+        params = [stream for stream in params if self._routes.pop(stream, None) is not None]
+        if not params:
+            return False
+
+        sent = self.send_json({"method": "UNSUBSCRIBE", "params": params})
+        print(f"📴 Backpack取消订阅: {', '.join(params)}")
+        return sent
     
-    def _on_open(self, ws):
+    async def _on_open(self, ws):
         """WebSocket连接打开回调"""
-        print(f"🔗 Backpack WebSocket连接已建立: {self.symbol}")
+        print(f"🔗 Backpack WebSocket连接已建立: {len(self._routes)}个数据流")
 
-        # 订阅ticker流
+        # 一次性订阅路由表中的全部数据流
+        params = list(self._routes)
         subscribe_message = {
             "method": "SUBSCRIBE",
-            "params": [f"ticker.{self.symbol}"]
+            "params": params
         }
-        ws.send(json.dumps(subscribe_message))
-        print(f"📡 已订阅Backpack ticker流: ticker.{self.symbol}")
+        await ws.send(json.dumps(subscribe_message))
+        print(f"📡 已订阅Backpack数据流: {', '.join(params)}")
 
     def _on_message(self, ws, message):
         """WebSocket消息回调"""
         try:
-            data = json.loads(message)
+            # 快速提取stream名称和ticker字段，深度等流由处理函数自行完整解析
+            ticker = self.decoder.decode(message)
 
-            # 检查是否是ticker数据
-            if data.get('stream', '').startswith('ticker.') and 'data' in data:
-                ticker_data = data['data']
+            # 按stream名称查路由表分发，未知流（如订阅应答）直接忽略
+            route = self._routes.get(ticker.stream)
+            if route is None:
+                return
 
-                # 获取最新价格 (c字段是lastPrice)
-                price = float(ticker_data.get('c', 0))
+            handler, symbol_data = route
+            handler(symbol_data, ticker, message)
 
-                self.data.price = price
-                self.data.timestamp = datetime.now()
+        except Exception as e:
+            logger.error("Backpack WebSocket消息处理错误: %s", e, extra=log_extra(key="backpack.message_error"))
 
-                print(f"Backpack {self.symbol}价格更新: ${price:.1f}")
+    def _handle_ticker(self, symbol_data: BackpackData, ticker: TickerFields, message: str):
+        """处理ticker流"""
+        # 获取最新价格 (c字段是lastPrice)
+        price = ticker.price
+        if price is None:
+            return
 
-                # 调用回调函数
-                if self.on_data_callback:
-                    self.on_data_callback(self.data)
+        symbol_data.price = price
+        symbol_data.timestamp = datetime.now()
 
-        except Exception as e:
-            print(f"Backpack WebSocket消息处理错误: {e}")
+        logger.info("Backpack %s价格更新: $%.1f", symbol_data.symbol, price,
+                    extra=log_extra(key=f"backpack.price.{symbol_data.symbol}", event_time=ticker.event_time))
+
+        # 调用回调函数
+        if self.on_data_callback:
+            self.on_data_callback(symbol_data)
+
+    def _handle_book_ticker(self, symbol_data: BackpackData, ticker: TickerFields, message: str):
+        """处理bookTicker流 (b/a为买一/卖一价格)"""
+        if ticker.bid is None or ticker.ask is None:
+            return
+
+        symbol_data.best_bid = ticker.bid
+        symbol_data.best_ask = ticker.ask
+        symbol_data.timestamp = datetime.now()
+
+        if self.on_data_callback:
+            self.on_data_callback(symbol_data)
+
+    def _handle_depth(self, symbol_data: BackpackData, ticker: TickerFields, message: str):
+        """处理depth增量流"""
+        if self.on_depth_callback:
+            self.on_depth_callback(symbol_data.symbol, json.loads(message)['data'])
 
     def _on_error(self, ws, error):
         """WebSocket错误回调"""
         print(f"❌ Backpack WebSocket错误: {error}")
 
     def _on_close(self, ws, close_status_code, close_msg):
-        """WebSocket连接关闭回调"""
+        """WebSocket连接关闭回调（重连由连接器主循环负责）"""
         print(f"🔌 Backpack WebSocket连接已关闭: {close_status_code} - {close_msg}")
-
-        # 如果还在运行状态，尝试重连
-        if self.running:
-            print("🔄 尝试重新连接Backpack WebSocket...")
-            import time
-            time.sleep(5)  # 等待5秒后重连
-            if self.running:
-                self.start()
     
-    def get_current_data(self) -> BackpackData:
-        """获取当前数据"""
+    def get_current_data(self, symbol: Optional[str] = None) -> BackpackData:
+        """
+        获取当前数据
+
+        Args:
+            symbol: 交易对，不传返回默认交易对
+        """
+        if symbol:
+            return self.data_by_symbol.get(symbol)
         return self.data
 
 # 测试函数
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Backpack深度订单簿
+复用BackpackClient的连接订阅depth.{symbol}增量流，结合REST快照在本地维护订单簿
+"""
+
+import asyncio
+import json
+import urllib.request
+from typing import Any, Callable, Dict, List, Optional
+
+from data.models import BackpackData, CompactOrderBook
+from core.backpack_client import BackpackClient
+from core.depth_book import LocalOrderBook
+from core.ticker_decoder import TickerFields
+from core.logger import get_logger, log_extra
+from config import ORDERBOOK_DEPTH
+
+logger = get_logger("backpack_depth")
+
+# Backpack REST根地址
+BACKPACK_REST_BASE = "https://api.backpack.exchange"
+
+# 两次快照请求的最小间隔（秒），避免持续缺口时频繁请求REST接口
+SNAPSHOT_MIN_INTERVAL = 1.0
+
+class BackpackDepthClient:
+    """Backpack深度订单簿 - 挂载在BackpackClient上，不单独建立连接"""
+
+    def __init__(self, backpack_client: BackpackClient, on_orderbook_callback: Callable[[CompactOrderBook], None],
+                 symbol: Optional[str] = None, depth: int = ORDERBOOK_DEPTH,
+                 rest_base_url: str = BACKPACK_REST_BASE):
+        """
+        初始化Backpack深度订单簿
+
+        Args:
+            backpack_client: 提供WebSocket连接的Backpack客户端
+            on_orderbook_callback: 订单簿更新回调
+            symbol: 交易对符号，不传使用backpack_client的默认交易对
+            depth: 回调中订单簿每侧的档位数
+            rest_base_url: REST根地址（测试时可指向本地模拟服务器）
+        """
+        self.client = backpack_client
+        self.on_orderbook_callback = on_orderbook_callback
+        self.symbol = symbol or backpack_client.symbol
+        self.depth = depth
+        self.snapshot_url = f"{rest_base_url}/api/v1/depth?symbol={self.symbol}"
+
+        self.book = LocalOrderBook()
+        self.orderbook: Optional[CompactOrderBook] = None
+        self.synced = False
+        self.resync_count = 0  # 检测到缺口后重新同步的次数
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._prev_u: Optional[int] = None
+        self._sync_task = None
+        self._last_snapshot_time = 0.0
+
+    def start(self) -> bool:
+        """订阅深度流（Backpack客户端未连接时在下次连接时生效）"""
+        print(f"🔷 启动Backpack {self.symbol}深度订单簿 (depth流 + REST快照)...")
+        self.client.subscribe([self.symbol], ("depth",), handler=self._handle_depth)
+        return True
+
+    def stop(self):
+        """取消订阅深度流"""
+        self.client.unsubscribe([self.symbol], ("depth",))
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            self._sync_task = None
+        self.synced = False
+        print("✅ Backpack深度订单簿已停止")
+
+    def _handle_depth(self, symbol_data: BackpackData, ticker: TickerFields, message: str):
+        """
+        depth流处理函数（在采集引擎的事件循环中执行）
+
+        未同步时缓存增量并触发快照同步；重连后第一条增量与之前的序号不连续，会自动重新同步
+        """
+        try:
+            event = json.loads(message)['data']
+
+            if self.synced:
+                self._apply_event(event)
+                if self.synced:
+                    return
+
+            # 出现缺口的这条增量也缓存下来，快照加载后按规则决定是否应用
+            self._buffer.append(event)
+            if self._sync_task is None or self._sync_task.done():
+                self._sync_task = asyncio.ensure_future(self._sync_snapshot())
+
+        except Exception as e:
+            logger.error("Backpack深度消息处理错误: %s", e, extra=log_extra(key="backpack_depth.message_error"))
+
+    def _request_resync(self):
+        """丢弃本地状态，下一条增量到达时重新拉取快照"""
+        self.synced = False
+        self._buffer = []
+        self._prev_u = None
+
+    def _fetch_snapshot(self) -> Dict[str, Any]:
+        """请求REST深度快照（在线程池中执行）"""
+        with urllib.request.urlopen(self.snapshot_url, timeout=10) as response:
+            return json.loads(response.read())
+
+    async def _sync_snapshot(self):
+        """加载快照并重放缓存的增量"""
+        loop = asyncio.get_running_loop()
+        wait = self._last_snapshot_time + SNAPSHOT_MIN_INTERVAL - loop.time()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._last_snapshot_time = loop.time()
+
+        try:
+            snapshot = await loop.run_in_executor(None, self._fetch_snapshot)
+        except Exception as e:
+            # 保留缓存，下一条增量到达时再次尝试
+            logger.error("Backpack深度快照获取失败: %s", e, extra=log_extra(key="backpack_depth.snapshot_error"))
+            return
+
+        # Backpack快照的lastUpdateId为字符串
+        self.book.load_snapshot(snapshot['bids'], snapshot['asks'], int(snapshot['lastUpdateId']))
+        self.synced = True
+        logger.info("Backpack深度快照已加载: lastUpdateId=%s", snapshot['lastUpdateId'],
+                    extra=log_extra(symbol=self.symbol))
+
+        buffered, self._buffer = self._buffer, []
+        for event in buffered:
+            if not self.synced:
+                break
+            self._apply_event(event)
+
+    def _apply_event(self, event: Dict[str, Any]):
+        """
+        按更新ID规则应用增量:
+        1. 丢弃 u <= lastUpdateId 的事件
+        2. 快照后的第一个事件需满足 U <= lastUpdateId+1
+        3. 之后每个事件的 U 必须等于上一个事件的 u+1
+        不满足时说明有缺口，重新同步
+        """
+        first_id, last_id = event['U'], event['u']
+        if last_id <= self.book.last_update_id:
+            return
+
+        if self._prev_u is None:
+            in_sequence = first_id <= self.book.last_update_id + 1
+        else:
+            in_sequence = first_id == self._prev_u + 1
+
+        if not in_sequence:
+            self.resync_count += 1
+            logger.warning("Backpack深度更新出现缺口 (U=%s, 上一个u=%s)，重新同步", first_id, self._prev_u,
+                           extra=log_extra(key="backpack_depth.gap", symbol=self.symbol))
+            self._request_resync()
+            return
+
+        self.book.apply(event['b'], event['a'])
+        self.book.last_update_id = last_id
+        self._prev_u = last_id
+
+        self.orderbook = self.book.to_orderbook(self.depth)
+        if self.on_orderbook_callback:
+            self.on_orderbook_callback(self.orderbook)
+
+    def get_current_orderbook(self) -> Optional[CompactOrderBook]:
+        """获取当前订单簿"""
+        return self.orderbook
@@ -3,110 +3,228 @@
 币安数据客户端
 """
 
-import json
-import threading
-import websocket
 from datetime import datetime
-from typing import Callable, Optional
+from typing import Callable, Dict, List, Optional
 
 from data.models import BinanceData
+from core.async_engine import AsyncIngestionEngine, WebSocketConnector
+from core.ticker_decoder import get_ticker_decoder
+from core.logger import get_logger, log_extra
 
-class BinanceClient:
+logger = get_logger("binance")
+
+# 币安期货WebSocket根地址
+BINANCE_FUTURES_WS_BASE = "wss://fstream.binance.com"
+
+def _ticker_stream(symbol: str) -> str:
+    """交易对对应的ticker流名称"""
+    return f"{symbol.lower()}@ticker"
+
+class BinanceClient(WebSocketConnector):
     """币安数据客户端 - 使用WebSocket实时推送"""
 
-    def __init__(self, on_data_callback: Callable[[BinanceData], None], symbol: str = "BTCUSDC"):
+    exchange_name = "币安"
+    feed_name = "binance"
+
+    def __init__(self, on_data_callback: Callable[[BinanceData], None], symbol: str = "BTCUSDC",
+                 symbols: Optional[List[str]] = None, ws_base_url: str = BINANCE_FUTURES_WS_BASE,
+                 decoder: Optional[str] = None, feed_name: Optional[str] = None):
         """
         初始化币安客户端
 
         Args:
             on_data_callback: 数据回调函数
             symbol: 交易对符号
+            symbols: 交易对列表，传入时启用组合流模式（一个连接复用多个交易对）
+            ws_base_url: 币安期货WebSocket根地址
+            decoder: ticker解码器名称 ("fast", "orjson", "json")，不传使用配置
+            feed_name: 重连统计中的数据源名称，不传为 "binance"
         """
-        self.on_data_callback = on_data_callback
-        self.symbol = symbol
-        self.data = BinanceData(symbol=symbol)
-        self.running = False
-        self.ws = None
-        self.ws_thread = None
         # 币安期货WebSocket URL
-        self.ws_url = f"wss://fstream.binance.com/ws/{symbol.lower()}@ticker"
+        super().__init__(f"{ws_base_url}/ws/{symbol.lower()}@ticker", feed_name)
+        self.on_data_callback = on_data_callback
+        self.ws_base_url = ws_base_url
+        self.combined = symbols is not None
+        self.decoder = get_ticker_decoder(decoder)
+
+        # 组合流模式下按stream名称分发到各交易对的数据对象
+        self.data_by_symbol: Dict[str, BinanceData] = {}
+        self._streams: Dict[str, BinanceData] = {}
+        self._request_id = 0
+
+        if self.combined:
+            for sym in symbols:
+                self._add_symbol(sym)
+            self.symbol = symbols[0].upper() if symbols else symbol
+        else:
+            self.symbol = symbol
+
+        self.data = self.data_by_symbol.get(self.symbol) or BinanceData(symbol=symbol)
     
-    def start(self):
-        """启动币安WebSocket连接"""
-        try:
-            print(f"🔷 启动币安永续合约{self.symbol}价格监控 (WebSocket)...")
-
-            self.running = True
+    def start(self, engine: Optional[AsyncIngestionEngine] = None):
+        """
+        启动币安WebSocket连接
 
-            # 创建WebSocket连接
-            self.ws = websocket.WebSocketApp(
-                self.ws_url,
-                on_message=self._on_message,
-                on_error=self._on_error,
-                on_close=self._on_close,
-                on_open=self._on_open
-            )
+        Args:
+            engine: 共享的异步采集引擎，不传则使用默认引擎
+        """
+        if self.combined:
+            print(f"🔷 启动币安永续合约组合流价格监控 ({len(self._streams)}个交易对)...")
+        else:
+            print(f"🔷 启动币安永续合约{self.symbol}价格监控 (WebSocket)...")
 
-            # 启动WebSocket线程
-            self.ws_thread = threading.Thread(target=self.ws.run_forever, daemon=True)
-            self.ws_thread.start()
+        if not super().start(engine):
+            return False
 
+        if self.combined:
+            print(f"✅ 币安永续合约组合流价格监控已启动 (WebSocket)")
+        else:
             print(f"✅ 币安永续合约{self.symbol}价格监控已启动 (WebSocket)")
-            return True
-
-        except Exception as e:
-            print(f"❌ 币安WebSocket连接失败: {e}")
-            return False
+        return True
     
     def stop(self):
         """停止币安WebSocket连接"""
-        self.running = False
-        if self.ws:
-            self.ws.close()
+        super().stop()
         print("✅ 币安价格监控已停止")
     
-    def _on_open(self, ws):
+    def _build_url(self) -> str:
+        """生成连接地址，组合流模式下包含当前全部订阅"""
+        if not self.combined:
+            return self.ws_url
+        streams = "/".join(list(self._streams))
+        if not streams:
+            # 没有订阅任何交易对时不连接（裸/stream地址没有意义），subscribe后唤醒
+            return None
+        return f"{self.ws_base_url}/stream?streams={streams}"
+
+    def _add_symbol(self, symbol: str) -> str:
+        """登记交易对并返回其stream名称"""
+        symbol = symbol.upper()
+        stream = _ticker_stream(symbol)
+        data = self.data_by_symbol.setdefault(symbol, BinanceData(symbol=symbol))
+        self._streams[stream] = data
+        return stream
+
+    def _send_request(self, method: str, params: List[str]) -> bool:
+        """发送SUBSCRIBE/UNSUBSCRIBE请求"""
+        self._request_id += 1
+        return self.send_json({"method": method, "params": params, "id": self._request_id})
+
+    def subscribe(self, symbols: List[str]) -> bool:
+        """
+        运行时订阅交易对（无需重连）
+
+        Args:
+            symbols: 交易对列表
+
+        Returns:
+            bool: 是否已发送订阅请求（未连接时会在下次连接时自动生效）
+        """
+        if not self.combined:
+            print("⚠️  币安单交易对模式不支持动态订阅，请使用symbols参数启用组合流模式")
+            return False
+
+        streams = [self._add_symbol(sym) for sym in symbols]
+        # 默认交易对重新订阅后，get_current_data()返回新的数据对象
+        if self.symbol in self.data_by_symbol:
+            self.data = self.data_by_symbol[self.symbol]
+
+        sent = self._send_request("SUBSCRIBE", streams)
+        print(f"📡 币安订阅: {', '.join(streams)}")
+        # 之前没有订阅内容而未连接时，按新的订阅建立连接
+        self.wake_up()
+        return sent
+
+    def unsubscribe(self, symbols: List[str]) -> bool:
+        """
+        运行时取消订阅交易对（无需重连）
+
+        取消默认交易对时get_current_data()不再返回其最后的价格；全部取消后断线不再重连，直到重新订阅
+
+        Args:
+            symbols: 交易对列表
+        """
+        if not self.combined:
+            print("⚠️  币安单交易对模式不支持动态取消订阅")
+            return False
+
+        streams = []
+        for sym in symbols:
+            stream = _ticker_stream(sym)
+            if self._streams.pop(stream, None) is not None:
+                self.data_by_symbol.pop(sym.upper(), None)
+                streams.append(stream)
+
+        if not streams:
+            return False
+
+        # 默认交易对已取消订阅：丢弃最后的价格，不再作为当前数据返回
+        if self.symbol not in self.data_by_symbol:
+            self.data = BinanceData(symbol=self.symbol)
+
+        sent = self._send_request("UNSUBSCRIBE", streams)
+        print(f"📴 币安取消订阅: {', '.join(streams)}")
+        if not self._streams:
+            print("⏸️  币安组合流已没有订阅的交易对，断线后不再重连，直到重新订阅")
+        return sent
+
+    async def _on_open(self, ws):
         """WebSocket连接打开回调"""
-        print(f"🔗 币安WebSocket连接已建立: {self.symbol}")
+        if self.combined:
+            print(f"🔗 币安组合流WebSocket连接已建立: {len(self._streams)}个交易对")
+        else:
+            print(f"🔗 币安WebSocket连接已建立: {self.symbol}")
 
     def _on_message(self, ws, message):
         """WebSocket消息回调"""
         try:
-            data = json.loads(message)
+            # 只提取价格等所需字段，不完整解析约20个字段的ticker消息
+            ticker = self.decoder.decode(message)
+
+            if self.combined:
+                # 组合流消息格式: {"stream": "btcusdc@ticker", "data": {...}}
+                # 订阅应答 ({"result": null, "id": 1}) 没有stream字段，直接忽略
+                symbol_data = self._streams.get(ticker.stream)
+                if symbol_data is None:
+                    return
+            else:
+                symbol_data = self.data
 
             # 获取最新价格 (c字段是lastPrice)
-            price = float(data.get('c', 0))
+            price = ticker.price
+            if price is None:
+                return
 
-            self.data.price = price
-            self.data.timestamp = datetime.now()
+            symbol_data.price = price
+            symbol_data.timestamp = datetime.now()
 
-            print(f"币安永续合约{self.symbol}价格更新: ${price:.1f}")
+            logger.info("币安永续合约%s价格更新: $%.1f", symbol_data.symbol, price,
+                        extra=log_extra(key=f"binance.price.{symbol_data.symbol}", event_time=ticker.event_time))
 
             # 调用回调函数
             if self.on_data_callback:
-                self.on_data_callback(self.data)
+                self.on_data_callback(symbol_data)
 
         except Exception as e:
-            print(f"币安WebSocket消息处理错误: {e}")
+            logger.error("币安WebSocket消息处理错误: %s", e, extra=log_extra(key="binance.message_error"))
 
     def _on_error(self, ws, error):
         """WebSocket错误回调"""
         print(f"❌ 币安WebSocket错误: {error}")
 
     def _on_close(self, ws, close_status_code, close_msg):
-        """WebSocket连接关闭回调"""
+        """WebSocket连接关闭回调（重连由连接器主循环负责）"""
         print(f"🔌 币安WebSocket连接已关闭: {close_status_code} - {close_msg}")
-
-        # 如果还在运行状态，尝试重连
-        if self.running:
-            print("🔄 尝试重新连接币安WebSocket...")
-            import time
-            time.sleep(5)  # 等待5秒后重连
-            if self.running:
-                self.start()
     
-    def get_current_data(self) -> BinanceData:
-        """获取当前数据"""
+    def get_current_data(self, symbol: Optional[str] = None) -> BinanceData:
+        """
+        获取当前数据
+
+        Args:
+            symbol: 交易对，组合流模式下可指定，不传返回默认交易对
+        """
+        if symbol:
+            return self.data_by_symbol.get(symbol.upper())
         return self.data
 
 # 测试函数
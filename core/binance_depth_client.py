@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+币安深度订单簿客户端
+REST深度快照 + @depth@100ms增量流，按更新ID规则在本地维护订单簿
+"""
+
+import asyncio
+import json
+import urllib.request
+from typing import Any, Callable, Dict, List, Optional
+
+from data.models import CompactOrderBook
+from core.async_engine import AsyncIngestionEngine, WebSocketConnector
+from core.binance_client import BINANCE_FUTURES_WS_BASE
+from core.depth_book import LocalOrderBook
+from core.logger import get_logger, log_extra
+from config import ORDERBOOK_DEPTH
+
+logger = get_logger("binance_depth")
+
+# 币安期货REST根地址
+BINANCE_FUTURES_REST_BASE = "https://fapi.binance.com"
+
+# 两次快照请求的最小间隔（秒），避免持续缺口时频繁请求REST接口
+SNAPSHOT_MIN_INTERVAL = 1.0
+
+class BinanceDepthClient(WebSocketConnector):
+    """币安深度订单簿客户端"""
+
+    exchange_name = "币安深度"
+    feed_name = "binance_depth"
+
+    def __init__(self, on_orderbook_callback: Callable[[CompactOrderBook], None], symbol: str = "BTCUSDC",
+                 depth: int = ORDERBOOK_DEPTH, snapshot_limit: int = 1000,
+                 ws_base_url: str = BINANCE_FUTURES_WS_BASE, rest_base_url: str = BINANCE_FUTURES_REST_BASE,
+                 feed_name: Optional[str] = None):
+        """
+        初始化币安深度客户端
+
+        Args:
+            on_orderbook_callback: 订单簿更新回调
+            symbol: 交易对符号
+            depth: 回调中订单簿每侧的档位数
+            snapshot_limit: REST快照档位数
+            ws_base_url: WebSocket根地址（测试时可指向本地模拟服务器）
+            rest_base_url: REST根地址（测试时可指向本地模拟服务器）
+            feed_name: 重连统计中的数据源名称，不传为 "binance_depth"
+        """
+        super().__init__(f"{ws_base_url}/ws/{symbol.lower()}@depth@100ms", feed_name)
+        self.on_orderbook_callback = on_orderbook_callback
+        self.symbol = symbol
+        self.depth = depth
+        self.snapshot_url = f"{rest_base_url}/fapi/v1/depth?symbol={symbol.upper()}&limit={snapshot_limit}"
+
+        self.book = LocalOrderBook()
+        self.orderbook: Optional[CompactOrderBook] = None
+        self.synced = False
+        self.resync_count = 0  # 检测到缺口后重新同步的次数
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._prev_u: Optional[int] = None
+        self._sync_task = None
+        self._last_snapshot_time = 0.0
+
+    def start(self, engine: Optional[AsyncIngestionEngine] = None):
+        """
+        启动深度订单簿同步
+
+        Args:
+            engine: 共享的异步采集引擎，不传则使用默认引擎
+        """
+        print(f"🔷 启动币安永续合约{self.symbol}深度订单簿 (WebSocket + REST快照)...")
+
+        if not super().start(engine):
+            return False
+
+        print(f"✅ 币安永续合约{self.symbol}深度订单簿已启动")
+        return True
+
+    def stop(self):
+        """停止深度订单簿同步"""
+        super().stop()
+        print("✅ 币安深度订单簿已停止")
+
+    async def _on_open(self, ws):
+        """连接建立后先缓存增量，再拉取快照"""
+        print(f"🔗 币安深度WebSocket连接已建立: {self.symbol}")
+        self._request_resync()
+
+    def _request_resync(self):
+        """丢弃本地状态并重新拉取快照（增量在同步完成前先缓存）"""
+        self.synced = False
+        self._buffer = []
+        self._prev_u = None
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.ensure_future(self._sync_snapshot())
+
+    def _fetch_snapshot(self) -> Dict[str, Any]:
+        """请求REST深度快照（在线程池中执行）"""
+        with urllib.request.urlopen(self.snapshot_url, timeout=10) as response:
+            return json.loads(response.read())
+
+    async def _sync_snapshot(self):
+        """加载快照并重放缓存的增量"""
+        loop = asyncio.get_running_loop()
+        wait = self._last_snapshot_time + SNAPSHOT_MIN_INTERVAL - loop.time()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._last_snapshot_time = loop.time()
+
+        try:
+            snapshot = await loop.run_in_executor(None, self._fetch_snapshot)
+        except Exception as e:
+            logger.error("币安深度快照获取失败: %s", e, extra=log_extra(key="binance_depth.snapshot_error"))
+            if self.running and self.ws is not None:
+                self._sync_task = asyncio.ensure_future(self._sync_snapshot())
+            return
+
+        self.book.load_snapshot(snapshot['bids'], snapshot['asks'], snapshot['lastUpdateId'])
+        self.synced = True
+        logger.info("币安深度快照已加载: lastUpdateId=%s", snapshot['lastUpdateId'],
+                    extra=log_extra(symbol=self.symbol))
+
+        buffered, self._buffer = self._buffer, []
+        for event in buffered:
+            if not self.synced:
+                break
+            self._apply_event(event)
+
+        # 重放缓存时发现缺口：当前任务即将结束，需要再次同步
+        if not self.synced and self.running:
+            self._sync_task = asyncio.ensure_future(self._sync_snapshot())
+
+    def _on_message(self, ws, message):
+        """WebSocket消息回调"""
+        try:
+            event = json.loads(message)
+            if event.get('e') != 'depthUpdate':
+                return
+
+            if self.synced:
+                self._apply_event(event)
+            else:
+                self._buffer.append(event)
+
+        except Exception as e:
+            logger.error("币安深度消息处理错误: %s", e, extra=log_extra(key="binance_depth.message_error"))
+
+    def _apply_event(self, event: Dict[str, Any]):
+        """
+        按币安更新ID规则应用增量:
+        1. 丢弃 u < lastUpdateId 的事件
+        2. 快照后的第一个事件需满足 U <= lastUpdateId+1 且 u >= lastUpdateId
+        3. 之后每个事件的 pu 必须等于上一个事件的 u（现货流无pu，要求 U == 上一个u+1）
+        不满足时说明有缺口，重新同步
+        """
+        first_id, last_id = event['U'], event['u']
+        if last_id < self.book.last_update_id:
+            return
+
+        if self._prev_u is None:
+            in_sequence = first_id <= self.book.last_update_id + 1
+        elif 'pu' in event:
+            in_sequence = event['pu'] == self._prev_u
+        else:
+            in_sequence = first_id == self._prev_u + 1
+
+        if not in_sequence:
+            self.resync_count += 1
+            logger.warning("币安深度更新出现缺口 (U=%s, 上一个u=%s)，重新同步", first_id, self._prev_u,
+                           extra=log_extra(key="binance_depth.gap", symbol=self.symbol))
+            self._request_resync()
+            return
+
+        self.book.apply(event['b'], event['a'])
+        self.book.last_update_id = last_id
+        self._prev_u = last_id
+
+        self.orderbook = self.book.to_orderbook(self.depth)
+        if self.on_orderbook_callback:
+            self.on_orderbook_callback(self.orderbook)
+
+    def _on_close(self, ws, close_status_code, close_msg):
+        """连接关闭后本地订单簿失效，重连时重新同步"""
+        super()._on_close(ws, close_status_code, close_msg)
+        self.synced = False
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            self._sync_task = None
+
+    def get_current_orderbook(self) -> Optional[CompactOrderBook]:
+        """获取当前订单簿"""
+        return self.orderbook
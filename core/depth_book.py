@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本地维护的增量订单簿
+交易所深度快照 + 增量更新，按档位原地修改，不在每次更新时重建和排序
+"""
+
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from sortedcontainers import SortedDict
+
+from data.models import CompactOrderBook
+
+# 交易所推送的档位格式: [价格, 数量]，数值通常为字符串
+RawLevel = Sequence
+
+
+class BookSide:
+    """
+    订单簿单侧 - 按价格有序的 价格->数量 映射（SortedDict，单档更新为O(log n)）
+    """
+
+    def __init__(self, descending: bool = False):
+        """
+        初始化订单簿单侧
+
+        Args:
+            descending: 是否按价格从高到低排列（买单侧）
+        """
+        self.descending = descending
+        # 买单侧存负价格，使两侧都按键升序即为从优到劣
+        self._sign = -1.0 if descending else 1.0
+        self._levels = SortedDict()
+
+    def __len__(self) -> int:
+        return len(self._levels)
+
+    def clear(self):
+        """清空所有档位"""
+        self._levels.clear()
+
+    def update(self, price: float, size: float):
+        """
+        更新单个档位，数量为0时删除该档位
+
+        Args:
+            price: 价格
+            size: 数量
+        """
+        key = self._sign * price
+        levels = self._levels
+
+        if size <= 0:
+            levels.pop(key, None)
+            return
+        levels[key] = size
+
+    def best(self) -> Optional[float]:
+        """最优价格"""
+        if not self._levels:
+            return None
+        return self._sign * self._levels.peekitem(0)[0]
+
+    def top(self, depth: int) -> List[Tuple[float, float]]:
+        """前depth档 (价格, 数量)，从优到劣"""
+        keys = islice(self._levels.keys(), depth)
+        levels = self._levels
+        sign = self._sign
+        return [(sign * key, levels[key]) for key in keys]
+
+
+class LocalOrderBook:
+    """本地订单簿 - 买卖两侧 + 最后更新ID"""
+
+    def __init__(self):
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide()
+        self.last_update_id = 0
+
+    def load_snapshot(self, bids: Iterable[RawLevel], asks: Iterable[RawLevel], last_update_id: int = 0):
+        """
+        加载深度快照（清空现有档位）
+
+        Args:
+            bids: 买单档位 [[价格, 数量], ...]
+            asks: 卖单档位 [[价格, 数量], ...]
+            last_update_id: 快照对应的更新ID
+        """
+        self.bids.clear()
+        self.asks.clear()
+        self.apply(bids, asks)
+        self.last_update_id = last_update_id
+
+    def apply(self, bids: Iterable[RawLevel], asks: Iterable[RawLevel]):
+        """应用增量档位更新"""
+        update = self.bids.update
+        for price, size in bids:
+            update(float(price), float(size))
+        update = self.asks.update
+        for price, size in asks:
+            update(float(price), float(size))
+
+    def to_orderbook(self, depth: int = 20, timestamp: Optional[datetime] = None) -> CompactOrderBook:
+        """
+        生成前depth档的紧凑订单簿（total_size为累计数量，与Lighter页面一致）
+
+        Args:
+            depth: 每侧档位数
+            timestamp: 时间戳，不传使用当前时间
+        """
+        return CompactOrderBook.from_pairs(self.asks.top(depth), self.bids.top(depth), timestamp)
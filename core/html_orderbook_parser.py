@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+订单簿HTML快照解析
+一次run_js取回买卖容器的outerHTML（或整页HTML），在工作进程中解析档位，
+抓取线程只做一次浏览器往返，解析CPU不占用驱动浏览器的线程，多市场抓取时可分摊到多个核心。
+解析结果与 orderbook_utils.parse_orderbook_from_page 一致（档位查找、数值清理、跳过无法解析的档位、排序）
+"""
+
+import html as html_lib
+import multiprocessing
+import re
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+try:
+    from lxml import etree
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+from data.models import CompactOrderBook
+from core.orderbook_utils import parse_orderbook_arrays
+from core.logger import get_logger, log_extra
+from config import HTML_PARSER_WORKERS, HTML_PARSER_ENGINE, HTML_PARSER_TIMEOUT
+
+logger = get_logger("html_orderbook")
+
+# 返回买卖容器的outerHTML（档位行都在容器内）；容器不存在时对应部分为空
+ORDERBOOK_HTML_JS = """
+const asks = document.querySelector('[data-testid="orderbook-asks"]');
+const bids = document.querySelector('[data-testid="orderbook-bids"]');
+return (asks ? asks.outerHTML : '') + (bids ? bids.outerHTML : '');
+"""
+
+# 档位: (容器testid, 档位testid前缀)
+_SIDES = (("orderbook-asks", "ob-ask-"), ("orderbook-bids", "ob-bid-"))
+_FIELDS = ("price", "size", "total-size")
+
+# regex引擎: 档位行起点用正则查找，行内字段用字符串查找（字段文本到同名结束标签为止，内部的其他标签再去掉；不支持同名标签嵌套）
+_ROW_RE = re.compile(r'data-testid="ob-(ask|bid)-')
+_FIELD_MARKERS = tuple(f'data-testid="{name}"' for name in _FIELDS)
+_TAG_NAME_RE = re.compile(r'[\w-]+')
+_TAG_RE = re.compile(r'<[^>]*>')
+
+if LXML_AVAILABLE:
+    _LXML_HAS_CONTAINER = etree.XPath('boolean(//*[@data-testid=$testid])')
+    _LXML_ROWS = etree.XPath('//*[starts-with(@data-testid, $prefix)]')
+    _LXML_FIELD = etree.XPath('.//*[@data-testid=$testid][1]')
+
+Levels = List[List[float]]
+
+
+def _to_level(texts) -> Optional[List[float]]:
+    """[价格, 数量, 累计数量]，与parse_orderbook_from_page相同的清理方式，无法解析返回None"""
+    try:
+        return [float(text.replace(',', '').strip()) for text in texts]
+    except ValueError:
+        return None
+
+
+def _field_text(page_html: str, marker: str, start: int, end: int) -> Optional[str]:
+    """page_html[start:end]（一个档位行）内带有marker属性的元素的文本，找不到返回None"""
+    pos = page_html.find(marker, start, end)
+    if pos < 0:
+        return None
+    tag = _TAG_NAME_RE.match(page_html, page_html.rfind('<', start, pos) + 1)
+    body_start = page_html.find('>', pos, end) + 1
+    body_end = page_html.find(f'</{tag.group(0)}>', body_start, end) if tag and body_start else -1
+    if body_end < 0:
+        return None
+    text = page_html[body_start:body_end]
+    if '<' in text:
+        text = _TAG_RE.sub('', text)
+    return html_lib.unescape(text) if '&' in text else text
+
+
+def _extract_regex(page_html: str) -> Tuple[Levels, Levels]:
+    rows = {"ask": [], "bid": []}
+    matches = list(_ROW_RE.finditer(page_html))
+    for i, match in enumerate(matches):
+        # 只在本行到下一行起点之间查找字段，缺字段的行不会借用下一行的值
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(page_html)
+        texts = [_field_text(page_html, marker, match.end(), end) for marker in _FIELD_MARKERS]
+        if None in texts:
+            continue
+        level = _to_level(texts)
+        if level:
+            rows[match.group(1)].append(level)
+
+    result = []
+    for (container, _), side in zip(_SIDES, ("ask", "bid")):
+        result.append(rows[side] if f'data-testid="{container}"' in page_html else [])
+    return result[0], result[1]
+
+
+def _extract_lxml(page_html: str) -> Tuple[Levels, Levels]:
+    root = lxml.html.fromstring(page_html)
+    result = []
+    for container, prefix in _SIDES:
+        levels = []
+        if _LXML_HAS_CONTAINER(root, testid=container):
+            for row in _LXML_ROWS(root, prefix=prefix):
+                fields = [_LXML_FIELD(row, testid=name) for name in _FIELDS]
+                if not all(fields):
+                    continue
+                level = _to_level(field[0].text_content() for field in fields)
+                if level:
+                    levels.append(level)
+        result.append(levels)
+    return result[0], result[1]
+
+
+def extract_orderbook_levels(page_html: str, engine: str = HTML_PARSER_ENGINE) -> Tuple[Levels, Levels]:
+    """
+    从HTML中提取买卖档位（在工作进程中执行，只返回基本类型以减少进程间序列化开销）
+
+    Args:
+        page_html: 整页HTML或买卖容器的outerHTML
+        engine: 'regex'、'lxml'，'auto'为已安装lxml时使用lxml
+
+    Returns:
+        Tuple[卖单档位, 买单档位]: [[价格, 数量, 累计数量], ...]，页面顺序
+    """
+    if engine == 'lxml' or (engine == 'auto' and LXML_AVAILABLE):
+        return _extract_lxml(page_html)
+    return _extract_regex(page_html)
+
+
+def parse_orderbook_html(page_html: str, timestamp: Optional[datetime] = None,
+                         engine: str = HTML_PARSER_ENGINE) -> CompactOrderBook:
+    """在当前进程中解析HTML为CompactOrderBook（卖单价格从低到高，买单价格从高到低）"""
+    raw_asks, raw_bids = extract_orderbook_levels(page_html, engine)
+    return parse_orderbook_arrays(raw_asks, raw_bids, timestamp)
+
+
+class HtmlOrderBookParser:
+    """工作进程池中的HTML订单簿解析器（workers为0时在调用线程中解析）"""
+
+    def __init__(self, workers: int = HTML_PARSER_WORKERS, engine: str = HTML_PARSER_ENGINE):
+        """
+        初始化解析器
+
+        Args:
+            workers: 工作进程数
+            engine: 解析引擎，见extract_orderbook_levels
+        """
+        self.workers = workers
+        self.engine = engine
+        self.executor = self._create_executor()
+        self.lock = threading.Lock()
+
+    def _create_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        # 主进程有多个线程在运行，用spawn启动工作进程，避免fork复制持锁状态
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def submit(self, page_html: str) -> Future:
+        """提交解析任务，Future结果为 (卖单档位, 买单档位)"""
+        return self._submit(self.executor, page_html)
+
+    def _submit(self, executor: Optional[ProcessPoolExecutor], page_html: str) -> Future:
+        if executor is None:
+            future = Future()
+            future.set_result(extract_orderbook_levels(page_html, self.engine))
+            return future
+        return executor.submit(extract_orderbook_levels, page_html, self.engine)
+
+    def parse(self, page_html: str, timestamp: Optional[datetime] = None,
+              timeout: float = HTML_PARSER_TIMEOUT) -> CompactOrderBook:
+        """
+        解析HTML为CompactOrderBook（阻塞等待工作进程结果）
+
+        Args:
+            page_html: 整页HTML或买卖容器的outerHTML
+            timestamp: 订单簿时间戳，应为抓取HTML的时间，不传使用当前时间
+            timeout: 等待工作进程的最长时间（秒）
+        """
+        executor = self.executor
+        try:
+            raw_asks, raw_bids = self._submit(executor, page_html).result(timeout=timeout)
+        except BrokenProcessPool:
+            # 工作进程异常退出，重建进程池（多个抓取线程同时发现时只重建一次），本次在当前线程解析
+            with self.lock:
+                if self.executor is executor:
+                    logger.warning("HTML解析进程池已损坏，重新创建", extra=log_extra(key="html_orderbook.broken_pool"))
+                    self.executor = self._create_executor()
+            raw_asks, raw_bids = extract_orderbook_levels(page_html, self.engine)
+        return parse_orderbook_arrays(raw_asks, raw_bids, timestamp)
+
+    def close(self):
+        """关闭工作进程"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+_default_parser: Optional[HtmlOrderBookParser] = None
+_default_parser_lock = threading.Lock()
+
+
+def get_html_parser() -> HtmlOrderBookParser:
+    """获取进程内共享的HTML解析器（按需启动，多个市场的抓取线程共用工作进程）"""
+    global _default_parser
+    with _default_parser_lock:
+        if _default_parser is None:
+            _default_parser = HtmlOrderBookParser()
+        return _default_parser
+
+
+def parse_orderbook_via_html(page, parser: Optional[HtmlOrderBookParser] = None) -> Optional[CompactOrderBook]:
+    """
+    通过一次run_js取回订单簿容器HTML，在工作进程中解析
+
+    Args:
+        page: DrissionPage的页面或标签页对象
+        parser: HTML解析器，不传使用共享解析器
+
+    Returns:
+        CompactOrderBook: 订单簿对象
+    """
+    try:
+        page_html = page.run_js(ORDERBOOK_HTML_JS)
+        if not page_html:
+            return None
+        return (parser or get_html_parser()).parse(page_html, timestamp=datetime.now())
+
+    except Exception as e:
+        error_msg = str(e)
+        if "disconnected" in error_msg.lower() or "connection" in error_msg.lower():
+            logger.warning("订单簿解析错误: 页面连接断开", extra=log_extra(key="orderbook.disconnected"))
+        else:
+            logger.error("订单簿HTML抓取错误: %s", e, extra=log_extra(key="html_orderbook.error"))
+        return None
@@ -3,10 +3,12 @@
 Lighter数据客户端
 """
 
+import json
+import platform
 import time
 import threading
 from datetime import datetime
-from typing import Callable, Optional
+from typing import Any, Callable, Dict, Optional, Tuple
 
 try:
     from DrissionPage import ChromiumPage, ChromiumOptions
@@ -14,34 +16,259 @@ try:
 except ImportError:
     DRISSION_AVAILABLE = False
 
-from data.models import LighterData, OrderBook
-from core.orderbook_utils import parse_orderbook_from_page
-from config import get_chrome_path, BROWSER_WAIT_TIME, SCRAPE_INTERVAL
+from data.models import AnyOrderBook, LighterData
+from core.orderbook_utils import (parse_orderbook_from_page, parse_orderbook_via_js, wait_for_orderbook,
+                                  install_orderbook_observer, wait_orderbook_update)
+from core.html_orderbook_parser import parse_orderbook_via_html
+from core.lighter_ws_decoder import LighterOrderBookDecoder
+from core.orderbook_diff import OrderBookChangeDetector, OrderBookDiff
+from core.tab_recycler import TabRecyclePolicy, TabState, RECYCLE_WARM
+from core.resource_sampler import process_tree_usage
+from core.logger import get_logger, log_extra
+from config import (get_chrome_path, BROWSER_WAIT_TIME, SCRAPE_INTERVAL, LIGHTER_SCRAPE_MODE, PAGE_REFRESH_INTERVAL,
+                    LIGHTER_OBSERVER_TIMEOUT, LIGHTER_MARKET_ID, LIGHTER_NETWORK_STALE_TIME,
+                    LIGHTER_RESOURCE_BUDGET, LIGHTER_BLOCKED_URLS, LIGHTER_BLOCKED_RESOURCE_TYPES,
+                    LIGHTER_HIDDEN_SELECTORS, TAB_METRICS_INTERVAL)
+
+logger = get_logger("lighter")
+
+# 伪装成macOS Chrome浏览器
+MACOS_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# 页面加载后执行的navigator伪装脚本
+STEALTH_SCRIPTS = (
+    "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})",
+    "Object.defineProperty(navigator, 'platform', {get: () => 'MacIntel'})",
+    f"Object.defineProperty(navigator, 'userAgent', {{get: () => '{MACOS_USER_AGENT}'}})",
+)
+
+# 每个新文档加载时注入的样式: 隐藏不需要的面板，display:none的元素不参与布局和绘制
+# textContent不受影响，订单簿DOM读取照常进行
+PANEL_HIDE_JS = """
+(() => {
+    const css = %s + ' { display: none !important; }';
+    const add = () => {
+        const style = document.createElement('style');
+        style.textContent = css;
+        (document.head || document.documentElement).appendChild(style);
+    };
+    if (document.documentElement) add(); else document.addEventListener('DOMContentLoaded', add);
+})();
+"""
+
+def build_panel_hide_js(selectors=LIGHTER_HIDDEN_SELECTORS) -> str:
+    """生成隐藏面板的注入脚本（选择器列表为空时返回空字符串）"""
+    if not selectors:
+        return ""
+    return PANEL_HIDE_JS % json.dumps(', '.join(selectors))
+
+def build_chromium_options(headless: bool, verbose: bool = False) -> "ChromiumOptions":
+    """
+    生成Lighter抓取使用的浏览器选项（单页面客户端和多市场标签页池共用）
+
+    Args:
+        headless: 是否使用无头模式
+        verbose: 是否打印配置信息
+    """
+    co = ChromiumOptions()
+    if headless:
+        co.headless()  # 启用无头模式
+        if verbose:
+            print("🔇 使用无头模式")
+    elif verbose:
+        print("🖥️  使用有界面模式")
+
+    # 自动检测Chrome路径
+    chrome_path = get_chrome_path()
+    if chrome_path:
+        co.set_browser_path(chrome_path)
+        if verbose:
+            print(f"🌐 使用Chrome路径: {chrome_path}")
+    elif verbose:
+        print("⚠️  未找到Chrome浏览器，请确保已安装Google Chrome")
+
+    # 🎭 伪装成macOS Chrome浏览器
+    co.set_user_agent(MACOS_USER_AGENT)
+    if verbose:
+        print("🎭 伪装成macOS Chrome浏览器")
+
+    # 设置macOS相关的首选项
+    co.set_pref('profile.default_content_settings.popups', 0)  # 禁用弹窗
+    co.set_pref('credentials_enable_service', False)  # 禁用密码保存提示
+    co.set_pref('profile.default_content_setting_values.notifications', 2)  # 禁用通知
+
+    # 设置窗口大小（模拟macOS常见分辨率）和语言
+    co.set_argument('--window-size=1440,900')
+    co.set_argument('--lang=zh-CN,zh,en-US,en')
+
+    # 禁用自动化检测
+    co.set_argument('--disable-blink-features=AutomationControlled')
+    co.set_argument('--disable-web-security')
+    co.set_argument('--disable-features=VizDisplayCompositor')
+
+    # 后台标签页（多市场标签页池、预热中的替换标签页）不降频，保证订单簿持续渲染
+    co.set_argument('--disable-background-timer-throttling')
+    co.set_argument('--disable-backgrounding-occluded-windows')
+    co.set_argument('--disable-renderer-backgrounding')
+
+    # Linux系统特殊配置
+    if platform.system() == 'Linux':
+        co.set_argument('--no-sandbox')  # Linux系统必需
+        co.set_argument('--disable-dev-shm-usage')  # 避免共享内存问题
+        co.set_argument('--disable-gpu')  # 禁用GPU加速
+        co.set_argument('--disable-extensions')  # 禁用扩展
+        if verbose:
+            print("🐧 已添加Linux兼容性参数")
+
+    # 其他优化配置
+    co.no_imgs(True)  # 不加载图片，提高速度
+    co.mute(True)     # 静音
+    return co
+
+def apply_resource_budget(page) -> bool:
+    """
+    在打开页面前设置请求拦截和面板隐藏（刷新后仍然生效）
+
+    Args:
+        page: DrissionPage的页面或标签页对象
+
+    Returns:
+        bool: 是否设置成功
+    """
+    if not LIGHTER_RESOURCE_BUDGET:
+        return False
+    try:
+        if LIGHTER_BLOCKED_URLS:
+            page.run_cdp('Network.enable')
+            page.run_cdp('Network.setBlockedURLs', urls=list(LIGHTER_BLOCKED_URLS))
+
+        # 按资源类型拦截: 只暂停这些类型的请求，回调中直接拒绝
+        if LIGHTER_BLOCKED_RESOURCE_TYPES:
+            def fail_request(**kwargs):
+                try:
+                    page.run_cdp('Fetch.failRequest', requestId=kwargs['requestId'], errorReason='BlockedByClient')
+                except Exception:
+                    pass
+            page.driver.set_callback('Fetch.requestPaused', fail_request)
+            page.run_cdp('Fetch.enable', patterns=[{'urlPattern': '*', 'resourceType': resource_type}
+                                                   for resource_type in LIGHTER_BLOCKED_RESOURCE_TYPES])
+
+        hide_js = build_panel_hide_js()
+        if hide_js:
+            page.run_cdp('Page.addScriptToEvaluateOnNewDocument', source=hide_js)
+        return True
+    except Exception as e:
+        print(f"⚠️  请求拦截/面板隐藏设置失败: {e}")
+        return False
+
+def apply_stealth_js(page) -> bool:
+    """在页面（或标签页）中执行navigator伪装脚本，返回是否成功"""
+    try:
+        for script in STEALTH_SCRIPTS:
+            page.run_js(script)
+        return True
+    except Exception as e:
+        print(f"⚠️  JavaScript伪装失败: {e}")
+        return False
+
+def read_tab_metrics(tab) -> Dict[str, Any]:
+    """
+    通过CDP Performance.getMetrics读取标签页资源指标
+
+    Args:
+        tab: DrissionPage的页面或标签页对象
+
+    Returns:
+        Dict: js_heap_mb（JS堆已用MB）和dom_nodes（DOM节点数）
+    """
+    tab.run_cdp('Performance.enable')
+    metrics = {item['name']: item['value'] for item in tab.run_cdp('Performance.getMetrics').get('metrics', [])}
+    return {
+        "js_heap_mb": metrics.get('JSHeapUsedSize', 0) / 1024 / 1024,
+        "dom_nodes": int(metrics.get('Nodes', 0)),
+    }
+
+def open_warm_tab(browser, url: str, prepare: Optional[Callable] = None) -> Tuple[Any, Optional[AnyOrderBook]]:
+    """
+    在同一浏览器中后台打开替换标签页，等待订单簿就绪（旧标签页在此期间继续抓取）
+
+    Args:
+        browser: ChromiumPage对象
+        url: 页面地址
+        prepare: 导航前对新标签页执行的设置（如开启WebSocket消息监听）
+
+    Returns:
+        Tuple[标签页, 第一份订单簿]: 超过BROWSER_WAIT_TIME未就绪时关闭新标签页并返回 (None, None)
+    """
+    tab = browser.new_tab(background=True)
+    try:
+        apply_resource_budget(tab)
+        if prepare:
+            prepare(tab)
+        tab.run_cdp('Page.navigate', url=url)
+        apply_stealth_js(tab)
+        orderbook = wait_for_orderbook(tab, BROWSER_WAIT_TIME)
+    except Exception as e:
+        print(f"⚠️  替换标签页打开失败: {e}")
+        orderbook = None
+
+    if orderbook is None:
+        try:
+            tab.close()
+        except Exception:
+            pass
+        return None, None
+    return tab, orderbook
 
 class LighterClient:
-    """Lighter数据客户端"""
+    """Lighter数据客户端 - 按标签页资源预算回收页面，最长存活时间只作兜底"""
     
-    def __init__(self, on_data_callback: Callable[[LighterData], None], headless: bool = False, refresh_interval: int = 300):
+    def __init__(self, on_data_callback: Callable[[LighterData], None], headless: bool = False,
+                 refresh_interval: int = PAGE_REFRESH_INTERVAL, scrape_mode: str = LIGHTER_SCRAPE_MODE,
+                 on_diff_callback: Optional[Callable[[OrderBookDiff], None]] = None):
         """
         初始化Lighter客户端
 
         Args:
             on_data_callback: 数据回调函数
             headless: 是否使用无头模式
-            refresh_interval: 页面刷新间隔（秒），默认5分钟
+            refresh_interval: 页面最长存活时间（秒），默认1小时；JS堆、DOM节点、进程内存或抓取耗时超出预算时
+                              提前回收（预热替换标签页，未就绪时原地刷新），都未超出时到期回收兜底
+            scrape_mode: 订单簿抓取方式 ('js' 单次脚本调用, 'dom' 逐个元素查询, 'observer' 页面内变化推送,
+                         'network' 监听页面自身的WebSocket消息, 'html' 取回容器HTML在工作进程中解析)
+            on_diff_callback: 逐档差异回调（只包含变化的档位），订单簿未变化时不调用
         """
         self.on_data_callback = on_data_callback
+        self.on_diff_callback = on_diff_callback
+        self.change_detector = OrderBookChangeDetector()  # 订单簿未变化时不再回调
+        # network模式下CDP事件线程和抓取线程都会发布订单簿，变化检测和回调按顺序串行执行
+        self._publish_lock = threading.Lock()
         self.headless = headless
-        self.refresh_interval = refresh_interval  # 刷新间隔（秒）
-        self.page = None
+        self.refresh_interval = refresh_interval  # 最长存活时间（秒）
+        self.page = None  # 浏览器（ChromiumPage），持有首个标签页
+        self.tab = None   # 当前抓取的标签页：启动时为首个标签页，预热替换后为新标签页
+        # 按实测指标回收页面；连续抓取失败由抓取循环的重连逻辑处理
+        self.tab_state = TabState()
+        self.recycle_policy = TabRecyclePolicy(max_age=refresh_interval, max_failures=0)
         self.data = LighterData()
         self.running = False
         self.scrape_thread = None
         self.refresh_thread = None
-        self.last_refresh_time = 0
         self.url = None  # 保存当前URL
         self.connection_lost_count = 0  # 连接丢失计数
         self.max_reconnect_attempts = 3  # 最大重连尝试次数
+        self.scrape_mode = scrape_mode
+        self.parse_orderbook = {'dom': parse_orderbook_from_page,
+                                'html': parse_orderbook_via_html}.get(scrape_mode, parse_orderbook_via_js)
+        self.observing = False  # observer模式下观察器是否有效（无效时按SCRAPE_INTERVAL轮询）
+        # network模式: 解码页面收到的订单簿WebSocket消息（每个标签页独立解码），消息中断时退回DOM轮询
+        self.network_mode = scrape_mode == 'network'
+        self.last_frame_time = 0.0
+        self.last_book_time = 0.0  # 最近一次成功抓取/解码出订单簿的时间 (monotonic)，含被去重抑制的
+        self.started_at = 0.0
+        self.time_to_first_book: Optional[float] = None  # 启动到第一份订单簿的耗时（秒）
+        self.last_ready_time: Optional[float] = None     # 最近一次启动/刷新/重连到订单簿就绪的耗时（秒）
+        self.ready_timeouts = 0                          # 超过BROWSER_WAIT_TIME仍未就绪的次数
 
         if not DRISSION_AVAILABLE:
             print("⚠️  DrissionPage未安装")
@@ -54,97 +281,45 @@ class LighterClient:
 
         # 保存URL用于刷新
         self.url = url
-        
+        self.started_at = time.time()
+
         try:
             print("🔷 启动Lighter浏览器...")
 
-            # 配置浏览器选项
-            co = ChromiumOptions()
-            if self.headless:
-                co.headless()  # 启用无头模式
-                print("🔇 使用无头模式")
-            else:
-                print("🖥️  使用有界面模式")
-
-            # 跨平台Chrome路径配置
-            import platform
-
-            # 自动检测Chrome路径
-            chrome_path = get_chrome_path()
-            if chrome_path:
-                co.set_browser_path(chrome_path)
-                print(f"🌐 使用Chrome路径: {chrome_path}")
-            else:
-                print("⚠️  未找到Chrome浏览器，请确保已安装Google Chrome")
-
-            # 🎭 伪装成macOS Chrome浏览器
-            macos_user_agent = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            co.set_user_agent(macos_user_agent)
-            print("🎭 伪装成macOS Chrome浏览器")
-
-            # 设置macOS相关的首选项
-            co.set_pref('profile.default_content_settings.popups', 0)  # 禁用弹窗
-            co.set_pref('credentials_enable_service', False)  # 禁用密码保存提示
-            co.set_pref('profile.default_content_setting_values.notifications', 2)  # 禁用通知
-
-            # 设置窗口大小（模拟macOS常见分辨率）
-            co.set_argument('--window-size=1440,900')
-
-            # 设置语言
-            co.set_argument('--lang=zh-CN,zh,en-US,en')
-
-            # 禁用自动化检测
-            co.set_argument('--disable-blink-features=AutomationControlled')
-            co.set_argument('--disable-web-security')
-            co.set_argument('--disable-features=VizDisplayCompositor')
-
-            # Linux系统特殊配置
-            if platform.system() == 'Linux':
-                co.set_argument('--no-sandbox')  # Linux系统必需
-                co.set_argument('--disable-dev-shm-usage')  # 避免共享内存问题
-                co.set_argument('--disable-gpu')  # 禁用GPU加速
-                co.set_argument('--disable-extensions')  # 禁用扩展
-                print("🐧 已添加Linux兼容性参数")
-
-            # 其他优化配置
-            co.no_imgs(True)  # 不加载图片，提高速度
-            co.mute(True)     # 静音
-
-            self.page = ChromiumPage(co)
+            self.page = ChromiumPage(build_chromium_options(self.headless, verbose=True))
+            self.tab = self.page
 
             # 执行JavaScript进一步伪装
             print("🎭 执行JavaScript伪装...")
-            try:
-                # 伪装navigator属性
-                self.page.run_js("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-                self.page.run_js("Object.defineProperty(navigator, 'platform', {get: () => 'MacIntel'})")
-                self.page.run_js("Object.defineProperty(navigator, 'userAgent', {get: () => 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'})")
+            if apply_stealth_js(self.tab):
                 print("✅ JavaScript伪装完成")
-            except Exception as e:
-                print(f"⚠️  JavaScript伪装失败: {e}")
 
-            self.page.get(url)
+            if apply_resource_budget(self.tab):
+                print("✂️  已拦截字体/统计/图表请求并隐藏图表面板")
+            self._enable_network_capture(self.tab)
+            self.tab.get(url)
+
+            # 等待页面渲染出订单簿（出现即开始抓取，最长BROWSER_WAIT_TIME秒）
+            print("⏳ 等待订单簿就绪...")
+            orderbook = self._wait_ready(self.started_at)
 
-            # 等待页面加载
-            print("⏳ 等待页面加载...")
-            time.sleep(BROWSER_WAIT_TIME)
-            
             # 检查页面是否加载成功
-            if self._check_page_loaded():
+            if orderbook or self._check_page_loaded():
                 self.data.connected = True
                 self.running = True
-                
+                if orderbook:
+                    self._publish_orderbook(orderbook)
+
                 # 启动数据抓取线程
                 self.scrape_thread = threading.Thread(target=self._scrape_loop, daemon=True)
                 self.scrape_thread.start()
 
-                # 启动页面刷新线程
+                # 启动页面回收线程
                 self.refresh_thread = threading.Thread(target=self._refresh_loop, daemon=True)
                 self.refresh_thread.start()
-                self.last_refresh_time = time.time()
 
                 print("✅ Lighter连接成功")
-                print(f"🔄 页面将每{self.refresh_interval//60}分钟自动刷新一次")
+                print(f"♻️  页面超出资源预算时回收（最长存活{self.refresh_interval//60}分钟）")
                 return True
             else:
                 print("❌ Lighter页面加载失败")
@@ -156,49 +331,81 @@ class LighterClient:
             return False
 
     def _refresh_loop(self):
-        """页面刷新循环"""
+        """页面回收循环: 定期采样标签页指标，超出资源预算或存活时间时回收"""
         while self.running:
             try:
-                # 等待刷新间隔
-                time.sleep(60)  # 每分钟检查一次
+                time.sleep(TAB_METRICS_INTERVAL)
 
                 if not self.running:
                     break
 
-                # 检查是否需要刷新
-                current_time = time.time()
-                if current_time - self.last_refresh_time >= self.refresh_interval:
-                    print(f"🔄 页面运行已超过{self.refresh_interval//60}分钟，开始刷新...")
-                    self._refresh_page()
-                    self.last_refresh_time = current_time
+                self._sample_tab_metrics()
+                reason = self.recycle_policy.check(self.tab_state)
+                if reason:
+                    print(f"♻️  Lighter页面{reason}，开始回收...")
+                    self._recycle_tab(reason)
 
             except Exception as e:
-                print(f"❌ 页面刷新循环错误: {e}")
+                print(f"❌ 页面回收循环错误: {e}")
                 time.sleep(60)
 
+    def _sample_tab_metrics(self):
+        """采样当前标签页的JS堆、DOM节点数和浏览器进程树内存"""
+        metrics = read_tab_metrics(self.tab)
+        pid = self.get_browser_pid()
+        usage = process_tree_usage(pid) if pid else None
+        self.tab_state.record_metrics(metrics["js_heap_mb"], metrics["dom_nodes"],
+                                      usage[1] / 1024 / 1024 if usage else None)
+
+    def _recycle_tab(self, reason: str):
+        """按策略回收: 预热替换标签页就绪后切换（不中断数据），预热失败时原地刷新"""
+        if self.recycle_policy.action_for(self.tab_state) == RECYCLE_WARM:
+            warm_started = time.time()
+            tab, orderbook = open_warm_tab(self.page, self.url, prepare=self._enable_network_capture)
+            if tab is not None:
+                self._swap_tab(tab)
+                self.last_ready_time = time.time() - warm_started
+                self.tab_state.record_recycle(reason)
+                print(f"✅ 替换标签页已就绪（{self.last_ready_time:.2f}秒），已切换")
+                return
+            print("⚠️  替换标签页未就绪，改为原地刷新")
+
+        self._refresh_page()
+        self.tab_state.record_recycle(reason)
+
+    def _swap_tab(self, tab):
+        """切换抓取标签页（抓取线程下一次循环起使用新标签页），并释放旧标签页"""
+        old = self.tab
+        self.tab = tab
+        self.observing = False  # 观察器安装在旧标签页上，需在新标签页重新安装
+        self._reset_change_detector()
+        try:
+            tab.set.activate()
+            if old is self.page:
+                # 首个标签页由ChromiumPage持有（用于打开标签页和退出浏览器），不关闭，导航到空白页释放内存
+                old.run_cdp('Page.navigate', url='about:blank')
+            else:
+                old.close()
+        except Exception as e:
+            print(f"⚠️  旧标签页释放失败: {e}")
+
     def _refresh_page(self):
         """刷新页面"""
         try:
-            if self.page and self.url:
+            if self.tab and self.url:
                 print("🔄 正在刷新页面...")
 
                 # 使用DrissionPage的refresh方法刷新页面
-                self.page.refresh()
-
-                # 等待页面重新加载
-                time.sleep(BROWSER_WAIT_TIME)
+                refreshed_at = time.time()
+                self.tab.refresh()
+                self._reset_change_detector()
 
                 # 重新执行JavaScript伪装
-                try:
-                    self.page.run_js("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-                    self.page.run_js("Object.defineProperty(navigator, 'platform', {get: () => 'MacIntel'})")
-                    self.page.run_js("Object.defineProperty(navigator, 'userAgent', {get: () => 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'})")
+                if apply_stealth_js(self.tab):
                     print("✅ 页面刷新后JavaScript伪装完成")
-                except Exception as e:
-                    print(f"⚠️  页面刷新后JavaScript伪装失败: {e}")
 
-                # 检查页面是否正常加载
-                if self._check_page_loaded():
+                # 等待订单簿重新渲染
+                if self._wait_ready(refreshed_at) or self._check_page_loaded():
                     print("✅ 页面刷新成功，订单簿数据正常")
                 else:
                     print("⚠️  页面刷新后加载检查失败，但继续运行")
@@ -208,8 +415,9 @@ class LighterClient:
             # 如果刷新失败，尝试重新加载页面
             try:
                 print("🔄 尝试重新加载页面...")
-                self.page.get(self.url)
-                time.sleep(BROWSER_WAIT_TIME)
+                reloaded_at = time.time()
+                self.tab.get(self.url)
+                self._wait_ready(reloaded_at)
                 print("✅ 页面重新加载完成")
             except Exception as reload_error:
                 print(f"❌ 页面重新加载也失败: {reload_error}")
@@ -217,11 +425,11 @@ class LighterClient:
     def _check_page_connection(self) -> bool:
         """检查页面连接状态"""
         try:
-            if not self.page:
+            if not self.tab:
                 return False
 
             # 尝试获取页面标题来检查连接
-            title = self.page.title
+            title = self.tab.title
             return title is not None and len(title) > 0
 
         except Exception as e:
@@ -256,65 +464,24 @@ class LighterClient:
     def _create_page_and_connect(self) -> bool:
         """创建页面并连接"""
         try:
-            # 重新配置浏览器选项
-            co = ChromiumOptions()
-            if self.headless:
-                co.headless()
-
-            # 设置Chrome路径
-            chrome_path = get_chrome_path()
-            if chrome_path:
-                co.set_browser_path(chrome_path)
-
-            # 🎭 伪装成macOS Chrome浏览器
-            macos_user_agent = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            co.set_user_agent(macos_user_agent)
-
-            # 设置macOS相关的首选项
-            co.set_pref('profile.default_content_settings.popups', 0)
-            co.set_pref('credentials_enable_service', False)
-            co.set_pref('profile.default_content_setting_values.notifications', 2)
-
-            # 设置窗口大小和语言
-            co.set_argument('--window-size=1440,900')
-            co.set_argument('--lang=zh-CN,zh,en-US,en')
-
-            # 禁用自动化检测
-            co.set_argument('--disable-blink-features=AutomationControlled')
-            co.set_argument('--disable-web-security')
-            co.set_argument('--disable-features=VizDisplayCompositor')
-
-            # Linux系统特殊配置
-            import platform
-            if platform.system() == 'Linux':
-                co.set_argument('--no-sandbox')
-                co.set_argument('--disable-dev-shm-usage')
-                co.set_argument('--disable-gpu')
-                co.set_argument('--disable-extensions')
-
-            # 其他优化配置
-            co.no_imgs(True)
-            co.mute(True)
-
             # 创建新页面
-            self.page = ChromiumPage(co)
+            reconnect_at = time.time()
+            self.page = ChromiumPage(build_chromium_options(self.headless))
+            self.tab = self.page
+            self.observing = False
+            self.tab_state.record_recycle("页面重连")
+            self._reset_change_detector()
 
             # 执行JavaScript伪装
-            try:
-                self.page.run_js("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-                self.page.run_js("Object.defineProperty(navigator, 'platform', {get: () => 'MacIntel'})")
-                self.page.run_js("Object.defineProperty(navigator, 'userAgent', {get: () => 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'})")
-            except Exception as e:
-                print(f"⚠️  JavaScript伪装失败: {e}")
+            apply_stealth_js(self.tab)
 
             # 访问页面
-            self.page.get(self.url)
+            apply_resource_budget(self.tab)
+            self._enable_network_capture(self.tab)
+            self.tab.get(self.url)
 
-            # 等待页面加载
-            time.sleep(BROWSER_WAIT_TIME)
-
-            # 检查页面是否加载成功
-            if self._check_page_loaded():
+            # 等待订单簿就绪后立即恢复抓取
+            if self._wait_ready(reconnect_at) or self._check_page_loaded():
                 print("✅ 页面重连并加载成功")
                 return True
             else:
@@ -336,12 +503,35 @@ class LighterClient:
                 pass
         self.data.connected = False
     
+    def _wait_ready(self, since: float) -> Optional[AnyOrderBook]:
+        """
+        轮询直到页面渲染出订单簿（替代固定时长等待）
+
+        Args:
+            since: 开始计时的时间戳（启动、刷新或重连的时刻）
+
+        Returns:
+            OrderBook: 第一份有效订单簿，超过BROWSER_WAIT_TIME仍未就绪返回None
+        """
+        orderbook = wait_for_orderbook(self.tab, BROWSER_WAIT_TIME)
+        if orderbook is None:
+            self.ready_timeouts += 1
+            logger.warning("Lighter页面在%s秒内未渲染出订单簿", BROWSER_WAIT_TIME,
+                           extra=log_extra(key="lighter.not_ready"))
+            return None
+
+        self.last_ready_time = time.time() - since
+        if self.time_to_first_book is None:
+            self.time_to_first_book = self.last_ready_time
+        print(f"✅ Lighter订单簿已就绪，耗时{self.last_ready_time:.2f}秒")
+        return orderbook
+
     def _check_page_loaded(self) -> bool:
         """检查页面是否加载完成"""
         try:
             # 检查订单簿容器是否存在
-            asks_container = self.page.ele('@data-testid=orderbook-asks')
-            bids_container = self.page.ele('@data-testid=orderbook-bids')
+            asks_container = self.tab.ele('@data-testid=orderbook-asks')
+            bids_container = self.tab.ele('@data-testid=orderbook-bids')
             return asks_container is not None and bids_container is not None
         except:
             return False
@@ -361,19 +551,26 @@ class LighterClient:
                         time.sleep(10)
                         continue
 
-                orderbook = parse_orderbook_from_page(self.page)
-                if orderbook and orderbook.asks and orderbook.bids:
-                    self.data.orderbook = orderbook
-                    self.data.timestamp = datetime.now()
-                    self.connection_lost_count = 0  # 重置连接丢失计数
-
-                    print(f"Lighter数据更新: 买一=${orderbook.best_bid:.1f}, 卖一=${orderbook.best_ask:.1f}, 中间价=${orderbook.mid_price:.1f}")
-
-                    # 调用回调函数
-                    if self.on_data_callback:
-                        self.on_data_callback(self.data)
+                latency = None  # 轮询抓取的耗时，用于检测页面变慢
+                if self.scrape_mode == 'observer':
+                    changed, orderbook = self._wait_observed_orderbook()
+                    if not changed:
+                        continue
+                elif self.network_mode and time.time() - self.last_frame_time < LIGHTER_NETWORK_STALE_TIME:
+                    # network模式下WebSocket消息正常，由CDP事件回调更新数据
+                    time.sleep(SCRAPE_INTERVAL)
+                    continue
+                else:
+                    scrape_started = time.monotonic()
+                    orderbook = self.parse_orderbook(self.tab)
+                    latency = time.monotonic() - scrape_started
+
+                ok = bool(orderbook and orderbook.asks and orderbook.bids)
+                self.tab_state.record_scrape(ok, latency)
+                if ok:
+                    self._publish_orderbook(orderbook)
                 else:
-                    print("订单簿数据为空或解析失败")
+                    logger.warning("订单簿数据为空或解析失败", extra=log_extra(key="lighter.empty"))
                     self.connection_lost_count += 1
 
                     # 如果连续多次解析失败，可能是连接问题
@@ -381,7 +578,9 @@ class LighterClient:
                         print("🔌 连续解析失败，可能是连接问题，尝试重连...")
                         self._reconnect_page()
 
-                time.sleep(SCRAPE_INTERVAL)  # 按配置间隔更新
+                # observer模式由页面内长轮询控制节奏，无需等待
+                if not self.observing:
+                    time.sleep(SCRAPE_INTERVAL)  # 按配置间隔更新
 
             except Exception as e:
                 error_msg = str(e)
@@ -398,6 +597,97 @@ class LighterClient:
 
                 time.sleep(5)  # 出错时等待5秒再重试
     
+    def _publish_orderbook(self, orderbook: AnyOrderBook):
+        """
+        更新数据并调用回调（与上一份相同的订单簿只计数，不回调）
+
+        可能同时在抓取线程和CDP事件线程中调用，持锁执行：变化检测器不是线程安全的，
+        差异回调也必须按检测顺序发出
+        """
+        with self._publish_lock:
+            self.connection_lost_count = 0  # 重置连接丢失计数
+            self.last_book_time = time.monotonic()  # 数据源存活时间，订单簿没有变化也更新
+
+            diff = self.change_detector.update(orderbook)
+            if diff is None:
+                return
+
+            self.data.orderbook = orderbook
+            self.data.timestamp = datetime.now()
+
+            logger.info("Lighter数据更新: 买一=$%.1f, 卖一=$%.1f, 中间价=$%.1f",
+                        orderbook.best_bid, orderbook.best_ask, orderbook.mid_price,
+                        extra=log_extra(key="lighter.update"))
+
+            # 调用回调函数
+            if self.on_data_callback:
+                self.on_data_callback(self.data)
+            if self.on_diff_callback:
+                self.on_diff_callback(diff)
+
+    def _reset_change_detector(self):
+        """切换、刷新或重连页面后，下一份订单簿作为全量发布（差异消费者据此重建订单簿）"""
+        with self._publish_lock:
+            self.change_detector.reset()
+
+    def _enable_network_capture(self, tab):
+        """
+        network模式: 在打开页面前开启CDP网络事件，监听该标签页WebSocket收到的消息
+
+        每个标签页使用独立的解码器：预热中的替换标签页从自己的全量消息开始维护订单簿，切换后直接接续
+        """
+        if not self.network_mode:
+            return
+        try:
+            decoder = LighterOrderBookDecoder(LIGHTER_MARKET_ID)
+            tab.run_cdp('Network.enable')
+            tab.driver.set_callback('Network.webSocketFrameReceived',
+                                    lambda **kwargs: self._on_ws_frame(tab, decoder, **kwargs))
+            # 页面WebSocket关闭（刷新或断线）后等待重新订阅的全量消息
+            tab.driver.set_callback('Network.webSocketClosed', lambda **kwargs: decoder.reset())
+            print("📡 已开启Lighter WebSocket消息监听")
+        except Exception as e:
+            print(f"⚠️  开启WebSocket消息监听失败，使用DOM抓取: {e}")
+
+    def _on_ws_frame(self, tab, decoder: LighterOrderBookDecoder, **kwargs):
+        """CDP Network.webSocketFrameReceived 回调（DrissionPage事件线程），只发布当前抓取标签页的订单簿"""
+        try:
+            payload = kwargs.get('response', {}).get('payloadData')
+            if not payload:
+                return
+            orderbook = decoder.decode(payload)
+            if orderbook is None or not (orderbook.asks and orderbook.bids) or tab is not self.tab:
+                return
+            self.last_frame_time = time.time()
+            self._publish_orderbook(orderbook)
+        except Exception as e:
+            logger.error("Lighter WebSocket消息解码错误: %s", e, extra=log_extra(key="lighter.frame_error"))
+
+    def _wait_observed_orderbook(self):
+        """
+        observer模式取数: 观察器有效时长轮询等待变化，否则尝试重新安装并退回轮询
+
+        Returns:
+            Tuple[是否有新数据需要处理, 订单簿]
+        """
+        if not self.observing:
+            self.observing = install_orderbook_observer(self.tab)
+            if self.observing:
+                logger.info("Lighter订单簿观察器已安装，切换为推送模式")
+            # 安装前后都先轮询一次，保证刷新后立即有数据
+            return True, self.parse_orderbook(self.tab)
+
+        alive, orderbook = wait_orderbook_update(self.tab, LIGHTER_OBSERVER_TIMEOUT)
+        if not alive:
+            # 页面刷新或订单簿容器被替换，下一轮重新安装，期间按间隔轮询
+            self.observing = False
+            logger.warning("Lighter订单簿观察器已失效，退回轮询模式", extra=log_extra(key="lighter.observer_lost"))
+            return False, None
+
+        if orderbook is None:
+            return False, None  # 超时无变化
+        return True, orderbook
+
     def get_current_data(self) -> LighterData:
         """获取当前数据"""
         return self.data
@@ -405,7 +695,30 @@ class LighterClient:
     def is_connected(self) -> bool:
         """检查连接状态"""
         return self.data.connected and self.running
+
+    def get_change_stats(self) -> Dict[str, int]:
+        """订单簿发布/抑制计数"""
+        return self.change_detector.get_stats()
     
+    def get_browser_pid(self) -> Optional[int]:
+        """浏览器主进程ID（用于资源采样）"""
+        try:
+            return self.page.process_id if self.page else None
+        except Exception:
+            return None
+
+    def get_readiness_stats(self) -> Dict[str, Optional[float]]:
+        """启动/刷新/重连到订单簿就绪的耗时"""
+        return {
+            "time_to_first_book": self.time_to_first_book,
+            "last_ready_time": self.last_ready_time,
+            "ready_timeouts": self.ready_timeouts,
+        }
+
+    def get_tab_stats(self) -> Dict[str, Any]:
+        """当前标签页的资源指标和回收统计"""
+        return self.tab_state.to_dict()
+
     def get_orderbook_summary(self) -> str:
         """获取订单簿摘要"""
         if not self.data.orderbook:
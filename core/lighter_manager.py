@@ -3,36 +3,70 @@
 
 """
 Lighter客户端管理器
-自动选择最适合的客户端实现（DrissionPage或Selenium）
+自动选择最适合的客户端实现（DrissionPage、Selenium或无浏览器的原生WebSocket）
+可选热备: 同时运行一个备用客户端，主客户端数据停滞时切换回调数据源
 """
 
 import platform
-from typing import Callable, Optional
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
 from data.models import LighterData
+from core.orderbook_diff import OrderBookChangeDetector, OrderBookDiff
+from config import LIGHTER_STANDBY_TYPE, LIGHTER_STALE_TIMEOUT, LIGHTER_WATCHDOG_INTERVAL, PAGE_REFRESH_INTERVAL
 
-# 尝试导入不同的客户端实现
+# 尝试导入不同的客户端实现: 各客户端模块自己捕获浏览器/WebSocket库的ImportError，
+# 模块能导入不代表可用，可用性以模块导出的标志为准
 try:
-    from core.lighter_client import LighterClient
-    DRISSION_AVAILABLE = True
+    from core.lighter_client import DRISSION_AVAILABLE, LighterClient
 except ImportError:
     DRISSION_AVAILABLE = False
 
 try:
-    from core.lighter_selenium_client import LighterSeleniumClient
-    SELENIUM_AVAILABLE = True
+    from core.lighter_selenium_client import SELENIUM_AVAILABLE, LighterSeleniumClient
 except ImportError:
     SELENIUM_AVAILABLE = False
 
+try:
+    from core.async_engine import WEBSOCKETS_AVAILABLE as NATIVE_AVAILABLE
+    from core.lighter_ws_client import LighterWSClient
+except ImportError:
+    NATIVE_AVAILABLE = False
+
 class LighterManager:
     """Lighter客户端管理器"""
     
-    def __init__(self, on_data_callback: Callable[[LighterData], None], headless: bool = True, refresh_interval: int = 300):
+    def __init__(self, on_data_callback: Callable[[LighterData], None], headless: bool = True,
+                 refresh_interval: int = PAGE_REFRESH_INTERVAL, standby_type: str = LIGHTER_STANDBY_TYPE,
+                 on_diff_callback: Optional[Callable[[OrderBookDiff], None]] = None):
+        """
+        初始化客户端管理器
+
+        Args:
+            on_data_callback: 数据回调函数
+            headless: 是否使用无头模式
+            refresh_interval: DrissionPage页面最长存活时间（秒），默认1小时；资源超出预算时提前回收标签页
+            standby_type: 热备客户端类型 ("drissionpage"、"selenium" 或 "native")，为空时不启用热备
+            on_diff_callback: 逐档差异回调，订单簿未变化时不调用；热备模式或客户端不支持差异时由管理器计算
+        """
         self.on_data_callback = on_data_callback
+        self.on_diff_callback = on_diff_callback
         self.headless = headless
         self.refresh_interval = refresh_interval
         self.client = None
         self.client_type = None
 
+        # 热备: 两个客户端同时运行，只转发当前数据源的数据
+        self.standby_type = (standby_type or "").lower()
+        self.standby = None
+        self.active = "primary"              # 当前数据源: primary / standby
+        self.switchovers = 0                 # 数据源切换次数
+        self.dedup = OrderBookChangeDetector()  # 切换前后两个数据源的重复订单簿只转发一次
+        self.lock = threading.Lock()
+        self.publish_lock = threading.Lock()  # 主/备回调线程按检测顺序发出差异
+        self.running = False
+        self.watchdog_thread = None
+
         # 选择最适合的客户端
         self.client = self._select_best_client()
     
@@ -46,41 +80,215 @@ class LighterManager:
         if DRISSION_AVAILABLE:
             print(f"🎭 {system}系统，优先使用DrissionPage客户端（已解决伪装问题）")
             self.client_type = "DrissionPage"
-            return LighterClient(self.on_data_callback, self.headless, self.refresh_interval)
+            return LighterClient(self.on_data_callback, self.headless, self.refresh_interval,
+                                 on_diff_callback=self.on_diff_callback)
         elif SELENIUM_AVAILABLE:
             print(f"⚠️  DrissionPage不可用，使用Selenium客户端作为备选")
             self.client_type = "Selenium"
             return LighterSeleniumClient(self.on_data_callback, self.headless)
+        elif NATIVE_AVAILABLE:
+            print(f"⚠️  浏览器客户端均不可用，使用原生WebSocket客户端")
+            self.client_type = "Native"
+            return LighterWSClient(self.on_data_callback, on_diff_callback=self.on_diff_callback)
         else:
             print("❌ 没有可用的Lighter客户端实现")
             return None
     
-    def start(self, url: str = "https://app.lighter.xyz/trade/BTC?locale=zh"):
-        """启动Lighter连接"""
+    def start(self, url: str = "https://app.lighter.xyz/trade/BTC?locale=zh", engine=None):
+        """
+        启动Lighter连接
+
+        Args:
+            url: Lighter交易页面地址（原生客户端忽略页面地址）
+            engine: 共享的异步采集引擎（仅原生客户端使用）
+        """
         if not self.client:
             print("❌ 没有可用的Lighter客户端")
             return False
         
+        if self.standby_type:
+            return self._start_with_standby(url, engine)
+
+        if self.on_diff_callback and not hasattr(self.client, 'on_diff_callback'):
+            # 客户端不计算逐档差异（Selenium），数据经管理器的检测器计算差异后转发
+            self.client.on_data_callback = self._make_callback("primary")
+
         print(f"🚀 启动{self.client_type}客户端...")
-        return self.client.start(url)
-    
+        return self._start_client(self.client, url, engine)
+
+    def _start_client(self, client, url: str, engine=None) -> bool:
+        """启动单个客户端（engine仅传给原生客户端）"""
+        if NATIVE_AVAILABLE and isinstance(client, LighterWSClient):
+            return client.start(url, engine)
+        return client.start(url)
+
+    def _create_client(self, client_type: str, on_data_callback: Callable[[LighterData], None]):
+        """按类型创建客户端，类型不可用时返回None"""
+        if client_type == "drissionpage" and DRISSION_AVAILABLE:
+            return LighterClient(on_data_callback, self.headless, self.refresh_interval)
+        if client_type == "selenium" and SELENIUM_AVAILABLE:
+            return LighterSeleniumClient(on_data_callback, self.headless)
+        if client_type == "native" and NATIVE_AVAILABLE:
+            # 主客户端也可能是原生客户端，重连统计分开记录
+            return LighterWSClient(on_data_callback, feed_name="lighter_standby")
+        return None
+
+    def _start_with_standby(self, url: str, engine=None) -> bool:
+        """启动主客户端和热备客户端，两者的回调都经过数据源选择和去重"""
+        self.standby = self._create_client(self.standby_type, self._make_callback("standby"))
+        if self.standby is None:
+            print(f"⚠️  热备客户端类型 '{self.standby_type}' 不可用，只启动主客户端")
+            print(f"🚀 启动{self.client_type}客户端...")
+            return self._start_client(self.client, url, engine)
+
+        self.client.on_data_callback = self._make_callback("primary")
+        # 差异按转发出去的订单簿序列计算（切换数据源时相对上一份转发的订单簿），不使用客户端各自的差异
+        if hasattr(self.client, 'on_diff_callback'):
+            self.client.on_diff_callback = None
+
+        print(f"🚀 启动{self.client_type}客户端 (热备: {self.standby_type})...")
+        primary_ok = self._start_client(self.client, url, engine)
+        standby_ok = self._start_client(self.standby, url, engine)
+        if not (primary_ok or standby_ok):
+            return False
+
+        # 主客户端启动失败时直接由热备提供数据，主客户端恢复后按停滞检测切回
+        self.active = "primary" if primary_ok else "standby"
+        self.running = True
+        self.watchdog_thread = threading.Thread(target=self._watchdog_loop, name="lighter-watchdog", daemon=True)
+        self.watchdog_thread.start()
+        print(f"✅ Lighter热备已启用，当前数据源: {self.active}")
+        return True
+
+    def _make_callback(self, source: str) -> Callable[[LighterData], None]:
+        """为主/备客户端生成回调，记录数据源后统一处理"""
+        def callback(data: LighterData):
+            self._on_client_data(source, data)
+        return callback
+
+    def _on_client_data(self, source: str, data: LighterData):
+        """只转发当前数据源的数据；当前数据源停滞而另一方有新数据时立即切换"""
+        with self.publish_lock:
+            with self.lock:
+                if source != self.active:
+                    if not self._is_stale(self._source_client(self.active)):
+                        return
+                    self._switch_to(source)
+
+                # 切换前后两个数据源可能给出相同的订单簿，只转发一次
+                diff = self.dedup.update(data.orderbook) if data.orderbook is not None else None
+                if diff is None:
+                    return
+
+            if self.on_data_callback:
+                self.on_data_callback(data)
+            if self.on_diff_callback:
+                self.on_diff_callback(diff)
+
+    def _watchdog_loop(self):
+        """停滞检测: 当前数据源超过LIGHTER_STALE_TIMEOUT无新数据且另一方数据新鲜时切换"""
+        while self.running:
+            time.sleep(LIGHTER_WATCHDOG_INTERVAL)
+            with self.lock:
+                other = "standby" if self.active == "primary" else "primary"
+                if self._is_stale(self._source_client(self.active)) and not self._is_stale(self._source_client(other)):
+                    self._switch_to(other)
+
+    def _switch_to(self, source: str):
+        """切换数据源（调用方持有锁）"""
+        stale_for = self._data_age(self._source_client(self.active))
+        print(f"🔀 Lighter数据源 {self.active} 已停滞{stale_for:.1f}秒，切换到 {source}")
+        self.active = source
+        self.switchovers += 1
+
+    def _source_client(self, source: str):
+        return self.standby if source == "standby" else self.client
+
+    @staticmethod
+    def _data_age(client) -> float:
+        """
+        客户端最近一次成功抓取/收到订单簿距今的秒数，没有数据时为无穷大
+
+        按last_book_time计算而不是数据时间戳: 订单簿没有变化时客户端不发布、时间戳不前进，
+        但数据源仍然正常，不能视为停滞
+        """
+        if client is None:
+            return float("inf")
+        data = client.get_current_data()
+        if not data.connected or data.orderbook is None or not client.last_book_time:
+            return float("inf")
+        return time.monotonic() - client.last_book_time
+
+    def _is_stale(self, client) -> bool:
+        return self._data_age(client) > LIGHTER_STALE_TIMEOUT
+
     def stop(self):
         """停止Lighter连接"""
+        self.running = False
         if self.client:
             self.client.stop()
+        if self.standby:
+            self.standby.stop()
     
     def get_current_data(self) -> LighterData:
         """获取当前数据"""
-        if self.client:
-            return self.client.get_current_data()
+        client = self._source_client(self.active)
+        if client:
+            return client.get_current_data()
         return LighterData()
     
     def is_connected(self) -> bool:
-        """检查连接状态"""
-        if self.client:
-            return self.client.is_connected()
-        return False
+        """检查连接状态（热备模式下任一客户端连接即可）"""
+        return any(client.is_connected() for client in (self.client, self.standby) if client)
     
+    def get_change_stats(self) -> Dict[str, int]:
+        """订单簿发布/抑制计数（客户端不支持时为空）"""
+        client = self._source_client(self.active)
+        if client and hasattr(client, 'get_change_stats'):
+            return client.get_change_stats()
+        return {}
+
+    def get_readiness_stats(self) -> Dict[str, Optional[float]]:
+        """启动/重连到订单簿就绪的耗时（客户端不支持时为空）"""
+        client = self._source_client(self.active)
+        if client and hasattr(client, 'get_readiness_stats'):
+            return client.get_readiness_stats()
+        return {}
+
+    def get_browser_pids(self) -> Dict[str, Optional[int]]:
+        """各浏览器客户端的根进程ID（原生客户端没有浏览器，不包含在内）"""
+        pids = {}
+        for name, client in (("lighter", self.client), ("lighter_standby", self.standby)):
+            if client and hasattr(client, 'get_browser_pid'):
+                pids[name] = client.get_browser_pid()
+        return pids
+
+    def get_failover_stats(self) -> Dict[str, Any]:
+        """热备状态（未启用热备时为空）"""
+        if self.standby is None:
+            return {}
+        with self.lock:
+            ages = {source: self._data_age(self._source_client(source)) for source in ("primary", "standby")}
+        return {
+            "active": self.active,
+            "standby_type": self.standby_type,
+            "switchovers": self.switchovers,
+            "primary_age": None if ages["primary"] == float("inf") else round(ages["primary"], 2),
+            "standby_age": None if ages["standby"] == float("inf") else round(ages["standby"], 2),
+            "duplicates_dropped": self.dedup.suppressed,
+        }
+
+    def get_feed_stats(self) -> Dict[str, Any]:
+        """/api/feeds中的Lighter统计: 变化检测、就绪耗时、标签页资源指标和热备状态"""
+        stats: Dict[str, Any] = {**self.get_change_stats(), **self.get_readiness_stats()}
+        client = self._source_client(self.active)
+        if client and hasattr(client, 'get_tab_stats'):
+            stats["tab"] = client.get_tab_stats()
+        failover = self.get_failover_stats()
+        if failover:
+            stats["failover"] = failover
+        return stats
+
     def get_client_type(self) -> str:
         """获取当前使用的客户端类型"""
         return self.client_type or "None"
@@ -88,15 +296,20 @@ class LighterManager:
 def create_lighter_client(on_data_callback: Callable[[LighterData], None],
                          headless: bool = True,
                          force_type: Optional[str] = None,
-                         refresh_interval: int = 300) -> LighterManager:
+                         refresh_interval: int = PAGE_REFRESH_INTERVAL,
+                         standby_type: str = LIGHTER_STANDBY_TYPE,
+                         on_diff_callback: Optional[Callable[[OrderBookDiff], None]] = None) -> LighterManager:
     """
     创建Lighter客户端
 
     Args:
         on_data_callback: 数据回调函数
         headless: 是否使用无头模式
-        force_type: 强制使用特定类型 ("selenium" 或 "drissionpage")
-        refresh_interval: 页面刷新间隔（秒），默认5分钟
+        force_type: 强制使用特定类型 ("selenium"、"drissionpage" 或 "native")
+        refresh_interval: DrissionPage页面最长存活时间（秒），默认1小时；JS堆、DOM节点、进程内存或抓取耗时
+                          超出预算时提前回收标签页，到期回收只是兜底
+        standby_type: 热备客户端类型，为空时不启用热备
+        on_diff_callback: 逐档差异回调（只包含变化的档位），订单簿未变化时不调用
 
     Returns:
         LighterManager: 客户端管理器
@@ -106,19 +319,27 @@ def create_lighter_client(on_data_callback: Callable[[LighterData], None],
         
         if force_type == "selenium" and SELENIUM_AVAILABLE:
             print("🔧 强制使用Selenium客户端")
-            manager = LighterManager(on_data_callback, headless, refresh_interval)
+            manager = LighterManager(on_data_callback, headless, refresh_interval, standby_type, on_diff_callback)
             manager.client = LighterSeleniumClient(on_data_callback, headless)
             manager.client_type = "Selenium"
             return manager
 
         elif force_type == "drissionpage" and DRISSION_AVAILABLE:
             print("🔧 强制使用DrissionPage客户端")
-            manager = LighterManager(on_data_callback, headless, refresh_interval)
-            manager.client = LighterClient(on_data_callback, headless, refresh_interval)
+            manager = LighterManager(on_data_callback, headless, refresh_interval, standby_type, on_diff_callback)
+            manager.client = LighterClient(on_data_callback, headless, refresh_interval,
+                                           on_diff_callback=on_diff_callback)
             manager.client_type = "DrissionPage"
             return manager
         
+        elif force_type == "native" and NATIVE_AVAILABLE:
+            print("🔧 强制使用原生WebSocket客户端（不启动浏览器）")
+            manager = LighterManager(on_data_callback, headless, refresh_interval, standby_type, on_diff_callback)
+            manager.client = LighterWSClient(on_data_callback, on_diff_callback=on_diff_callback)
+            manager.client_type = "Native"
+            return manager
+
         else:
             print(f"⚠️  强制类型 '{force_type}' 不可用，使用自动选择")
     
-    return LighterManager(on_data_callback, headless, refresh_interval)
+    return LighterManager(on_data_callback, headless, refresh_interval, standby_type, on_diff_callback)
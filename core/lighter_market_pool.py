@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Lighter多市场标签页池
+一个Chromium进程打开多个市场的标签页，每个标签页由独立线程抓取，按回收策略预热替换、刷新或重开
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+try:
+    from DrissionPage import ChromiumPage
+    DRISSION_AVAILABLE = True
+except ImportError:
+    DRISSION_AVAILABLE = False
+
+from data.models import LighterData
+from core.lighter_client import (build_chromium_options, apply_stealth_js, apply_resource_budget,
+                                 read_tab_metrics, open_warm_tab)
+from core.orderbook_utils import parse_orderbook_via_js, wait_for_orderbook
+from core.html_orderbook_parser import parse_orderbook_via_html
+from core.orderbook_diff import OrderBookChangeDetector
+from core.tab_recycler import TabRecyclePolicy, TabState, RECYCLE_REOPEN, RECYCLE_WARM
+from core.logger import get_logger, log_extra
+from config import (BROWSER_WAIT_TIME, SCRAPE_INTERVAL, LIGHTER_MARKETS, LIGHTER_MARKET_URL, LIGHTER_SCRAPE_MODE,
+                    TAB_METRICS_INTERVAL)
+
+logger = get_logger("lighter_pool")
+
+class MarketTab:
+    """单个市场的标签页和抓取线程"""
+
+    def __init__(self, pool: "LighterMarketPool", symbol: str, url: str):
+        self.pool = pool
+        self.symbol = symbol
+        self.url = url
+        self.tab = None
+        self.data = LighterData(symbol=symbol)
+        self.state = TabState()
+        self.change_detector = OrderBookChangeDetector()  # 订单簿未变化时不回调
+        self.thread = None
+        self.warming = False      # 是否正在后台预热替换标签页
+        self.retired_tab = None   # 已被替换、等待抓取线程关闭的旧标签页
+        self.last_metrics_time = 0.0
+
+    def open(self):
+        """在共享浏览器中打开标签页（先设置请求拦截，再导航，页面在后台加载）"""
+        self.tab = self.pool.browser.new_tab()
+        apply_resource_budget(self.tab)
+        self.tab.run_cdp('Page.navigate', url=self.url)
+        apply_stealth_js(self.tab)
+
+    def start(self):
+        """启动抓取线程"""
+        self.thread = threading.Thread(target=self._scrape_loop, name=f"lighter-{self.symbol}", daemon=True)
+        self.thread.start()
+
+    def _scrape_loop(self):
+        """抓取循环: 等待首份订单簿后按间隔抓取，每次抓取后采样指标并检查回收策略"""
+        self._wait_ready()
+
+        while self.pool.running:
+            try:
+                # 旧标签页在抓取线程中关闭，避免关闭正在抓取的标签页；替换后的第一份订单簿作为全量发布
+                if self.retired_tab is not None:
+                    self._close_tab(self.retired_tab)
+                    self.retired_tab = None
+                    self.change_detector.reset()
+
+                scrape_started = time.monotonic()
+                orderbook = self.pool.parse_orderbook(self.tab)
+                ok = bool(orderbook and orderbook.asks and orderbook.bids)
+                self.state.record_scrape(ok, time.monotonic() - scrape_started)
+
+                if ok and self.change_detector.update(orderbook) is not None:
+                    self.data.orderbook = orderbook
+                    self.data.timestamp = datetime.now()
+                    self.data.connected = True
+                    logger.info("Lighter %s数据更新: 买一=$%.4f, 卖一=$%.4f", self.symbol,
+                                orderbook.best_bid, orderbook.best_ask,
+                                extra=log_extra(key=f"lighter_pool.update.{self.symbol}"))
+                    if self.pool.on_data_callback:
+                        self.pool.on_data_callback(self.data)
+
+                self._sample_metrics()
+                reason = self.pool.recycle_policy.check(self.state)
+                if reason and not self.warming:
+                    self._recycle(reason)
+
+            except Exception as e:
+                self.state.record_scrape(False)
+                logger.error("Lighter %s抓取错误: %s", self.symbol, e,
+                             extra=log_extra(key=f"lighter_pool.error.{self.symbol}"))
+
+            time.sleep(SCRAPE_INTERVAL)
+
+    def _wait_ready(self):
+        """等待页面渲染出订单簿（超时也继续，由失败计数触发重开）"""
+        if wait_for_orderbook(self.tab, BROWSER_WAIT_TIME) is not None:
+            self.state.record_ready()
+        else:
+            logger.warning("Lighter %s页面在%s秒内未就绪", self.symbol, BROWSER_WAIT_TIME,
+                           extra=log_extra(key=f"lighter_pool.not_ready.{self.symbol}"))
+
+    def _sample_metrics(self):
+        """按TAB_METRICS_INTERVAL采样JS堆和DOM节点数（共享浏览器的进程内存无法归属到单个标签页，不采样）"""
+        now = time.monotonic()
+        if now - self.last_metrics_time < TAB_METRICS_INTERVAL:
+            return
+        self.last_metrics_time = now
+        try:
+            self.state.record_metrics(**read_tab_metrics(self.tab))
+        except Exception as e:
+            logger.warning("Lighter %s标签页指标采样失败: %s", self.symbol, e,
+                           extra=log_extra(key=f"lighter_pool.metrics_error.{self.symbol}"))
+
+    def _recycle(self, reason: str):
+        """按策略回收: warm在后台预热替换标签页（当前标签页继续抓取），refresh/reopen同步执行"""
+        action = self.pool.recycle_policy.action_for(self.state)
+        print(f"♻️  Lighter {self.symbol}标签页{reason}，执行{action}")
+        if action == RECYCLE_WARM:
+            self.warming = True
+            threading.Thread(target=self._warm_replace, args=(reason,), name=f"lighter-{self.symbol}-warm",
+                             daemon=True).start()
+            return
+
+        self.data.connected = False
+        try:
+            if action == RECYCLE_REOPEN:
+                self.close()
+                self.open()
+            else:
+                self.tab.refresh()
+                apply_stealth_js(self.tab)
+        except Exception as e:
+            print(f"❌ Lighter {self.symbol}标签页回收失败: {e}")
+        self.state.record_recycle(reason)
+        # 刷新/重开后页面内容可能与之前相同，重新发布全量以恢复连接状态
+        self.change_detector.reset()
+        self._wait_ready()
+
+    def _warm_replace(self, reason: str):
+        """预热替换标签页，订单簿就绪后切换；未就绪时保留当前标签页"""
+        try:
+            warm_started = time.monotonic()
+            tab, _ = open_warm_tab(self.pool.browser, self.url)
+            if tab is None:
+                print(f"⚠️  Lighter {self.symbol}替换标签页未就绪，保留当前标签页")
+                return
+            self.retired_tab, self.tab = self.tab, tab
+            self.state.record_recycle(reason)
+            self.state.record_ready(time.monotonic() - warm_started)
+            print(f"✅ Lighter {self.symbol}已切换到替换标签页")
+        finally:
+            self.warming = False
+
+    @staticmethod
+    def _close_tab(tab):
+        try:
+            tab.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """关闭标签页"""
+        if self.tab is not None:
+            self._close_tab(self.tab)
+            self.tab = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """标签页统计"""
+        stats = self.state.to_dict()
+        stats.update(self.change_detector.get_stats())
+        stats["connected"] = self.data.connected
+        return stats
+
+
+class LighterMarketPool:
+    """Lighter多市场标签页池 - 共享一个浏览器进程"""
+
+    def __init__(self, on_data_callback: Callable[[LighterData], None], symbols: Sequence[str] = LIGHTER_MARKETS,
+                 headless: bool = True, recycle_policy: Optional[TabRecyclePolicy] = None,
+                 url_template: str = LIGHTER_MARKET_URL, scrape_mode: str = LIGHTER_SCRAPE_MODE):
+        """
+        初始化标签页池
+
+        Args:
+            on_data_callback: 数据回调函数（LighterData.symbol区分市场）
+            symbols: 市场符号列表
+            headless: 是否使用无头模式
+            recycle_policy: 标签页回收策略，不传使用默认策略
+            url_template: 市场页面地址模板，{symbol}会被替换
+            scrape_mode: 'html' 取回容器HTML在共享工作进程中解析（多个标签页的解析分摊到多个核心），其他为单次run_js抓取
+        """
+        self.on_data_callback = on_data_callback
+        self.symbols: List[str] = list(symbols)
+        self.headless = headless
+        self.recycle_policy = recycle_policy or TabRecyclePolicy()
+        self.url_template = url_template
+        self.parse_orderbook = parse_orderbook_via_html if scrape_mode == 'html' else parse_orderbook_via_js
+        self.browser = None
+        self.tabs: Dict[str, MarketTab] = {}
+        self.running = False
+
+        if not DRISSION_AVAILABLE:
+            print("⚠️  DrissionPage未安装")
+
+    def start(self) -> bool:
+        """启动浏览器并为每个市场打开标签页"""
+        if not DRISSION_AVAILABLE:
+            print("❌ DrissionPage不可用")
+            return False
+
+        try:
+            print(f"🔷 启动Lighter多市场标签页池: {', '.join(self.symbols)}")
+            self.browser = ChromiumPage(build_chromium_options(self.headless, verbose=True))
+            self.running = True
+
+            # 依次打开标签页（页面并行加载），再各自启动抓取线程
+            for symbol in self.symbols:
+                tab = MarketTab(self, symbol, self.url_template.format(symbol=symbol))
+                tab.open()
+                self.tabs[symbol] = tab
+            for tab in self.tabs.values():
+                tab.start()
+
+            print(f"✅ Lighter标签页池已启动 ({len(self.tabs)}个市场, 1个浏览器进程)")
+            return True
+
+        except Exception as e:
+            print(f"❌ Lighter标签页池启动失败: {e}")
+            self.stop()
+            return False
+
+    def stop(self):
+        """停止抓取并关闭浏览器"""
+        self.running = False
+        for tab in self.tabs.values():
+            if tab.thread:
+                tab.thread.join(timeout=SCRAPE_INTERVAL + 5)
+            tab.data.connected = False
+        if self.browser:
+            try:
+                self.browser.quit()
+                print("✅ Lighter标签页池浏览器已关闭")
+            except Exception:
+                pass
+            self.browser = None
+
+    def get_current_data(self, symbol: Optional[str] = None) -> Optional[LighterData]:
+        """
+        获取当前数据
+
+        Args:
+            symbol: 市场符号，不传返回第一个市场
+        """
+        symbol = symbol or (self.symbols[0] if self.symbols else None)
+        tab = self.tabs.get(symbol)
+        return tab.data if tab else None
+
+    def is_connected(self) -> bool:
+        """任一市场有数据即视为已连接"""
+        return self.running and any(tab.data.connected for tab in self.tabs.values())
+
+    def get_browser_pid(self) -> Optional[int]:
+        """共享浏览器主进程ID（用于资源采样）"""
+        try:
+            return self.browser.process_id if self.browser else None
+        except Exception:
+            return None
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """各市场标签页统计"""
+        return {symbol: tab.get_stats() for symbol, tab in self.tabs.items()}
+
+# 测试函数
+def test_lighter_market_pool():
+    """测试Lighter多市场标签页池"""
+    def on_data(data: LighterData):
+        ob = data.orderbook
+        print(f"Lighter {data.symbol} - 买一: {ob.best_bid}, 卖一: {ob.best_ask}")
+
+    pool = LighterMarketPool(on_data)
+
+    try:
+        if pool.start():
+            print("按 Ctrl+C 停止...")
+            while True:
+                time.sleep(1)
+    except KeyboardInterrupt:
+        print("\n停止测试...")
+    finally:
+        pool.stop()
+
+if __name__ == "__main__":
+    test_lighter_market_pool()
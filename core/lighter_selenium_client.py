@@ -10,33 +10,129 @@ import time
 import threading
 import platform
 from datetime import datetime
-from typing import Callable, Optional
+from typing import Callable, Dict, Optional
 
 try:
     from selenium import webdriver
     from selenium.webdriver.chrome.options import Options
     from selenium.webdriver.chrome.service import Service
     from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    from selenium.common.exceptions import TimeoutException, WebDriverException
+    from selenium.common.exceptions import WebDriverException
     SELENIUM_AVAILABLE = True
 except ImportError:
     SELENIUM_AVAILABLE = False
 
-from data.models import LighterData, OrderBook, OrderBookLevel, OrderType
-from config import get_chrome_path
+from data.models import AnyOrderBook, CompactOrderBook, LighterData, OrderBook, OrderBookLevel, OrderType
+from core.orderbook_utils import ORDERBOOK_EXTRACT_JS, parse_orderbook_arrays, wait_for_orderbook
+from core.lighter_client import build_panel_hide_js
+from core.logger import get_logger, log_extra
+from config import (get_chrome_path, BROWSER_WAIT_TIME, SELENIUM_SCRAPE_MODE, SELENIUM_SCRAPE_INTERVAL,
+                    LIGHTER_RESOURCE_BUDGET, LIGHTER_BLOCKED_URLS)
+
+logger = get_logger("lighter_selenium")
+
+def build_chrome_options(headless: bool = True) -> "Options":
+    """构建Selenium Chrome启动参数（无头、macOS伪装、禁用图片/CSS）"""
+    # 配置Chrome选项
+    chrome_options = Options()
+
+    # 无头模式
+    if headless:
+        chrome_options.add_argument('--headless')
+        print("🔇 使用无头模式")
+
+    # Ubuntu必需参数
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--disable-extensions')
+    chrome_options.add_argument('--disable-web-security')
+    chrome_options.add_argument('--disable-features=VizDisplayCompositor')
+    chrome_options.add_argument('--disable-background-timer-throttling')
+    chrome_options.add_argument('--disable-backgrounding-occluded-windows')
+    chrome_options.add_argument('--disable-renderer-backgrounding')
+
+    # 🎭 伪装成macOS Chrome浏览器
+    macos_user_agent = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    chrome_options.add_argument(f'--user-agent={macos_user_agent}')
+    print("🎭 伪装成macOS Chrome浏览器")
+
+    # 设置窗口大小（模拟macOS常见分辨率）
+    chrome_options.add_argument('--window-size=1440,900')
+
+    # 设置语言和地区
+    chrome_options.add_argument('--lang=zh-CN,zh,en-US,en')
+
+    # 禁用自动化检测
+    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+
+    # 设置首选项（模拟macOS环境）
+    prefs = {
+        "profile.default_content_setting_values.notifications": 2,
+        "profile.default_content_settings.popups": 0,
+        "profile.managed_default_content_settings.images": 1,  # 允许图片加载
+        "profile.default_content_setting_values.geolocation": 2,
+        "profile.managed_default_content_settings.media_stream": 2,
+        # 模拟macOS字体设置
+        "webkit.webprefs.fonts.standard.Zyyy": "SF Pro Display",
+        "webkit.webprefs.fonts.serif.Zyyy": "Times",
+        "webkit.webprefs.fonts.sansserif.Zyyy": "SF Pro Display",
+        "webkit.webprefs.fonts.fixed.Zyyy": "SF Mono"
+    }
+    chrome_options.add_experimental_option("prefs", prefs)
+    
+    # 内存和性能优化
+    chrome_options.add_argument('--memory-pressure-off')
+    chrome_options.add_argument('--max_old_space_size=4096')
+    chrome_options.add_argument('--aggressive-cache-discard')
+    chrome_options.add_argument('--disable-background-networking')
+    
+    # 禁用图片和CSS（提高速度）
+    prefs = {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+        "profile.managed_default_content_settings.stylesheets": 2,
+    }
+    chrome_options.add_experimental_option("prefs", prefs)
+    
+    # 设置Chrome路径
+    chrome_path = get_chrome_path()
+    if chrome_path:
+        chrome_options.binary_location = chrome_path
+        print(f"🌐 使用Chrome路径: {chrome_path}")
+
+    return chrome_options
 
 class LighterSeleniumClient:
     """Lighter Selenium客户端 - Ubuntu兼容版"""
 
-    def __init__(self, on_data_callback: Callable[[LighterData], None], headless: bool = True):
+    def __init__(self, on_data_callback: Callable[[LighterData], None], headless: bool = True,
+                 scrape_mode: str = SELENIUM_SCRAPE_MODE, scrape_interval: float = SELENIUM_SCRAPE_INTERVAL):
+        """
+        初始化Selenium客户端
+
+        Args:
+            on_data_callback: 数据回调函数
+            headless: 是否使用无头模式
+            scrape_mode: 订单簿抓取方式，'js'为单次execute_script返回全部档位，'dom'为逐个元素查询
+            scrape_interval: 抓取间隔（秒）
+        """
         self.on_data_callback = on_data_callback
         self.headless = headless
+        self.scrape_mode = scrape_mode
+        self.scrape_interval = scrape_interval
+        # 'dom'模式每档位需要4次WebDriver HTTP往返，'js'模式每次抓取只需1次
+        self.parse_orderbook = self._parse_orderbook if scrape_mode == 'dom' else self._parse_orderbook_js
         self.driver = None
         self.data = LighterData()
         self.running = False
         self.scrape_thread = None
+        self.last_book_time = 0.0  # 最近一次成功抓取出订单簿的时间 (monotonic)
+        self.started_at = 0.0
+        self.time_to_first_book: Optional[float] = None  # 启动到第一份订单簿的耗时（秒）
+        self.ready_timeouts = 0                          # 超过BROWSER_WAIT_TIME仍未就绪的次数
 
         if not SELENIUM_AVAILABLE:
             print("⚠️  Selenium未安装，请运行: pip3 install selenium")
@@ -46,80 +142,14 @@ class LighterSeleniumClient:
         if not SELENIUM_AVAILABLE:
             print("❌ Selenium不可用")
             return False
-        
+
+        self.started_at = time.time()
+
         try:
             print("🔷 启动Selenium Lighter客户端...")
 
-            # 配置Chrome选项
-            chrome_options = Options()
-
-            # 无头模式
-            if self.headless:
-                chrome_options.add_argument('--headless')
-                print("🔇 使用无头模式")
-
-            # Ubuntu必需参数
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--disable-extensions')
-            chrome_options.add_argument('--disable-web-security')
-            chrome_options.add_argument('--disable-features=VizDisplayCompositor')
-            chrome_options.add_argument('--disable-background-timer-throttling')
-            chrome_options.add_argument('--disable-backgrounding-occluded-windows')
-            chrome_options.add_argument('--disable-renderer-backgrounding')
-
-            # 🎭 伪装成macOS Chrome浏览器
-            macos_user_agent = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            chrome_options.add_argument(f'--user-agent={macos_user_agent}')
-            print("🎭 伪装成macOS Chrome浏览器")
-
-            # 设置窗口大小（模拟macOS常见分辨率）
-            chrome_options.add_argument('--window-size=1440,900')
-
-            # 设置语言和地区
-            chrome_options.add_argument('--lang=zh-CN,zh,en-US,en')
-
-            # 禁用自动化检测
-            chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            chrome_options.add_experimental_option('useAutomationExtension', False)
-
-            # 设置首选项（模拟macOS环境）
-            prefs = {
-                "profile.default_content_setting_values.notifications": 2,
-                "profile.default_content_settings.popups": 0,
-                "profile.managed_default_content_settings.images": 1,  # 允许图片加载
-                "profile.default_content_setting_values.geolocation": 2,
-                "profile.managed_default_content_settings.media_stream": 2,
-                # 模拟macOS字体设置
-                "webkit.webprefs.fonts.standard.Zyyy": "SF Pro Display",
-                "webkit.webprefs.fonts.serif.Zyyy": "Times",
-                "webkit.webprefs.fonts.sansserif.Zyyy": "SF Pro Display",
-                "webkit.webprefs.fonts.fixed.Zyyy": "SF Mono"
-            }
-            chrome_options.add_experimental_option("prefs", prefs)
-            
-            # 内存和性能优化
-            chrome_options.add_argument('--memory-pressure-off')
-            chrome_options.add_argument('--max_old_space_size=4096')
-            chrome_options.add_argument('--aggressive-cache-discard')
-            chrome_options.add_argument('--disable-background-networking')
-            
-            # 禁用图片和CSS（提高速度）
-            prefs = {
-                "profile.managed_default_content_settings.images": 2,
-                "profile.default_content_setting_values.notifications": 2,
-                "profile.managed_default_content_settings.stylesheets": 2,
-            }
-            chrome_options.add_experimental_option("prefs", prefs)
-            
-            # 设置Chrome路径
-            chrome_path = get_chrome_path()
-            if chrome_path:
-                chrome_options.binary_location = chrome_path
-                print(f"🌐 使用Chrome路径: {chrome_path}")
-            
+            chrome_options = build_chrome_options(self.headless)
+
             # 创建WebDriver
             service = Service()  # 使用系统PATH中的chromedriver
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
@@ -133,25 +163,25 @@ class LighterSeleniumClient:
             self.driver.execute_script("Object.defineProperty(navigator, 'platform', {get: () => 'MacIntel'})")
             self.driver.execute_script("Object.defineProperty(navigator, 'userAgent', {get: () => 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'})")
 
+            self._apply_resource_budget()
+
             print(f"🔗 访问页面: {url}")
             self.driver.get(url)
-            
-            # 等待页面加载
-            print("⏳ 等待页面加载...")
-            time.sleep(5)
 
             # 验证伪装效果
             self._verify_masquerade()
 
-            # 等待更长时间让JavaScript完全加载
-            print("⏳ 等待JavaScript渲染...")
-            time.sleep(15)
+            # 等待页面渲染出订单簿（出现即开始抓取，最长BROWSER_WAIT_TIME秒）
+            print("⏳ 等待订单簿就绪...")
+            orderbook = self._wait_ready()
 
             # 检查页面是否加载成功
-            if self._check_page_loaded():
+            if orderbook or self._check_page_loaded():
                 self.data.connected = True
                 self.running = True
-                
+                if orderbook:
+                    self._publish_orderbook(orderbook)
+
                 # 启动数据抓取线程
                 self.scrape_thread = threading.Thread(target=self._scrape_loop, daemon=True)
                 self.scrape_thread.start()
@@ -170,6 +200,22 @@ class LighterSeleniumClient:
             self.data.connected = False
             return False
 
+    def _apply_resource_budget(self):
+        """通过CDP拦截字体/统计/图表请求并隐藏图表面板（图片和CSS已由首选项禁用）"""
+        if not LIGHTER_RESOURCE_BUDGET:
+            return
+        try:
+            # Selenium没有CDP事件流，不支持按资源类型拦截，只按URL拦截
+            if LIGHTER_BLOCKED_URLS:
+                self.driver.execute_cdp_cmd('Network.enable', {})
+                self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(LIGHTER_BLOCKED_URLS)})
+            hide_js = build_panel_hide_js()
+            if hide_js:
+                self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': hide_js})
+            print("✂️  已拦截字体/统计/图表请求并隐藏图表面板")
+        except Exception as e:
+            print(f"⚠️  请求拦截/面板隐藏设置失败: {e}")
+
     def _verify_masquerade(self):
         """验证伪装效果"""
         try:
@@ -199,25 +245,31 @@ class LighterSeleniumClient:
         except Exception as e:
             print(f"⚠️  验证伪装失败: {e}")
 
+    def _wait_ready(self) -> Optional[AnyOrderBook]:
+        """
+        轮询直到页面渲染出订单簿（替代固定时长等待）
+
+        Returns:
+            OrderBook: 第一份有效订单簿，超过BROWSER_WAIT_TIME仍未就绪返回None
+        """
+        # 无论抓取方式如何都用单次execute_script轮询，避免逐元素查询叠加隐式等待
+        orderbook = wait_for_orderbook(self.driver, BROWSER_WAIT_TIME, parse=lambda driver: self._parse_orderbook_js())
+        if orderbook is None:
+            self.ready_timeouts += 1
+            logger.warning("Selenium: 页面在%s秒内未渲染出订单簿", BROWSER_WAIT_TIME,
+                           extra=log_extra(key="lighter_selenium.not_ready"))
+            return None
+
+        if self.time_to_first_book is None:
+            self.time_to_first_book = time.time() - self.started_at
+            print(f"✅ Selenium Lighter订单簿已就绪，耗时{self.time_to_first_book:.2f}秒")
+        return orderbook
+
     def _check_page_loaded(self) -> bool:
-        """检查页面是否加载完成"""
+        """检查订单簿容器是否存在（订单簿未就绪时调用，输出页面诊断信息）"""
         try:
             print("🔍 检查页面元素...")
-
-            # 等待页面完全加载
-            wait = WebDriverWait(self.driver, 30)
-
-            # 等待页面标题包含BTC
-            wait.until(lambda driver: "BTC" in driver.title)
-            print(f"✅ 页面标题正确: {self.driver.title}")
-
-            # 等待JavaScript加载完成
-            wait.until(lambda driver: driver.execute_script("return document.readyState") == "complete")
-            print("✅ 页面加载完成")
-
-            # 额外等待JavaScript渲染
-            time.sleep(10)
-            print("⏳ 等待JavaScript渲染...")
+            print(f"   页面标题: {self.driver.title}")
 
             # 尝试多种选择器查找订单簿容器
             selectors_to_try = [
@@ -260,10 +312,6 @@ class LighterSeleniumClient:
                 self._analyze_page_structure()
                 return False
 
-        except TimeoutException:
-            print("❌ 页面加载超时")
-            self._analyze_page_structure()
-            return False
         except Exception as e:
             print(f"❌ 页面检查失败: {e}")
             self._analyze_page_structure()
@@ -332,34 +380,58 @@ class LighterSeleniumClient:
         """数据抓取循环"""
         while self.running:
             try:
-                orderbook = self._parse_orderbook()
+                orderbook = self.parse_orderbook()
                 if orderbook and orderbook.asks and orderbook.bids:
-                    self.data.orderbook = orderbook
-                    self.data.timestamp = datetime.now()
-
-                    print(f"Selenium Lighter数据更新: 买一=${orderbook.best_bid:.1f}, 卖一=${orderbook.best_ask:.1f}, 中间价=${orderbook.mid_price:.1f}")
-
-                    # 调用回调函数
-                    if self.on_data_callback:
-                        self.on_data_callback(self.data)
+                    self._publish_orderbook(orderbook)
                 else:
-                    print("Selenium: 订单簿数据为空或解析失败")
+                    logger.warning("Selenium: 订单簿数据为空或解析失败", extra=log_extra(key="lighter_selenium.empty"))
 
-                time.sleep(3)  # 3秒间隔
+                time.sleep(self.scrape_interval)
 
             except Exception as e:
                 print(f"Selenium Lighter数据抓取错误: {e}")
                 time.sleep(10)  # 出错时等待更长时间
     
+    def _publish_orderbook(self, orderbook: AnyOrderBook):
+        """更新数据并调用回调"""
+        self.last_book_time = time.monotonic()
+        self.data.orderbook = orderbook
+        self.data.timestamp = datetime.now()
+
+        logger.info("Selenium Lighter数据更新: 买一=$%.1f, 卖一=$%.1f, 中间价=$%.1f",
+                    orderbook.best_bid, orderbook.best_ask, orderbook.mid_price,
+                    extra=log_extra(key="lighter_selenium.update"))
+
+        # 调用回调函数
+        if self.on_data_callback:
+            self.on_data_callback(self.data)
+
+    def _parse_orderbook_js(self) -> Optional[CompactOrderBook]:
+        """通过一次execute_script调用抓取全部档位（页面内遍历DOM并转换数值）"""
+        try:
+            result = self.driver.execute_script(ORDERBOOK_EXTRACT_JS)
+            if not result:
+                return None
+
+            orderbook = parse_orderbook_arrays(result[0], result[1])
+            logger.debug("找到 %d 个卖单, %d 个买单", len(orderbook.asks), len(orderbook.bids))
+            if orderbook.asks and orderbook.bids:
+                return orderbook
+            return None
+
+        except Exception as e:
+            logger.error("Selenium订单簿解析错误: %s", e, extra=log_extra(key="lighter_selenium.parse_error"))
+            return None
+
     def _parse_orderbook(self) -> Optional[OrderBook]:
-        """解析订单簿数据"""
+        """解析订单簿数据（逐个元素查询）"""
         try:
             asks = []
             bids = []
             
             # 查找卖单元素
             ask_elements = self.driver.find_elements(By.CSS_SELECTOR, '[data-testid^="ob-ask-"]')
-            print(f"找到 {len(ask_elements)} 个卖单元素")
+            logger.debug("找到 %d 个卖单元素", len(ask_elements))
             
             for ask_elem in ask_elements:
                 level = self._parse_order_level(ask_elem, OrderType.ASK)
@@ -368,7 +440,7 @@ class LighterSeleniumClient:
             
             # 查找买单元素
             bid_elements = self.driver.find_elements(By.CSS_SELECTOR, '[data-testid^="ob-bid-"]')
-            print(f"找到 {len(bid_elements)} 个买单元素")
+            logger.debug("找到 %d 个买单元素", len(bid_elements))
             
             for bid_elem in bid_elements:
                 level = self._parse_order_level(bid_elem, OrderType.BID)
@@ -432,3 +504,14 @@ class LighterSeleniumClient:
     def is_connected(self) -> bool:
         """检查连接状态"""
         return self.data.connected and self.running
+
+    def get_browser_pid(self) -> Optional[int]:
+        """chromedriver进程ID，浏览器进程是其子进程（用于资源采样）"""
+        try:
+            return self.driver.service.process.pid if self.driver else None
+        except Exception:
+            return None
+
+    def get_readiness_stats(self) -> Dict[str, Optional[float]]:
+        """启动到订单簿就绪的耗时"""
+        return {"time_to_first_book": self.time_to_first_book, "ready_timeouts": self.ready_timeouts}
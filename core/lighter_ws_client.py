@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Lighter原生WebSocket客户端
+直接订阅Lighter公开的订单簿WebSocket频道，不启动浏览器
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from data.models import AnyOrderBook, LighterData
+from core.async_engine import AsyncIngestionEngine, WebSocketConnector
+from core.lighter_ws_decoder import LighterOrderBookDecoder
+from core.orderbook_diff import OrderBookChangeDetector, OrderBookDiff
+from core.logger import get_logger, log_extra
+from config import LIGHTER_WS_URL, LIGHTER_MARKET_ID
+
+logger = get_logger("lighter_ws")
+
+class LighterWSClient(WebSocketConnector):
+    """Lighter原生客户端 - 订阅order_book/{市场ID}，全量+增量消息在本地维护订单簿"""
+
+    exchange_name = "Lighter"
+    feed_name = "lighter"
+
+    def __init__(self, on_data_callback: Callable[[LighterData], None], market_id: int = LIGHTER_MARKET_ID,
+                 ws_url: str = LIGHTER_WS_URL, on_diff_callback: Optional[Callable[[OrderBookDiff], None]] = None,
+                 feed_name: Optional[str] = None):
+        """
+        初始化Lighter原生客户端
+
+        Args:
+            on_data_callback: 数据回调函数
+            market_id: 订单簿市场ID（BTC为1）
+            ws_url: WebSocket地址（测试时可指向本地模拟服务器）
+            on_diff_callback: 逐档差异回调（只包含变化的档位），前N档未变化时不调用
+            feed_name: 重连统计中的数据源名称，不传为 "lighter"（作为热备时为 "lighter_standby"）
+        """
+        super().__init__(ws_url, feed_name)
+        self.on_data_callback = on_data_callback
+        self.on_diff_callback = on_diff_callback
+        self.change_detector = OrderBookChangeDetector()  # 深档变化不影响前N档时不回调
+        self.market_id = market_id
+        self.decoder = LighterOrderBookDecoder(market_id)
+        self.data = LighterData()
+        self.last_book_time = 0.0  # 最近一次解码出订单簿的时间 (monotonic)，含被去重抑制的
+        self.started_at = 0.0
+        self.time_to_first_book: Optional[float] = None  # 启动到收到第一份订单簿的耗时（秒）
+
+    def start(self, url: Optional[str] = None, engine: Optional[AsyncIngestionEngine] = None):
+        """
+        启动Lighter WebSocket连接
+
+        Args:
+            url: 与浏览器客户端接口保持一致；传入ws/wss地址时覆盖默认地址，页面地址忽略
+            engine: 共享的异步采集引擎，不传则使用默认引擎
+        """
+        if url and url.startswith(('ws://', 'wss://')):
+            self.ws_url = url
+
+        print(f"🔷 启动Lighter原生订单簿 (WebSocket, 市场{self.market_id})...")
+        self.started_at = time.time()
+
+        if not super().start(engine):
+            return False
+
+        print("✅ Lighter原生订单簿已启动 (无浏览器)")
+        return True
+
+    def stop(self):
+        """停止Lighter WebSocket连接"""
+        super().stop()
+        self.data.connected = False
+        print("✅ Lighter原生订单簿已停止")
+
+    async def _on_open(self, ws):
+        """连接建立后订阅订单簿频道（服务器随后推送全量订单簿）"""
+        print(f"🔗 Lighter WebSocket连接已建立: order_book/{self.market_id}")
+        self.decoder.reset()
+        self.change_detector.reset()  # 重连后的全量订单簿作为全量差异发布
+        await ws.send(json.dumps({"type": "subscribe", "channel": f"order_book/{self.market_id}"}))
+
+    async def _resubscribe(self, ws):
+        """退订后重新订阅订单簿频道，服务器重新推送全量订单簿"""
+        self.change_detector.reset()
+        channel = f"order_book/{self.market_id}"
+        await ws.send(json.dumps({"type": "unsubscribe", "channel": channel}))
+        await ws.send(json.dumps({"type": "subscribe", "channel": channel}))
+
+    def _on_message(self, ws, message):
+        """WebSocket消息回调"""
+        try:
+            # 应用层心跳：服务器发送ping，需回复pong，否则会断开连接
+            if '"ping"' in message and json.loads(message).get('type') == 'ping':
+                asyncio.ensure_future(ws.send('{"type":"pong"}'))
+                return
+
+            gaps = self.decoder.gaps
+            orderbook = self.decoder.decode(message)
+            if self.decoder.gaps != gaps:
+                # 丢失了增量消息，本地订单簿已丢弃；重新订阅取得新的全量消息
+                logger.warning("Lighter订单簿消息不连续，重新订阅",
+                               extra=log_extra(key="lighter_ws.gap", gaps=self.decoder.gaps))
+                asyncio.ensure_future(self._resubscribe(ws))
+                return
+            if orderbook is None or not (orderbook.asks and orderbook.bids):
+                return
+
+            self._publish_orderbook(orderbook)
+
+        except Exception as e:
+            logger.error("Lighter WebSocket消息处理错误: %s", e, extra=log_extra(key="lighter_ws.message_error"))
+
+    def _publish_orderbook(self, orderbook: AnyOrderBook):
+        """更新数据并调用回调（前N档与上一份相同时只计数，不回调）"""
+        self.last_book_time = time.monotonic()  # 数据源存活时间，订单簿没有变化也更新
+        if self.time_to_first_book is None:
+            self.time_to_first_book = time.time() - self.started_at
+            print(f"✅ Lighter首份订单簿已就绪，耗时{self.time_to_first_book:.2f}秒")
+
+        diff = self.change_detector.update(orderbook)
+        if diff is None:
+            return
+
+        self.data.orderbook = orderbook
+        self.data.timestamp = datetime.now()
+        self.data.connected = True
+
+        logger.info("Lighter数据更新: 买一=$%.1f, 卖一=$%.1f, 中间价=$%.1f",
+                    orderbook.best_bid, orderbook.best_ask, orderbook.mid_price,
+                    extra=log_extra(key="lighter_ws.update"))
+
+        if self.on_data_callback:
+            self.on_data_callback(self.data)
+        if self.on_diff_callback:
+            self.on_diff_callback(diff)
+
+    def _on_close(self, ws, close_status_code, close_msg):
+        """连接关闭后本地订单簿失效，重连订阅后由全量消息重建"""
+        super()._on_close(ws, close_status_code, close_msg)
+        self.decoder.reset()
+        self.data.connected = False
+
+    def get_current_data(self) -> LighterData:
+        """获取当前数据"""
+        return self.data
+
+    def is_connected(self) -> bool:
+        """检查连接状态"""
+        return self.data.connected and self.running
+
+    def get_change_stats(self) -> Dict[str, int]:
+        """订单簿发布/抑制计数，以及检测到缺口后重新订阅的次数"""
+        return {**self.change_detector.get_stats(), "resyncs": self.decoder.gaps}
+
+    def get_readiness_stats(self) -> Dict[str, Optional[float]]:
+        """启动到第一份订单簿的耗时"""
+        return {"time_to_first_book": self.time_to_first_book}
+
+# 测试函数
+def test_lighter_ws_client():
+    """测试Lighter原生客户端"""
+    def on_data(data: LighterData):
+        ob = data.orderbook
+        print(f"Lighter - 买一: ${ob.best_bid:,.1f}, 卖一: ${ob.best_ask:,.1f}, 中间价: ${ob.mid_price:,.1f}")
+
+    client = LighterWSClient(on_data)
+
+    try:
+        if client.start():
+            print("按 Ctrl+C 停止...")
+            while True:
+                time.sleep(1)
+    except KeyboardInterrupt:
+        print("\n停止测试...")
+    finally:
+        client.stop()
+
+if __name__ == "__main__":
+    test_lighter_ws_client()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lighter订单簿WebSocket消息解码
+解析Lighter推送的 order_book:{市场ID} 频道消息（首条为全量，之后为增量），在本地维护订单簿
+
+连续性检查: 增量消息带 begin_nonce/nonce 时，begin_nonce必须等于上一条消息的nonce；
+offset是整个连接共享的递增序号（不同频道交错，本身不连续），只能检查不回退。
+检测到缺口后丢弃本地订单簿，等待重新订阅后的全量消息
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from data.models import CompactOrderBook
+from core.depth_book import LocalOrderBook
+from config import ORDERBOOK_DEPTH
+
+# 订单簿频道消息类型
+SNAPSHOT_TYPE = "subscribed/order_book"
+UPDATE_TYPE = "update/order_book"
+
+
+class LighterOrderBookDecoder:
+    """Lighter订单簿解码器 - 全量消息重置本地订单簿，增量消息按档位修改（数量为0表示删除）"""
+
+    def __init__(self, market_id: int = 1, depth: int = ORDERBOOK_DEPTH):
+        """
+        初始化解码器
+
+        Args:
+            market_id: 市场ID（BTC为1），其他市场的消息直接忽略
+            depth: 输出订单簿每侧的档位数
+        """
+        self.market_id = market_id
+        self.channel = f"order_book:{market_id}"
+        self.depth = depth
+        self.book = LocalOrderBook()
+        self.synced = False
+        self.offset: Optional[int] = None
+        self.nonce: Optional[int] = None
+        self.snapshots = 0  # 收到的全量消息数（每次连接/重连一条）
+        self.updates = 0    # 应用的增量消息数
+        self.gaps = 0       # 检测到缺口（丢失增量）的次数
+
+    def decode(self, message: str) -> Optional[CompactOrderBook]:
+        """
+        解析一条WebSocket消息
+
+        Args:
+            message: 原始消息文本
+
+        Returns:
+            CompactOrderBook: 订单簿有变化时返回最新订单簿，非订单簿消息、尚未收到全量或检测到缺口时返回None
+        """
+        # 快速过滤ping等无关消息，避免完整解析
+        if self.channel not in message:
+            return None
+
+        payload = json.loads(message)
+        return self.decode_payload(payload)
+
+    def decode_payload(self, payload: Dict[str, Any]) -> Optional[CompactOrderBook]:
+        """解析已反序列化的消息"""
+        if payload.get('channel') != self.channel:
+            return None
+
+        message_type = payload.get('type')
+        order_book = payload.get('order_book') or {}
+        offset = payload.get('offset', order_book.get('offset'))
+
+        if message_type == SNAPSHOT_TYPE:
+            self.book.load_snapshot(_levels(order_book.get('bids', ())), _levels(order_book.get('asks', ())))
+            self.synced = True
+            self.snapshots += 1
+        elif message_type == UPDATE_TYPE:
+            if not self.synced:
+                return None
+            if self._is_gap(offset, order_book.get('begin_nonce')):
+                self.gaps += 1
+                self.reset()
+                return None
+            self.book.apply(_levels(order_book.get('bids', ())), _levels(order_book.get('asks', ())))
+            self.updates += 1
+        else:
+            return None
+
+        self.offset = offset
+        self.nonce = order_book.get('nonce')
+        return self.book.to_orderbook(self.depth)
+
+    def _is_gap(self, offset: Optional[int], begin_nonce: Optional[int]) -> bool:
+        """增量消息与上一条消息之间是否有缺失"""
+        if begin_nonce is not None and self.nonce is not None:
+            return begin_nonce != self.nonce
+        return offset is not None and self.offset is not None and offset <= self.offset
+
+    def reset(self):
+        """连接断开或检测到缺口时调用，等待下一条全量消息"""
+        self.synced = False
+        self.offset = None
+        self.nonce = None
+
+
+def _levels(raw: Iterable[Dict[str, str]]) -> List[tuple]:
+    """Lighter档位 {"price": "...", "size": "..."} 转换为 (价格, 数量)"""
+    return [(level['price'], level['size']) for level in raw]
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+异步日志
+采集线程只做非阻塞入队，格式化和输出在独立线程完成；支持按消息键限流、采样和结构化字段
+未调用setup_logging时（作为库使用、单独运行模块的测试函数）使用同步输出的默认处理器，日志不会丢失
+"""
+
+import logging
+import queue
+import random
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+from config import LOG_LEVEL, LOG_QUEUE_SIZE, LOG_RATE_LIMIT_INTERVAL
+
+# 本项目所有日志的根名称
+LOGGER_NAME = "watchs"
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+_default_handler: Optional[logging.Handler] = None
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+LOG_DATE_FORMAT = "%H:%M:%S"
+
+
+class RateLimitFilter(logging.Filter):
+    """按消息键限流和按比例采样（处理器上的过滤器在各个写日志的线程中并发执行，状态读写加锁）"""
+
+    def __init__(self, default_interval: float = LOG_RATE_LIMIT_INTERVAL):
+        super().__init__()
+        self.default_interval = default_interval
+        self._last_emit: Dict[str, float] = {}
+        self._suppressed: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        sample = getattr(record, 'sample', None)
+        if sample is not None and random.random() >= sample:
+            return False
+
+        key = getattr(record, 'rate_key', None)
+        if key is None:
+            return True
+
+        interval = getattr(record, 'rate_interval', None) or self.default_interval
+        with self._lock:
+            last = self._last_emit.get(key)
+            if last is not None and record.created - last < interval:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return False
+
+            self._last_emit[key] = record.created
+            record.suppressed = self._suppressed.pop(key, 0)
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """非阻塞入队处理器 - 队列满时直接丢弃并计数"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 不在调用线程格式化，交给输出线程处理
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StructuredFormatter(logging.Formatter):
+    """在消息后追加结构化字段 (key=value) 和限流省略条数"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+
+        fields = getattr(record, 'fields', None)
+        if fields:
+            message += " | " + " ".join(f"{key}={value}" for key, value in fields.items())
+
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            message += f" (已省略{suppressed}条同类日志)"
+
+        return message
+
+
+def log_extra(key: Optional[str] = None, interval: Optional[float] = None,
+              sample: Optional[float] = None, **fields) -> Dict[str, Any]:
+    """
+    构造日志extra参数
+
+    Args:
+        key: 限流键，相同键在interval内只输出一条
+        interval: 限流间隔（秒），不传使用配置 LOG_RATE_LIMIT_INTERVAL
+        sample: 采样比例 (0~1)
+        **fields: 结构化字段
+
+    Returns:
+        Dict: 传给logger的extra参数
+    """
+    extra: Dict[str, Any] = {}
+    if key is not None:
+        extra['rate_key'] = key
+        extra['rate_interval'] = interval
+    if sample is not None:
+        extra['sample'] = sample
+    if fields:
+        extra['fields'] = fields
+    return extra
+
+
+def get_logger(name: str) -> logging.Logger:
+    """获取项目内的日志记录器"""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def _build_stream_handler() -> logging.StreamHandler:
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(StructuredFormatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT))
+    return stream_handler
+
+
+def _install_default_handler():
+    """安装同步输出的默认处理器（setup_logging之前和shutdown_logging之后使用）"""
+    global _default_handler
+    _default_handler = _build_stream_handler()
+    _default_handler.addFilter(RateLimitFilter())
+
+    root = logging.getLogger(LOGGER_NAME)
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(_default_handler)
+    root.propagate = False
+
+
+def setup_logging(level: str = LOG_LEVEL, queue_size: int = LOG_QUEUE_SIZE):
+    """
+    初始化异步日志，替换同步输出的默认处理器（重复调用无副作用）
+
+    Args:
+        level: 日志级别
+        queue_size: 日志队列容量，满时丢弃新日志
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    stream_handler = _build_stream_handler()
+
+    _queue_handler = NonBlockingQueueHandler(log_queue)
+    _queue_handler.addFilter(RateLimitFilter())
+
+    root = logging.getLogger(LOGGER_NAME)
+    root.setLevel(level)
+    root.removeHandler(_default_handler)
+    root.addHandler(_queue_handler)
+    root.propagate = False
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """停止日志输出线程并输出队列中剩余的日志，之后恢复同步输出的默认处理器"""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+
+    _listener.stop()
+    logging.getLogger(LOGGER_NAME).removeHandler(_queue_handler)
+    if _queue_handler.dropped:
+        print(f"⚠️  日志队列已满，共丢弃{_queue_handler.dropped}条日志")
+    _listener = None
+    _queue_handler = None
+    logging.getLogger(LOGGER_NAME).addHandler(_default_handler)
+
+
+_install_default_handler()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+订单簿变化检测
+用前N档价格/数量的指纹判断订单簿是否变化，未变化的快照不再发布；变化时给出逐档差异
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from data.models import AnyOrderBook, LevelView, OrderBookLevel
+from config import ORDERBOOK_DEPTH
+
+# 单侧前N档: ((价格, 数量), ...)
+SideKey = Tuple[Tuple[float, float], ...]
+
+
+@dataclass
+class OrderBookDiff:
+    """订单簿逐档差异 - 数量为0表示该档位已删除"""
+    asks: List[Tuple[float, float]] = field(default_factory=list)
+    bids: List[Tuple[float, float]] = field(default_factory=list)
+    timestamp: datetime = field(default_factory=datetime.now)
+    snapshot: bool = False  # 是否为首份（全量）订单簿
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            "asks": self.asks,
+            "bids": self.bids,
+            "snapshot": self.snapshot,
+            "timestamp": self.timestamp.isoformat(),
+        }
+
+
+def side_key(levels: List[OrderBookLevel], depth: int) -> SideKey:
+    """单侧前depth档的 (价格, 数量) 元组，用作指纹和差异计算的输入"""
+    if isinstance(levels, LevelView):
+        return levels.pairs(depth)
+    return tuple((level.price, level.size) for level in levels[:depth])
+
+
+def diff_side(previous: SideKey, current: SideKey) -> List[Tuple[float, float]]:
+    """
+    计算单侧的逐档差异
+
+    Returns:
+        List[(价格, 新数量)]: 新增或数量变化的档位，以及数量为0的已删除档位
+    """
+    before = dict(previous)
+    changes = [(price, size) for price, size in current if before.pop(price, None) != size]
+    changes.extend((price, 0.0) for price in before)
+    return changes
+
+
+class OrderBookChangeDetector:
+    """订单簿变化检测器 - 每个数据源一个实例（非线程安全，多个线程发布同一数据源时由调用方加锁）"""
+
+    def __init__(self, depth: int = ORDERBOOK_DEPTH):
+        """
+        初始化变化检测器
+
+        Args:
+            depth: 参与比较的每侧档位数
+        """
+        self.depth = depth
+        self.published = 0   # 有变化、已发布的快照数
+        self.suppressed = 0  # 与上一份相同、被抑制的快照数
+        self._asks: Optional[SideKey] = None
+        self._bids: Optional[SideKey] = None
+        self._fingerprint: Optional[int] = None
+
+    def update(self, orderbook: AnyOrderBook) -> Optional[OrderBookDiff]:
+        """
+        比较新订单簿与上一份
+
+        Args:
+            orderbook: 最新订单簿
+
+        Returns:
+            OrderBookDiff: 有变化时返回逐档差异，未变化返回None
+        """
+        asks = side_key(orderbook.asks, self.depth)
+        bids = side_key(orderbook.bids, self.depth)
+        fingerprint = hash((asks, bids))
+
+        # 指纹相同时再比较元组本身，避免哈希碰撞导致漏发
+        if fingerprint == self._fingerprint and asks == self._asks and bids == self._bids:
+            self.suppressed += 1
+            return None
+
+        if self._fingerprint is None:
+            diff = OrderBookDiff(asks=list(asks), bids=list(bids), timestamp=orderbook.timestamp, snapshot=True)
+        else:
+            diff = OrderBookDiff(asks=diff_side(self._asks, asks), bids=diff_side(self._bids, bids),
+                                 timestamp=orderbook.timestamp)
+
+        self._asks, self._bids, self._fingerprint = asks, bids, fingerprint
+        self.published += 1
+        return diff
+
+    def reset(self):
+        """页面刷新或重连后调用，下一份订单簿作为全量发布"""
+        self._asks = self._bids = self._fingerprint = None
+
+    def get_stats(self) -> Dict[str, int]:
+        """发布/抑制计数"""
+        return {"published": self.published, "suppressed": self.suppressed}
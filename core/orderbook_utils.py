@@ -5,11 +5,84 @@
 """
 
 import re
-from typing import List, Dict, Optional, Tuple
+import time
+from typing import Any, Callable, List, Dict, Optional, Tuple
 from datetime import datetime
 
 # 导入数据模型
-from data.models import OrderBook, OrderBookLevel, OrderType
+from data.models import AnyOrderBook, CompactOrderBook, OrderBook, OrderBookLevel, OrderType
+from core.logger import get_logger, log_extra
+from config import READY_POLL_INTERVAL
+
+logger = get_logger("orderbook")
+
+# 页面内的档位提取函数: side(容器testid, 档位testid前缀) -> [[价格, 数量, 累计数量], ...]
+# 数值在页面内去掉千分位并转换，空白或无法解析的字段为null（与DOM/HTML解析一样跳过该档位）；
+# 容器不存在时返回空数组
+_SIDE_EXTRACT_JS = """
+const num = (el) => {
+    const s = el.textContent.replace(/,/g, '').trim();
+    const v = +s;
+    return s && Number.isFinite(v) ? v : null;
+};
+const side = (container, prefix) => {
+    const out = [];
+    if (!document.querySelector('[data-testid="' + container + '"]')) return out;
+    const rows = document.querySelectorAll('[data-testid^="' + prefix + '"]');
+    for (let i = 0; i < rows.length; i++) {
+        const p = rows[i].querySelector('[data-testid="price"]');
+        const s = rows[i].querySelector('[data-testid="size"]');
+        const t = rows[i].querySelector('[data-testid="total-size"]');
+        if (!(p && s && t)) continue;
+        out.push([num(p), num(s), num(t)]);
+    }
+    return out;
+};
+"""
+
+# 一次性在浏览器内遍历订单簿DOM，返回 [卖单档位, 买单档位]
+ORDERBOOK_EXTRACT_JS = _SIDE_EXTRACT_JS + """
+return [side('orderbook-asks', 'ob-ask-'), side('orderbook-bids', 'ob-bid-')];
+"""
+
+# 在买卖容器上安装MutationObserver，变化只在页面内累计计数并唤醒等待中的长轮询
+# 返回是否安装成功（容器尚未渲染时为false）；已安装且容器仍在文档中时不重复安装
+ORDERBOOK_OBSERVER_JS = """
+const old = window.__lighterObWatch;
+if (old && old.asks.isConnected && old.bids.isConnected) return true;
+if (old) old.observer.disconnect();
+const asks = document.querySelector('[data-testid="orderbook-asks"]');
+const bids = document.querySelector('[data-testid="orderbook-bids"]');
+if (!asks || !bids) return false;
+const w = {asks: asks, bids: bids, pending: 0, waiter: null};
+w.observer = new MutationObserver((records) => {
+    w.pending += records.length;
+    if (w.waiter) { const wake = w.waiter; w.waiter = null; wake(); }
+});
+const opts = {childList: true, subtree: true, characterData: true};
+w.observer.observe(asks, opts);
+w.observer.observe(bids, opts);
+window.__lighterObWatch = w;
+return true;
+"""
+
+# 长轮询: 等到有变化或超时（毫秒，由%d填入）后返回 [合并的变化数, 卖单档位, 买单档位]
+# 超时无变化返回 [0]；观察器丢失（页面刷新或容器被替换）返回null
+ORDERBOOK_WAIT_JS = _SIDE_EXTRACT_JS + """
+const w = window.__lighterObWatch;
+if (!w || !w.asks.isConnected || !w.bids.isConnected) return null;
+const collect = () => {
+    const count = w.pending;
+    w.pending = 0;
+    if (!count) return [0];
+    return [count, side('orderbook-asks', 'ob-ask-'), side('orderbook-bids', 'ob-bid-')];
+};
+if (w.pending) return collect();
+return new Promise((resolve) => {
+    const timer = setTimeout(() => { w.waiter = null; resolve(); }, %d);
+    w.waiter = () => { clearTimeout(timer); resolve(); };
+}).then(() => w.asks.isConnected && w.bids.isConnected ? collect() : null);
+"""
 
 def parse_orderbook_from_page(page) -> Optional[OrderBook]:
     """
@@ -30,24 +103,24 @@ def parse_orderbook_from_page(page) -> Optional[OrderBook]:
         if asks_container:
             # 使用正确的语法查找ask元素
             ask_elements = page.eles('@data-testid^ob-ask-')
-            print(f"找到 {len(ask_elements)} 个卖单元素")
+            logger.debug("找到 %d 个卖单元素", len(ask_elements))
             for ask_elem in ask_elements:
                 level = _parse_orderbook_level(ask_elem, OrderType.ASK)
                 if level:
                     asks.append(level)
-                    print(f"解析卖单: ${level.price:.1f}")
+                    logger.debug("解析卖单: $%.1f", level.price)
 
         # 抓取买单 (bids) - 绿色区域
         bids_container = page.ele('@data-testid=orderbook-bids')
         if bids_container:
             # 使用正确的语法查找bid元素
             bid_elements = page.eles('@data-testid^ob-bid-')
-            print(f"找到 {len(bid_elements)} 个买单元素")
+            logger.debug("找到 %d 个买单元素", len(bid_elements))
             for bid_elem in bid_elements:
                 level = _parse_orderbook_level(bid_elem, OrderType.BID)
                 if level:
                     bids.append(level)
-                    print(f"解析买单: ${level.price:.1f}")
+                    logger.debug("解析买单: $%.1f", level.price)
 
         # 排序
         asks = sorted(asks, key=lambda x: x.price)  # 卖单价格从低到高
@@ -62,11 +135,116 @@ def parse_orderbook_from_page(page) -> Optional[OrderBook]:
     except Exception as e:
         error_msg = str(e)
         if "disconnected" in error_msg.lower() or "connection" in error_msg.lower():
-            print(f"订单簿解析错误: 页面连接断开")
+            logger.warning("订单簿解析错误: 页面连接断开", extra=log_extra(key="orderbook.disconnected"))
         else:
-            print(f"订单簿解析错误: {e}")
+            logger.error("订单簿解析错误: %s", e, extra=log_extra(key="orderbook.parse_error"))
         return None
 
+def parse_orderbook_via_js(page) -> Optional[CompactOrderBook]:
+    """
+    通过一次run_js调用抓取订单簿（替代逐个元素查询的多次CDP往返）
+
+    Args:
+        page: DrissionPage的页面对象
+
+    Returns:
+        CompactOrderBook: 订单簿对象
+    """
+    try:
+        result = page.run_js(ORDERBOOK_EXTRACT_JS)
+        if not result:
+            return None
+        return parse_orderbook_arrays(result[0], result[1])
+
+    except Exception as e:
+        error_msg = str(e)
+        if "disconnected" in error_msg.lower() or "connection" in error_msg.lower():
+            logger.warning("订单簿解析错误: 页面连接断开", extra=log_extra(key="orderbook.disconnected"))
+        else:
+            logger.error("订单簿JS抓取错误: %s", e, extra=log_extra(key="orderbook.js_error"))
+        return None
+
+def wait_for_orderbook(page, timeout: float, poll_interval: float = READY_POLL_INTERVAL,
+                       parse: Callable[[Any], Optional[AnyOrderBook]] = parse_orderbook_via_js) -> Optional[AnyOrderBook]:
+    """
+    轮询直到页面渲染出买卖双方档位或超时（替代固定时长等待）
+
+    Args:
+        page: DrissionPage的页面或标签页对象（或Selenium的driver，配合parse使用）
+        timeout: 最长等待时间（秒）
+        poll_interval: 轮询间隔（秒）
+        parse: 抓取函数，默认单次run_js抓取
+
+    Returns:
+        OrderBook/CompactOrderBook: 第一份非空订单簿（类型取决于parse），超时返回None
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        orderbook = parse(page)
+        if orderbook and orderbook.asks and orderbook.bids:
+            return orderbook
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(poll_interval)
+
+def install_orderbook_observer(page) -> bool:
+    """
+    在页面中安装订单簿MutationObserver
+
+    Args:
+        page: DrissionPage的页面对象
+
+    Returns:
+        bool: 是否安装成功（订单簿容器尚未渲染时失败）
+    """
+    try:
+        return bool(page.run_js(ORDERBOOK_OBSERVER_JS))
+    except Exception as e:
+        logger.warning("订单簿观察器安装失败: %s", e, extra=log_extra(key="orderbook.observer_error"))
+        return False
+
+def wait_orderbook_update(page, timeout: float) -> Tuple[bool, Optional[CompactOrderBook]]:
+    """
+    长轮询等待观察器报告的订单簿变化（一次run_js调用，超时前阻塞在页面内）
+
+    Args:
+        page: DrissionPage的页面对象
+        timeout: 最长等待时间（秒）
+
+    Returns:
+        Tuple[观察器是否有效, 订单簿]: 超时无变化时订单簿为None；观察器丢失时第一项为False
+    """
+    result = page.run_js(ORDERBOOK_WAIT_JS % int(timeout * 1000), timeout=timeout + 5)
+    if result is None:
+        return False, None
+    if not result[0]:
+        return True, None
+    return True, parse_orderbook_arrays(result[1], result[2])
+
+def parse_orderbook_arrays(raw_asks: List[List[float]], raw_bids: List[List[float]],
+                           timestamp: Optional[datetime] = None) -> CompactOrderBook:
+    """
+    将 [价格, 数量, 累计数量] 数组转换为紧凑订单簿（不为每个档位创建对象）
+
+    Args:
+        raw_asks: 卖单档位
+        raw_bids: 买单档位
+        timestamp: 时间戳，不传使用当前时间
+
+    Returns:
+        CompactOrderBook: 订单簿对象（卖单价格从低到高，买单价格从高到低）
+    """
+    asks = sorted(_valid_rows(raw_asks), key=_row_price)
+    bids = sorted(_valid_rows(raw_bids), key=_row_price, reverse=True)
+    return CompactOrderBook.from_rows(asks, bids, timestamp)
+
+def _valid_rows(rows: List[List[float]]) -> List[List[float]]:
+    """跳过含null的档位（页面内字段为空或解析失败）"""
+    return [row for row in rows if None not in row]
+
+def _row_price(row: List[float]) -> float:
+    return row[0]
+
 def _parse_orderbook_level(element, order_type: OrderType) -> Optional[OrderBookLevel]:
     """解析单个订单簿档位"""
     try:
@@ -96,7 +274,7 @@ def _parse_orderbook_level(element, order_type: OrderType) -> Optional[OrderBook
     except (ValueError, AttributeError) as e:
         return None
 
-def get_best_prices(orderbook: OrderBook) -> Tuple[Optional[float], Optional[float]]:
+def get_best_prices(orderbook: AnyOrderBook) -> Tuple[Optional[float], Optional[float]]:
     """
     获取最佳买卖价格
     
@@ -111,7 +289,7 @@ def get_best_prices(orderbook: OrderBook) -> Tuple[Optional[float], Optional[flo
     
     return best_bid, best_ask
 
-def get_market_depth(orderbook: OrderBook, depth_levels: int = 5) -> Dict:
+def get_market_depth(orderbook: AnyOrderBook, depth_levels: int = 5) -> Dict:
     """
     获取市场深度信息
     
@@ -137,7 +315,7 @@ def get_market_depth(orderbook: OrderBook, depth_levels: int = 5) -> Dict:
         'total_depth': bid_depth + ask_depth
     }
 
-def format_orderbook_summary(orderbook: OrderBook) -> str:
+def format_orderbook_summary(orderbook: AnyOrderBook) -> str:
     """
     格式化订单簿摘要信息
     
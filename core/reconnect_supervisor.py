@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+连接重连监督器
+统一管理所有WebSocket连接的重连节奏：抖动指数退避、并发重连上限、重连统计
+"""
+
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from config import (RECONNECT_BASE_DELAY, RECONNECT_MAX_DELAY, MAX_CONCURRENT_RECONNECTS,
+                    STABLE_CONNECTION_TIME)
+
+# 服务端正常关闭的关闭码 (Normal Closure / Going Away)
+CLEAN_CLOSE_CODES = (1000, 1001)
+
+# 退避指数上限: 2**30倍的基础延迟远超任何max_delay
+MAX_BACKOFF_EXPONENT = 30
+
+
+@dataclass
+class FeedStats:
+    """单个数据源的连接统计"""
+    name: str
+    connected: bool = False
+    reconnect_count: int = 0         # 重连成功次数
+    consecutive_failures: int = 0    # 连续断线/连接失败次数
+    total_downtime: float = 0.0      # 累计断线时长（秒）
+    last_close_code: Optional[int] = None
+    connected_at: Optional[float] = None     # 本次连接建立时间 (monotonic)
+    disconnected_at: Optional[float] = None  # 本次断线开始时间 (monotonic)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典，断线中的数据源包含当前断线时长"""
+        downtime = self.total_downtime
+        current_downtime = 0.0
+        if not self.connected and self.disconnected_at is not None:
+            current_downtime = time.monotonic() - self.disconnected_at
+            downtime += current_downtime
+
+        return {
+            "connected": self.connected,
+            "reconnect_count": self.reconnect_count,
+            "consecutive_failures": self.consecutive_failures,
+            "total_downtime": round(downtime, 3),
+            "current_downtime": round(current_downtime, 3),
+            "last_close_code": self.last_close_code,
+        }
+
+
+class ReconnectSupervisor:
+    """重连监督器 - 所有连接器共享"""
+
+    def __init__(self, base_delay: float = RECONNECT_BASE_DELAY, max_delay: float = RECONNECT_MAX_DELAY,
+                 max_concurrent: int = MAX_CONCURRENT_RECONNECTS,
+                 stable_after: float = STABLE_CONNECTION_TIME):
+        """
+        初始化重连监督器
+
+        Args:
+            base_delay: 退避基础延迟（秒）
+            max_delay: 退避最大延迟（秒）
+            max_concurrent: 同时进行的连接尝试上限
+            stable_after: 连接持续超过该时长（秒）视为稳定，断线后退避重新计数
+        """
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_concurrent = max_concurrent
+        self.stable_after = stable_after
+        self.feeds: Dict[str, FeedStats] = {}
+        self._owners: Dict[str, Any] = {}  # 统计名称 -> 登记该名称的连接器
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def register(self, name: str, owner: Any = None) -> FeedStats:
+        """
+        登记数据源（重复登记返回已有统计）
+
+        Args:
+            name: 数据源名称
+            owner: 登记的连接器；名称已被其他连接器占用时追加序号 (如 "binance#2")，
+                   同类的多个连接器各自统计，不共用失败次数和退避
+
+        Returns:
+            FeedStats: 该数据源的统计，name为实际使用的统计名称
+        """
+        if owner is not None:
+            base, index = name, 1
+            while self._owners.get(name, owner) is not owner:
+                index += 1
+                name = f"{base}#{index}"
+            self._owners[name] = owner
+
+        stats = self.feeds.get(name)
+        if stats is None:
+            stats = FeedStats(name=name, disconnected_at=time.monotonic())
+            self.feeds[name] = stats
+        return stats
+
+    @asynccontextmanager
+    async def attempt(self):
+        """限制同时进行的连接尝试数量，避免大量连接同时重连"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        async with self._semaphore:
+            yield
+
+    def on_connected(self, name: str):
+        """连接建立"""
+        stats = self.register(name)
+        now = time.monotonic()
+
+        if stats.disconnected_at is not None and stats.connected_at is not None:
+            # 曾经连接过，这次是重连
+            stats.reconnect_count += 1
+            stats.total_downtime += now - stats.disconnected_at
+        stats.connected = True
+        stats.connected_at = now
+        stats.disconnected_at = None
+
+    def on_disconnected(self, name: str, close_code: Optional[int] = None) -> float:
+        """
+        连接断开或连接失败
+
+        Args:
+            name: 数据源名称
+            close_code: WebSocket关闭码，连接失败时为None
+
+        Returns:
+            float: 下次重连前应等待的秒数
+        """
+        stats = self.register(name)
+        now = time.monotonic()
+
+        was_stable = stats.connected and now - stats.connected_at >= self.stable_after
+        if was_stable:
+            stats.consecutive_failures = 0
+
+        if stats.connected:
+            stats.disconnected_at = now
+        stats.connected = False
+        stats.last_close_code = close_code
+        stats.consecutive_failures += 1
+
+        # 服务端正常关闭（如定期断开）且不是频繁断线：立即重连
+        if close_code in CLEAN_CLOSE_CODES and stats.consecutive_failures == 1:
+            return 0.0
+
+        # 全抖动指数退避，避免所有连接同时重连（限制指数，长时间断线时不会溢出）
+        exponent = min(stats.consecutive_failures - 1, MAX_BACKOFF_EXPONENT)
+        ceiling = min(self.max_delay, self.base_delay * (2 ** exponent))
+        return random.uniform(0, ceiling)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """获取所有数据源的连接统计"""
+        return {name: stats.to_dict() for name, stats in list(self.feeds.items())}
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+浏览器进程资源采样
+按固定间隔统计浏览器进程树（主进程及全部子进程）的内存(RSS)和CPU占用，优先使用psutil，未安装时读取/proc
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+from core.logger import get_logger, log_extra
+from config import RESOURCE_SAMPLE_INTERVAL
+
+logger = get_logger("resource_sampler")
+
+_CLK_TCK = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def _proc_children_map() -> Dict[int, List[int]]:
+    """读取/proc建立 父进程 -> 子进程 映射"""
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as f:
+                # 进程名可能包含空格和括号，从最后一个')'之后解析
+                fields = f.read().rsplit(')', 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+    return children
+
+
+def _proc_usage(pid: int) -> Optional[Tuple[int, float]]:
+    """读取单个进程的 (RSS字节, 累计CPU秒)，进程已退出返回None"""
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open(f'/proc/{pid}/statm', 'r') as f:
+            rss_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    # ')'之后第12、13个字段为utime、stime（时钟滴答）
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / _CLK_TCK
+    return rss_pages * _PAGE_SIZE, cpu_seconds
+
+
+def process_tree_usage(pid: int) -> Optional[Tuple[int, int, float]]:
+    """
+    统计进程树的资源占用
+
+    Args:
+        pid: 根进程ID（浏览器主进程或chromedriver）
+
+    Returns:
+        Tuple[进程数, RSS字节, 累计CPU秒]: 根进程不存在时返回None
+    """
+    if PSUTIL_AVAILABLE:
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None
+        count, rss, cpu = 0, 0, 0.0
+        for process in processes:
+            try:
+                times = process.cpu_times()
+                rss += process.memory_info().rss
+                cpu += times.user + times.system
+                count += 1
+            except psutil.Error:
+                continue
+        return count, rss, cpu
+
+    if not os.path.isdir('/proc'):
+        return None
+    children = _proc_children_map()
+    count, rss, cpu = 0, 0, 0.0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        usage = _proc_usage(current)
+        if usage is None:
+            if current == pid:
+                return None
+            continue
+        count += 1
+        rss += usage[0]
+        cpu += usage[1]
+        pending.extend(children.get(current, ()))
+    return count, rss, cpu
+
+
+class ResourceSampler:
+    """浏览器进程树资源采样器 - 后台线程按间隔采样，get_stats()返回最近一次结果"""
+
+    def __init__(self, pid_source: Callable[[], Dict[str, Optional[int]]], interval: float = RESOURCE_SAMPLE_INTERVAL):
+        """
+        初始化采样器
+
+        Args:
+            pid_source: 返回 {名称: 根进程ID} 的函数，每次采样时调用（浏览器重启后进程ID会变化）
+            interval: 采样间隔（秒）
+        """
+        self.pid_source = pid_source
+        self.interval = interval
+        self.running = False
+        self.thread = None
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self._last: Dict[str, Tuple[int, float, float]] = {}  # 名称 -> (进程ID, 累计CPU秒, 采样时间)
+
+    def start(self):
+        """启动采样线程"""
+        self.running = True
+        self.thread = threading.Thread(target=self._sample_loop, name="resource-sampler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """停止采样线程"""
+        self.running = False
+
+    def _sample_loop(self):
+        while self.running:
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error("资源采样错误: %s", e, extra=log_extra(key="resource_sampler.error"))
+            time.sleep(self.interval)
+
+    def sample(self) -> Dict[str, Dict[str, Any]]:
+        """采样一次；CPU占用率为相邻两次采样间的平均值（100%为一个核心）"""
+        now = time.monotonic()
+        stats: Dict[str, Dict[str, Any]] = {}
+        for name, pid in self.pid_source().items():
+            usage = process_tree_usage(pid) if pid else None
+            if usage is None:
+                self._last.pop(name, None)
+                continue
+
+            count, rss, cpu_seconds = usage
+            cpu_percent = None
+            last = self._last.get(name)
+            if last and last[0] == pid and now > last[2]:
+                cpu_percent = round(max(cpu_seconds - last[1], 0.0) / (now - last[2]) * 100, 1)
+            self._last[name] = (pid, cpu_seconds, now)
+
+            stats[name] = {
+                "pid": pid,
+                "processes": count,
+                "rss_mb": round(rss / 1024 / 1024, 1),
+                "cpu_percent": cpu_percent,
+            }
+
+        # 整体替换，读取方无需加锁
+        self.stats = stats
+        return stats
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """最近一次采样结果"""
+        return self.stats
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+浏览器标签页回收策略
+长时间运行的交易页面会累积内存和失效的前端状态，按实测的JS堆、DOM节点数、进程内存、抓取耗时漂移，
+以及存活时间、抓取次数或连续失败次数刷新/重开标签页
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from config import (PAGE_REFRESH_INTERVAL, TAB_MAX_JS_HEAP_MB, TAB_MAX_DOM_NODES, TAB_MAX_RSS_MB,
+                    TAB_MAX_LATENCY_DRIFT)
+
+# 回收动作: 刷新当前标签页 / 关闭后重新打开 / 先打开替换标签页，订单簿就绪后再切换（不中断数据）
+RECYCLE_REFRESH = "refresh"
+RECYCLE_REOPEN = "reopen"
+RECYCLE_WARM = "warm"
+
+LATENCY_BASELINE_SAMPLES = 20  # 回收后前N次成功抓取的平均耗时作为基线
+LATENCY_EWMA_ALPHA = 0.1       # 近期抓取耗时的指数平滑系数
+
+
+@dataclass
+class TabState:
+    """单个标签页的运行统计"""
+    opened_at: float = field(default_factory=time.monotonic)  # 打开或上次回收时间 (monotonic)
+    scrapes: int = 0                 # 本次回收后的抓取次数
+    consecutive_failures: int = 0    # 连续抓取失败次数
+    recycle_count: int = 0           # 累计回收次数
+    last_recycle_reason: Optional[str] = None
+    ready_time: Optional[float] = None  # 打开或上次回收到订单簿就绪的耗时（秒），未就绪为None
+    js_heap_mb: Optional[float] = None  # 最近一次采样的JS堆占用
+    dom_nodes: Optional[int] = None     # 最近一次采样的DOM节点数
+    rss_mb: Optional[float] = None      # 最近一次采样的进程内存
+    latency_samples: int = 0            # 本次回收后记录耗时的抓取次数
+    latency_baseline: Optional[float] = None  # 回收后前N次抓取的平均耗时（秒）
+    latency_recent: Optional[float] = None    # 近期抓取耗时（指数平滑，秒）
+
+    def record_scrape(self, ok: bool, latency: Optional[float] = None):
+        """记录一次抓取结果（latency为本次抓取耗时，只统计成功的抓取）"""
+        self.scrapes += 1
+        self.consecutive_failures = 0 if ok else self.consecutive_failures + 1
+        if ok and latency is not None:
+            self._record_latency(latency)
+
+    def _record_latency(self, latency: float):
+        self.latency_samples += 1
+        if self.latency_samples <= LATENCY_BASELINE_SAMPLES:
+            baseline = self.latency_baseline or 0.0
+            self.latency_baseline = baseline + (latency - baseline) / self.latency_samples
+            self.latency_recent = self.latency_baseline
+        else:
+            self.latency_recent += LATENCY_EWMA_ALPHA * (latency - self.latency_recent)
+
+    def latency_drift(self) -> Optional[float]:
+        """近期抓取耗时相对基线的倍数，基线尚未建立时为None"""
+        if self.latency_samples <= LATENCY_BASELINE_SAMPLES or not self.latency_baseline:
+            return None
+        return self.latency_recent / self.latency_baseline
+
+    def record_metrics(self, js_heap_mb: Optional[float] = None, dom_nodes: Optional[int] = None,
+                       rss_mb: Optional[float] = None):
+        """记录一次资源指标采样（未采到的项保持不变）"""
+        if js_heap_mb is not None:
+            self.js_heap_mb = js_heap_mb
+        if dom_nodes is not None:
+            self.dom_nodes = dom_nodes
+        if rss_mb is not None:
+            self.rss_mb = rss_mb
+
+    def record_ready(self, ready_time: Optional[float] = None):
+        """记录订单簿就绪（打开或回收后第一份有效订单簿）；不传耗时则按打开时间计算"""
+        self.ready_time = time.monotonic() - self.opened_at if ready_time is None else ready_time
+
+    def record_recycle(self, reason: str):
+        """记录一次回收并重新计数"""
+        self.opened_at = time.monotonic()
+        self.scrapes = 0
+        self.consecutive_failures = 0
+        self.recycle_count += 1
+        self.last_recycle_reason = reason
+        self.ready_time = None
+        self.js_heap_mb = self.dom_nodes = self.rss_mb = None
+        self.latency_samples = 0
+        self.latency_baseline = self.latency_recent = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        drift = self.latency_drift()
+        return {
+            "age": round(time.monotonic() - self.opened_at, 1),
+            "scrapes": self.scrapes,
+            "consecutive_failures": self.consecutive_failures,
+            "recycle_count": self.recycle_count,
+            "last_recycle_reason": self.last_recycle_reason,
+            "ready_time": None if self.ready_time is None else round(self.ready_time, 2),
+            "js_heap_mb": None if self.js_heap_mb is None else round(self.js_heap_mb, 1),
+            "dom_nodes": self.dom_nodes,
+            "rss_mb": None if self.rss_mb is None else round(self.rss_mb, 1),
+            "latency_drift": None if drift is None else round(drift, 2),
+        }
+
+
+@dataclass
+class TabRecyclePolicy:
+    """标签页回收策略（各项为0表示不按该条件回收）"""
+    max_age: float = PAGE_REFRESH_INTERVAL  # 最长存活时间（秒），资源未超预算时的兜底
+    max_scrapes: int = 0                    # 最多抓取次数
+    max_failures: int = 3                   # 连续失败次数
+    max_js_heap_mb: float = TAB_MAX_JS_HEAP_MB
+    max_dom_nodes: int = TAB_MAX_DOM_NODES
+    max_rss_mb: float = TAB_MAX_RSS_MB
+    max_latency_drift: float = TAB_MAX_LATENCY_DRIFT
+    action: str = RECYCLE_WARM              # 其他条件触发时的动作；连续失败总是重开
+
+    def check(self, state: TabState) -> Optional[str]:
+        """
+        判断标签页是否需要回收
+
+        Returns:
+            str: 回收原因，不需要回收时返回None
+        """
+        if self.max_failures and state.consecutive_failures >= self.max_failures:
+            return f"连续{state.consecutive_failures}次抓取失败"
+        if self.max_js_heap_mb and state.js_heap_mb is not None and state.js_heap_mb >= self.max_js_heap_mb:
+            return f"JS堆{state.js_heap_mb:.0f}MB超过{self.max_js_heap_mb:.0f}MB"
+        if self.max_dom_nodes and state.dom_nodes is not None and state.dom_nodes >= self.max_dom_nodes:
+            return f"DOM节点{state.dom_nodes}超过{self.max_dom_nodes}"
+        if self.max_rss_mb and state.rss_mb is not None and state.rss_mb >= self.max_rss_mb:
+            return f"进程内存{state.rss_mb:.0f}MB超过{self.max_rss_mb:.0f}MB"
+        drift = state.latency_drift()
+        if self.max_latency_drift and drift is not None and drift >= self.max_latency_drift:
+            return f"抓取耗时为基线的{drift:.1f}倍"
+        if self.max_age and time.monotonic() - state.opened_at >= self.max_age:
+            return f"运行超过{self.max_age:.0f}秒"
+        if self.max_scrapes and state.scrapes >= self.max_scrapes:
+            return f"抓取超过{self.max_scrapes}次"
+        return None
+
+    def action_for(self, state: TabState) -> str:
+        """回收动作：连续失败说明页面可能已失效，直接重开"""
+        if self.max_failures and state.consecutive_failures >= self.max_failures:
+            return RECYCLE_REOPEN
+        return self.action
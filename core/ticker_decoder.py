@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ticker消息解码器
+行情回调只需要价格、事件时间和买一/卖一，不必完整解析每条JSON
+"""
+
+import json
+from typing import NamedTuple, Optional
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+from config import TICKER_DECODER
+
+
+class TickerFields(NamedTuple):
+    """解码后的ticker字段"""
+    stream: Optional[str] = None      # 组合流的stream名称
+    price: Optional[float] = None     # 最新成交价 (c)
+    event_time: Optional[int] = None  # 事件时间 (E)
+    bid: Optional[float] = None       # 买一价 (b)
+    ask: Optional[float] = None       # 卖一价 (a)
+
+
+def _to_float(value) -> Optional[float]:
+    """字段值转换为float，缺失返回None"""
+    return float(value) if value is not None else None
+
+
+class JsonTickerDecoder:
+    """标准库json解码器 - 完整解析整条消息"""
+
+    name = "json"
+
+    def _loads(self, message):
+        return json.loads(message)
+
+    def decode(self, message) -> TickerFields:
+        """
+        解码ticker消息
+
+        Args:
+            message: 原始WebSocket消息（支持 {"stream": ..., "data": {...}} 组合流格式）
+        """
+        obj = self._loads(message)
+        stream = obj.get('stream')
+        if stream is not None and 'data' in obj:
+            obj = obj['data']
+        if not isinstance(obj, dict):
+            return TickerFields(stream=stream)
+
+        # bookTicker只取买一/卖一，其它ticker事件只取最新价
+        event_type = obj.get('e')
+        with_price = event_type != 'bookTicker'
+        with_quotes = event_type is None or not with_price
+
+        event_time = obj.get('E')
+        bid = obj.get('b') if with_quotes else None
+        ask = obj.get('a') if with_quotes else None
+        return TickerFields(
+            stream=stream,
+            price=_to_float(obj.get('c')) if with_price else None,
+            event_time=int(event_time) if event_time is not None else None,
+            bid=float(bid) if isinstance(bid, str) else None,
+            ask=float(ask) if isinstance(ask, str) else None,
+        )
+
+
+class OrjsonTickerDecoder(JsonTickerDecoder):
+    """orjson解码器 - 完整解析但速度更快（需要安装orjson）"""
+
+    name = "orjson"
+
+    def _loads(self, message):
+        return orjson.loads(message)
+
+
+class FastTickerDecoder:
+    """
+    快速提取解码器 - 直接在字符串中定位所需字段，不构建完整对象
+
+    要求消息为交易所推送的紧凑JSON（无多余空格），其它格式自动回退到完整解析
+    """
+
+    name = "fast"
+
+    def __init__(self):
+        self._fallback = get_ticker_decoder("orjson" if ORJSON_AVAILABLE else "json")
+
+    def decode(self, message) -> TickerFields:
+        """解码ticker消息，格式不符合预期时回退到完整解析"""
+        if message.__class__ is not str:
+            message = message.decode('utf-8')
+
+        find = message.find
+
+        # 组合流/Backpack消息的stream字段
+        start = find('"stream":"')
+        stream = message[start + 10:find('"', start + 10)] if start >= 0 else None
+
+        # 事件类型决定需要哪些字段: bookTicker只有买一/卖一，ticker只有最新价
+        start = find('"e":"')
+        event_type = message[start + 5] if start >= 0 else None
+        price = bid = ask = None
+
+        # 最新价 (c)、买一 (b)、卖一 (a) 都是字符串形式的数字
+        if event_type != 'b':
+            start = find('"c":"')
+            if start >= 0:
+                price = float(message[start + 5:find('"', start + 5)])
+        if event_type is None or event_type == 'b':
+            start = find('"b":"')
+            if start >= 0:
+                bid = float(message[start + 5:find('"', start + 5)])
+            start = find('"a":"')
+            if start >= 0:
+                ask = float(message[start + 5:find('"', start + 5)])
+
+        # 既没有stream也没有价格：可能是带空格的JSON或订阅应答，交给完整解析
+        if stream is None and price is None and bid is None:
+            return self._fallback.decode(message)
+
+        # 事件时间 (E) 是整数
+        start = find('"E":')
+        if start >= 0:
+            start += 4
+            end = find(',', start)
+            event_time = int(message[start:end if end >= 0 else find('}', start)])
+        else:
+            event_time = None
+
+        # 按位置直接构造元组，避免NamedTuple关键字参数的开销
+        return _tuple_new(TickerFields, (stream, price, event_time, bid, ask))
+
+
+_tuple_new = tuple.__new__
+
+
+_DECODERS = {
+    "json": JsonTickerDecoder,
+    "orjson": OrjsonTickerDecoder,
+    "fast": FastTickerDecoder,
+}
+
+
+def get_ticker_decoder(name: Optional[str] = None):
+    """
+    创建ticker解码器
+
+    Args:
+        name: 解码器名称 ("fast", "orjson", "json")，不传使用配置 TICKER_DECODER
+
+    Returns:
+        解码器实例，orjson不可用时回退到json
+    """
+    name = (name or TICKER_DECODER).lower()
+    if name == "orjson" and not ORJSON_AVAILABLE:
+        name = "json"
+    decoder_cls = _DECODERS.get(name)
+    if decoder_cls is None:
+        raise ValueError(f"未知的ticker解码器: {name}")
+    return decoder_cls()
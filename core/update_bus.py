@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+合并更新总线
+交易所回调只把最新数据写入各自的槽位并唤醒消费者，消费者（API快照、记录器、推送）醒来后取出有变化的槽位，
+可按最小间隔合并处理；发布的数据必须是之后不再修改的快照
+"""
+
+import itertools
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# 消费者处理函数: (数据源名称, 最新数据)
+UpdateHandler = Callable[[str, Any], None]
+
+
+class UpdateConsumer:
+    """总线消费者 - 在独立线程中等待发布，醒来后取出有变化的槽位"""
+
+    def __init__(self, bus: "ConflatingUpdateBus", name: str, handler: UpdateHandler,
+                 interval: float, feeds: Optional[Sequence[str]] = None):
+        """
+        初始化消费者
+
+        Args:
+            bus: 所属总线
+            name: 消费者名称
+            handler: 处理函数
+            interval: 两次处理之间的最小间隔（秒），期间的更新合并处理；0表示发布后立即处理
+            feeds: 只关心的数据源，不传表示全部
+        """
+        self.bus = bus
+        self.name = name
+        self.handler = handler
+        self.interval = interval
+        self.feeds = set(feeds) if feeds else None
+        self.running = False
+        self.thread = None
+        self.delivered = 0
+        self._seen: Dict[str, int] = {}
+        self._stopping = threading.Event()
+
+    def drain(self) -> int:
+        """处理自上次以来有更新的槽位，返回处理数量"""
+        count = 0
+        for feed, (seq, value) in self.bus.snapshot_slots().items():
+            if self.feeds is not None and feed not in self.feeds:
+                continue
+            if self._seen.get(feed) == seq:
+                continue
+            self._seen[feed] = seq
+            try:
+                self.handler(feed, value)
+            except Exception as e:
+                print(f"❌ 总线消费者{self.name}处理{feed}失败: {e}")
+            count += 1
+
+        self.delivered += count
+        return count
+
+    def _loop(self):
+        """消费循环: 没有新发布时阻塞等待，不空转"""
+        version = 0
+        while self.running:
+            version = self.bus.wait_for_publish(version, stopped=lambda: not self.running)
+            if not self.running:
+                break
+            self.drain()
+            if self.interval > 0:
+                # 限制处理频率，期间的发布在下一次drain中合并
+                self._stopping.wait(self.interval)
+
+    def start(self):
+        """启动消费线程"""
+        if self.running:
+            return
+        self.running = True
+        self._stopping.clear()
+        self.thread = threading.Thread(target=self._loop, name=f"bus-{self.name}", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """停止消费线程（退出前再取一次，避免丢失最后的更新）"""
+        self.running = False
+        self._stopping.set()
+        self.bus.wake()
+        if self.thread:
+            self.thread.join(timeout=5)
+        self.drain()
+
+
+class ConflatingUpdateBus:
+    """合并更新总线 - 每个数据源一个最新值槽位，发布时唤醒等待中的消费者"""
+
+    def __init__(self):
+        # 数据源 -> (序号, 最新数据)；单次字典赋值在GIL下是原子的，读取槽位不加锁
+        self._slots: Dict[str, Tuple[int, Any]] = {}
+        self._seq = itertools.count(1)
+        self._version = 0  # 最近一次发布的序号，消费者据此判断是否有新发布
+        self._published = threading.Condition()
+        self.published: Dict[str, int] = {}
+        self.consumers: List[UpdateConsumer] = []
+
+    def publish(self, feed: str, value: Any):
+        """
+        发布最新数据（在交易所回调线程中调用，只持有锁完成赋值和唤醒）
+
+        Args:
+            feed: 数据源名称
+            value: 最新数据，发布后不能再修改（客户端原地更新的数据对象需先复制一份）
+        """
+        with self._published:
+            seq = next(self._seq)
+            self._slots[feed] = (seq, value)
+            self._version = seq
+            self.published[feed] = self.published.get(feed, 0) + 1
+            self._published.notify_all()
+
+    def wait_for_publish(self, version: int, timeout: Optional[float] = None,
+                         stopped: Optional[Callable[[], bool]] = None) -> int:
+        """
+        阻塞到有比version更新的发布
+
+        Args:
+            version: 上次等待返回的发布序号
+            timeout: 最长等待时间（秒），不传表示一直等待
+            stopped: 返回True时立即结束等待（在wake唤醒后检查）
+
+        Returns:
+            int: 当前发布序号，下次等待时传入
+        """
+        with self._published:
+            self._published.wait_for(lambda: self._version != version or (stopped is not None and stopped()),
+                                     timeout)
+            return self._version
+
+    def wake(self):
+        """唤醒所有等待中的消费者（停止时使用）"""
+        with self._published:
+            self._published.notify_all()
+
+    def latest(self, feed: str) -> Any:
+        """读取数据源的最新数据"""
+        slot = self._slots.get(feed)
+        return slot[1] if slot else None
+
+    def snapshot_slots(self) -> Dict[str, Tuple[int, Any]]:
+        """复制当前全部槽位"""
+        return self._slots.copy()
+
+    def subscribe(self, name: str, handler: UpdateHandler, interval: float,
+                  feeds: Optional[Sequence[str]] = None) -> UpdateConsumer:
+        """
+        注册消费者
+
+        Args:
+            name: 消费者名称
+            handler: 处理函数 (数据源名称, 最新数据)
+            interval: 两次处理之间的最小间隔（秒），0表示发布后立即处理
+            feeds: 只关心的数据源，不传表示全部
+        """
+        consumer = UpdateConsumer(self, name, handler, interval, feeds)
+        self.consumers.append(consumer)
+        return consumer
+
+    def start(self):
+        """启动所有消费者"""
+        for consumer in self.consumers:
+            consumer.start()
+
+    def stop(self):
+        """停止所有消费者"""
+        for consumer in self.consumers:
+            consumer.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取发布和消费统计（发布数与处理数之差即被合并的更新）"""
+        return {
+            "published": dict(self.published),
+            "consumers": {consumer.name: consumer.delivered for consumer in self.consumers},
+        }
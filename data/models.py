@@ -3,10 +3,12 @@
 数据模型定义
 """
 
-from dataclasses import dataclass, field
+from array import array
+from collections.abc import Sequence
+from dataclasses import FrozenInstanceError, dataclass, field, replace
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional, Dict, Any
+from typing import Iterable, Iterator, Optional, Dict, Any, Tuple, Union
 
 
 class OrderType(Enum):
@@ -15,58 +17,205 @@ class OrderType(Enum):
     ASK = "ask"  # 卖单
 
 
-@dataclass
+@dataclass(frozen=True)
 class OrderBookLevel:
-    """订单簿档位"""
+    """订单簿档位 - 不可变，订单簿中共享的档位对象不会被任一消费者修改"""
     price: float
     size: float
     total_size: float = 0.0
     order_type: OrderType = OrderType.BID
 
 
-@dataclass
+def derive_prices(best_bid: Optional[float], best_ask: Optional[float]) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    """由买一/卖一计算 (中间价, 价差, 价差百分比)，任一方缺失时为None"""
+    if not (best_ask and best_bid):
+        return None, None, None
+    mid_price = (best_ask + best_bid) / 2
+    spread = best_ask - best_bid
+    spread_percent = (spread / mid_price) * 100 if spread and mid_price > 0 else None
+    return mid_price, spread, spread_percent
+
+
+@dataclass(frozen=True)
 class OrderBook:
-    """订单簿数据"""
-    asks: List[OrderBookLevel] = field(default_factory=list)  # 卖单列表
-    bids: List[OrderBookLevel] = field(default_factory=list)  # 买单列表
+    """
+    订单簿数据 - 构建后不可变，买一/卖一/中间价/价差在构建时计算一次，之后按普通属性读取
+
+    传入的档位列表在构建时转换为元组，之后无法增删档位，预计算的派生字段不会与档位不一致
+    """
+    asks: Tuple[OrderBookLevel, ...] = ()  # 卖单 (价格从低到高)
+    bids: Tuple[OrderBookLevel, ...] = ()  # 买单 (价格从高到低)
     timestamp: datetime = field(default_factory=datetime.now)
+    best_ask: Optional[float] = field(init=False, default=None)        # 最低卖价
+    best_bid: Optional[float] = field(init=False, default=None)        # 最高买价
+    mid_price: Optional[float] = field(init=False, default=None)       # 中间价
+    spread: Optional[float] = field(init=False, default=None)          # 价差
+    spread_percent: Optional[float] = field(init=False, default=None)  # 价差百分比
 
-    @property
-    def best_ask(self) -> Optional[float]:
-        """最低卖价"""
-        return self.asks[0].price if self.asks else None
+    def __post_init__(self):
+        object.__setattr__(self, "asks", tuple(self.asks))
+        object.__setattr__(self, "bids", tuple(self.bids))
+        best_ask = self.asks[0].price if self.asks else None
+        best_bid = self.bids[0].price if self.bids else None
+        _set_derived(self, best_bid, best_ask)
 
-    @property
-    def best_bid(self) -> Optional[float]:
-        """最高买价"""
-        return self.bids[0].price if self.bids else None
 
-    @property
-    def mid_price(self) -> Optional[float]:
-        """中间价"""
-        if self.best_ask and self.best_bid:
-            return (self.best_ask + self.best_bid) / 2
-        return None
+def _set_derived(book, best_bid: Optional[float], best_ask: Optional[float]):
+    """写入构建时计算的派生字段（对象已冻结，绕过__setattr__）"""
+    mid_price, spread, spread_percent = derive_prices(best_bid, best_ask)
+    object.__setattr__(book, "best_bid", best_bid)
+    object.__setattr__(book, "best_ask", best_ask)
+    object.__setattr__(book, "mid_price", mid_price)
+    object.__setattr__(book, "spread", spread)
+    object.__setattr__(book, "spread_percent", spread_percent)
+
+
+class LevelView(Sequence):
+    """
+    单侧档位的只读视图 - 全部档位按 [价格, 数量, 累计数量, 价格, ...] 连续存放在一个array('d')中，
+    按下标访问时才生成OrderBookLevel
+
+    与CompactOrderBook一样构建后不可变：数组私有保存（传入后调用方不再修改），data只返回只读memoryview，属性不能重新赋值
+    """
+    __slots__ = ("_data", "order_type")
+
+    def __init__(self, data: array, order_type: OrderType):
+        object.__setattr__(self, "_data", data)
+        object.__setattr__(self, "order_type", order_type)
+
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name):
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
 
     @property
-    def spread(self) -> Optional[float]:
-        """价差"""
-        if self.best_ask and self.best_bid:
-            return self.best_ask - self.best_bid
-        return None
+    def data(self) -> memoryview:
+        """全部档位数值的只读视图 [价格, 数量, 累计数量, ...]"""
+        return memoryview(self._data).toreadonly()
+
+    def __len__(self) -> int:
+        return len(self._data) // 3
+
+    def __getitem__(self, index):
+        count = len(self._data) // 3
+        if isinstance(index, slice):
+            return [self._level(i) for i in range(*index.indices(count))]
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("档位下标超出范围")
+        return self._level(index)
+
+    def __iter__(self) -> Iterator[OrderBookLevel]:
+        return map(self._level, range(len(self._data) // 3))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, LevelView):
+            return NotImplemented
+        return self.order_type is other.order_type and self._data == other._data
+
+    def __hash__(self) -> int:
+        return hash((self.order_type, self._data.tobytes()))
+
+    def __reduce__(self):
+        # __setattr__被禁止，copy/deepcopy/pickle通过构造函数重建
+        return (LevelView, (self._data, self.order_type))
+
+    def __repr__(self) -> str:
+        return f"LevelView({self.order_type.value}, {len(self)}档)"
+
+    def _level(self, index: int) -> OrderBookLevel:
+        offset = index * 3
+        data = self._data
+        return OrderBookLevel(price=data[offset], size=data[offset + 1], total_size=data[offset + 2],
+                              order_type=self.order_type)
 
     @property
-    def spread_percent(self) -> Optional[float]:
-        """价差百分比"""
-        if self.spread and self.mid_price and self.mid_price > 0:
-            return (self.spread / self.mid_price) * 100
-        return None
+    def best_price(self) -> Optional[float]:
+        """第一档价格，没有档位时为None"""
+        return self._data[0] if self._data else None
+
+    def pairs(self, depth: Optional[int] = None) -> Tuple[Tuple[float, float], ...]:
+        """前depth档的 (价格, 数量)，不生成档位对象"""
+        end = None if depth is None else depth * 3
+        return tuple(zip(self._data[0:end:3], self._data[1:end:3]))
+
+
+class CompactOrderBook:
+    """
+    紧凑订单簿 - 与OrderBook接口兼容（asks/bids/best_bid/best_ask/mid_price/spread/spread_percent/timestamp）
+
+    每侧一个array('d')，不为每个档位创建对象；asks/bids为LevelView，只有逐档访问时才生成OrderBookLevel。
+    与OrderBook一样构建后不可变，派生字段在构建时计算
+    """
+    __slots__ = ("asks", "bids", "timestamp", "best_bid", "best_ask", "mid_price", "spread", "spread_percent")
+
+    def __init__(self, asks: LevelView, bids: LevelView, timestamp: Optional[datetime] = None):
+        object.__setattr__(self, "asks", asks)  # 卖单 (价格从低到高)
+        object.__setattr__(self, "bids", bids)  # 买单 (价格从高到低)
+        object.__setattr__(self, "timestamp", timestamp or datetime.now())
+        _set_derived(self, bids.best_price, asks.best_price)
+
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name):
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+
+    @classmethod
+    def from_rows(cls, asks: Iterable[Iterable[float]], bids: Iterable[Iterable[float]],
+                  timestamp: Optional[datetime] = None) -> "CompactOrderBook":
+        """由已排序的 [价格, 数量, 累计数量] 行构建"""
+        return cls(LevelView(array('d', [value for row in asks for value in row]), OrderType.ASK),
+                   LevelView(array('d', [value for row in bids for value in row]), OrderType.BID),
+                   timestamp)
+
+    @classmethod
+    def from_pairs(cls, asks: Iterable[Tuple[float, float]], bids: Iterable[Tuple[float, float]],
+                   timestamp: Optional[datetime] = None) -> "CompactOrderBook":
+        """由已排序的 (价格, 数量) 构建，累计数量按顺序累加"""
+        return cls(_view_from_pairs(asks, OrderType.ASK), _view_from_pairs(bids, OrderType.BID), timestamp)
+
+    def to_orderbook(self) -> OrderBook:
+        """生成全部档位对象的OrderBook"""
+        return OrderBook(asks=tuple(self.asks), bids=tuple(self.bids), timestamp=self.timestamp)
+
+    def __reduce__(self):
+        # __setattr__被禁止，copy/deepcopy/pickle通过构造函数重建（派生字段重新计算）
+        return (CompactOrderBook, (self.asks, self.bids, self.timestamp))
+
+    def __eq__(self, other) -> bool:
+        # 与冻结的OrderBook一样按值比较（派生字段由档位决定，不需要单独比较）
+        if not isinstance(other, CompactOrderBook):
+            return NotImplemented
+        return self.asks == other.asks and self.bids == other.bids and self.timestamp == other.timestamp
+
+    def __hash__(self) -> int:
+        return hash((self.asks, self.bids, self.timestamp))
+
+    def __repr__(self) -> str:
+        return f"CompactOrderBook(asks={self.asks!r}, bids={self.bids!r}, timestamp={self.timestamp!r})"
+
+
+# 订单簿快照: 逐档对象的OrderBook或数组存储的CompactOrderBook，两者接口相同，消费者不区分
+AnyOrderBook = Union[OrderBook, CompactOrderBook]
+
+
+def _view_from_pairs(pairs: Iterable[Tuple[float, float]], order_type: OrderType) -> LevelView:
+    values = []
+    total = 0.0
+    for price, size in pairs:
+        total += size
+        values += (price, size, total)
+    return LevelView(array('d', values), order_type)
 
 
 @dataclass
 class LighterData:
     """Lighter数据"""
-    orderbook: Optional[OrderBook] = None
+    symbol: str = "BTC"  # 市场符号（多市场标签页池按此区分）
+    orderbook: Optional[AnyOrderBook] = None
     timestamp: datetime = field(default_factory=datetime.now)
     connected: bool = False
 
@@ -77,6 +226,7 @@ class BinanceData:
     symbol: str = "BTCUSDC"
     price: float = 0.0
     timestamp: datetime = field(default_factory=datetime.now)
+    orderbook: Optional[AnyOrderBook] = None  # 本地维护的深度订单簿（启用时）
 
 
 @dataclass
@@ -85,16 +235,30 @@ class BackpackData:
     symbol: str = "BTC_USDC_PERP"
     price: float = 0.0
     timestamp: datetime = field(default_factory=datetime.now)
+    best_bid: Optional[float] = None  # bookTicker买一价
+    best_ask: Optional[float] = None  # bookTicker卖一价
+    orderbook: Optional[AnyOrderBook] = None  # 本地维护的深度订单簿（启用时）
 
 
-@dataclass
+@dataclass(frozen=True)
 class BTCPriceData:
-    """BTC价格数据汇总"""
+    """BTC价格数据汇总 - 不可变快照，更新时通过with_update生成新版本"""
     binance: Optional[BinanceData] = None
     backpack: Optional[BackpackData] = None
     lighter: Optional[LighterData] = None
     timestamp: datetime = field(default_factory=datetime.now)
 
+    def with_update(self, timestamp: datetime, **feeds) -> "BTCPriceData":
+        """
+        生成包含新数据的下一个快照版本
+
+        Args:
+            timestamp: 新快照时间
+            **feeds: binance/backpack/lighter 的最新数据，须为之后不再修改的副本
+                     （更新总线上发布的数据由生产者线程复制，这里直接引用）
+        """
+        return replace(self, timestamp=timestamp, **feeds)
+
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
         result = {
@@ -108,6 +272,12 @@ class BTCPriceData:
                 "price": self.binance.price,
                 "timestamp": self.binance.timestamp.isoformat()
             }
+            if self.binance.orderbook:
+                result["prices"]["binance"].update({
+                    "best_bid": self.binance.orderbook.best_bid,
+                    "best_ask": self.binance.orderbook.best_ask,
+                    "mid_price": self.binance.orderbook.mid_price
+                })
 
         if self.backpack:
             result["prices"]["backpack"] = {
@@ -115,6 +285,12 @@ class BTCPriceData:
                 "price": self.backpack.price,
                 "timestamp": self.backpack.timestamp.isoformat()
             }
+            if self.backpack.orderbook:
+                result["prices"]["backpack"].update({
+                    "best_bid": self.backpack.orderbook.best_bid,
+                    "best_ask": self.backpack.orderbook.best_ask,
+                    "mid_price": self.backpack.orderbook.mid_price
+                })
 
         if self.lighter and self.lighter.orderbook:
             result["prices"]["lighter"] = {
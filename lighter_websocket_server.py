@@ -8,6 +8,7 @@ Lighter专用WebSocket服务器
 
 import time
 import threading
+from dataclasses import replace
 from datetime import datetime
 from flask import Flask, request
 from flask_socketio import SocketIO
@@ -16,7 +17,10 @@ import pytz
 
 from data.models import LighterData
 from core.lighter_manager import create_lighter_client
-from config import PAGE_REFRESH_INTERVAL
+from core.orderbook_diff import OrderBookDiff
+from core.update_bus import ConflatingUpdateBus
+from core.logger import setup_logging, shutdown_logging
+from config import PAGE_REFRESH_INTERVAL, BUS_PUSH_INTERVAL
 
 def get_china_time():
     """获取中国时间"""
@@ -32,6 +36,9 @@ class LighterWebSocketServer:
         self.running = False
         self.data_lock = threading.Lock()
         self.lighter_data = LighterData()
+        # 逐档差异按顺序直接推送（不经过合并总线），同时维护差异重建出的前N档，供新客户端作为全量起点
+        self.diff_lock = threading.Lock()
+        self.diff_levels = {'asks': {}, 'bids': {}}
         
         # 初始化Flask应用和WebSocket
         self.app = Flask(__name__)
@@ -65,6 +72,10 @@ class LighterWebSocketServer:
         # Lighter客户端
         self.lighter_client = None
         self.api_thread = None
+
+        # 合并更新总线：抓取线程只发布最新数据，推送线程按节奏广播
+        self.bus = ConflatingUpdateBus()
+        self.bus.subscribe('pusher', self._push_lighter_data, BUS_PUSH_INTERVAL, feeds=['lighter'])
     
     def setup_websocket_events(self):
         """设置WebSocket事件"""
@@ -75,19 +86,8 @@ class LighterWebSocketServer:
             # 发送当前Lighter数据
             with self.data_lock:
                 if self.lighter_data.orderbook:
-                    lighter_data = {
-                        'type': 'lighter_data',
-                        'data': {
-                            'best_bid': self.lighter_data.orderbook.best_bid,
-                            'best_ask': self.lighter_data.orderbook.best_ask,
-                            'mid_price': self.lighter_data.orderbook.mid_price,
-                            'spread': self.lighter_data.orderbook.spread,
-                            'connected': self.lighter_data.connected,
-                            'timestamp': get_china_time().strftime("%Y-%m-%d %H:%M:%S")
-                        },
-                        'timestamp': get_china_time().strftime("%Y-%m-%d %H:%M:%S")
-                    }
-                    self.socketio.emit('lighter_data', lighter_data, room=request.sid)
+                    self.socketio.emit('lighter_data', self._lighter_message(self.lighter_data), room=request.sid)
+            self._send_diff_snapshot(request.sid)
         
         @self.socketio.on('disconnect')
         def handle_disconnect():
@@ -100,19 +100,8 @@ class LighterWebSocketServer:
             # 立即发送当前数据
             with self.data_lock:
                 if self.lighter_data.orderbook:
-                    lighter_data = {
-                        'type': 'lighter_data',
-                        'data': {
-                            'best_bid': self.lighter_data.orderbook.best_bid,
-                            'best_ask': self.lighter_data.orderbook.best_ask,
-                            'mid_price': self.lighter_data.orderbook.mid_price,
-                            'spread': self.lighter_data.orderbook.spread,
-                            'connected': self.lighter_data.connected,
-                            'timestamp': get_china_time().strftime("%Y-%m-%d %H:%M:%S")
-                        },
-                        'timestamp': get_china_time().strftime("%Y-%m-%d %H:%M:%S")
-                    }
-                    self.socketio.emit('lighter_data', lighter_data, room=request.sid)
+                    self.socketio.emit('lighter_data', self._lighter_message(self.lighter_data), room=request.sid)
+            self._send_diff_snapshot(request.sid)
         
         @self.socketio.on('unsubscribe')
         def handle_unsubscribe():
@@ -149,41 +138,89 @@ class LighterWebSocketServer:
                 'service': 'Lighter WebSocket Server',
                 'running': self.running,
                 'connected': self.lighter_data.connected if self.lighter_data else False,
+                'changes': self.lighter_client.get_change_stats() if self.lighter_client else {},
                 'port': self.port,
                 'timestamp': get_china_time().strftime("%Y-%m-%d %H:%M:%S")
             }
     
     def _on_lighter_data(self, data: LighterData):
-        """Lighter数据回调"""
+        """Lighter数据回调（抓取线程中执行，复制一份不再修改的快照发布到总线）"""
+        self.bus.publish('lighter', replace(data))
+
+    def _on_lighter_diff(self, diff: OrderBookDiff):
+        """逐档差异回调（抓取线程中执行）：更新重建的前N档并按顺序广播，差异不能合并或丢弃"""
+        with self.diff_lock:
+            if diff.snapshot:
+                self.diff_levels = {'asks': {}, 'bids': {}}
+            for side, changes in (('asks', diff.asks), ('bids', diff.bids)):
+                levels = self.diff_levels[side]
+                for price, size in changes:
+                    if size:
+                        levels[price] = size
+                    else:
+                        levels.pop(price, None)
+            self.socketio.emit('lighter_diff', self._diff_message(diff))
+
+    def _send_diff_snapshot(self, sid):
+        """向新客户端发送重建的前N档作为全量差异，之后的增量差异在此基础上应用"""
+        with self.diff_lock:
+            if not (self.diff_levels['asks'] or self.diff_levels['bids']):
+                return
+            snapshot = OrderBookDiff(asks=sorted(self.diff_levels['asks'].items()),
+                                     bids=sorted(self.diff_levels['bids'].items(), reverse=True), snapshot=True)
+            self.socketio.emit('lighter_diff', self._diff_message(snapshot), room=sid)
+
+    @staticmethod
+    def _diff_message(diff: OrderBookDiff) -> dict:
+        """推送给客户端的逐档差异消息（数量为0表示删除该档位，snapshot为true时替换整个订单簿）"""
+        return {
+            'type': 'lighter_diff',
+            'data': diff.to_dict(),
+            'timestamp': get_china_time().strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+    @staticmethod
+    def _lighter_message(data: LighterData) -> dict:
+        """推送给客户端的Lighter消息（订单簿派生字段在构建时已算好，这里只读取属性）"""
+        orderbook = data.orderbook
+        timestamp = get_china_time().strftime("%Y-%m-%d %H:%M:%S")
+        return {
+            'type': 'lighter_data',
+            'data': {
+                'best_bid': orderbook.best_bid,
+                'best_ask': orderbook.best_ask,
+                'mid_price': orderbook.mid_price,
+                'spread': orderbook.spread,
+                'connected': data.connected,
+                'timestamp': timestamp
+            },
+            'timestamp': timestamp
+        }
+
+    def _push_lighter_data(self, feed: str, data: LighterData):
+        """总线消费者：更新当前数据并广播"""
         with self.data_lock:
             self.lighter_data = data
             
             # 🚀 WebSocket实时推送Lighter数据
             if data.orderbook:
-                lighter_data = {
-                    'type': 'lighter_data',
-                    'data': {
-                        'best_bid': data.orderbook.best_bid,
-                        'best_ask': data.orderbook.best_ask,
-                        'mid_price': data.orderbook.mid_price,
-                        'spread': data.orderbook.spread,
-                        'connected': data.connected,
-                        'timestamp': get_china_time().strftime("%Y-%m-%d %H:%M:%S")
-                    },
-                    'timestamp': get_china_time().strftime("%Y-%m-%d %H:%M:%S")
-                }
+                lighter_data = self._lighter_message(data)
                 # 广播给所有连接的客户端
                 self.socketio.emit('lighter_data', lighter_data)
     
     def start(self):
         """启动服务器"""
         print(f"🚀 启动Lighter WebSocket服务器...")
+
+        # 启动推送消费者
+        self.bus.start()
         
         # 启动Lighter客户端
         self.lighter_client = create_lighter_client(
             self._on_lighter_data, 
             headless=self.headless, 
-            refresh_interval=PAGE_REFRESH_INTERVAL
+            refresh_interval=PAGE_REFRESH_INTERVAL,
+            on_diff_callback=self._on_lighter_diff
         )
         
         if self.lighter_client.start():
@@ -214,6 +251,8 @@ class LighterWebSocketServer:
         
         if self.lighter_client:
             self.lighter_client.stop()
+
+        self.bus.stop()
         
         print("✅ Lighter WebSocket服务器已停止")
 
@@ -222,6 +261,9 @@ def main():
     print("=== Lighter专用WebSocket服务器 ===")
     print("只推送Lighter价格数据")
     print("")
+
+    # 初始化异步日志
+    setup_logging()
     
     # 创建服务器实例
     server = LighterWebSocketServer(port=8081, headless=True)
@@ -241,6 +283,7 @@ def main():
     
     finally:
         server.stop()
+        shutdown_logging()
         print("🔚 程序结束")
 
 if __name__ == "__main__":
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试公共夹具: 独立的异步采集引擎（每个测试一个事件循环线程）和轮询等待
+"""
+
+import time
+from typing import Callable
+
+import pytest
+
+from core.async_engine import AsyncIngestionEngine
+
+
+@pytest.fixture
+def engine():
+    """每个测试独立的采集引擎，测试结束后停止"""
+    engine = AsyncIngestionEngine(name="test-ingest")
+    engine.start()
+    yield engine
+    engine.stop()
+
+
+def wait_until(predicate: Callable[[], bool], timeout: float = 5.0, interval: float = 0.01) -> bool:
+    """轮询直到predicate为真或超时，返回最后一次的结果"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(interval)
+    return bool(predicate())
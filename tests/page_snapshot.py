@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试用的页面快照: 把保存的订单簿HTML解析成元素树，
+提供DrissionPage式的 ele/eles 查询（逐元素DOM解析），以及在node中执行页面内JS（单次run_js抓取、变化观察器）
+只支持订单簿抓取用到的 data-testid 等值/前缀匹配
+"""
+
+import json
+import shutil
+import subprocess
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+
+NODE = shutil.which("node")
+
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "wbr"}
+
+
+class Element:
+    """页面元素: 属性、子节点（元素或文本）"""
+
+    def __init__(self, tag: str, attrs: Dict[str, str]):
+        self.tag = tag
+        self.attrs = attrs
+        self.children: List[Any] = []
+
+    @property
+    def text(self) -> str:
+        return "".join(child if isinstance(child, str) else child.text for child in self.children)
+
+    def walk(self):
+        for child in self.children:
+            if isinstance(child, Element):
+                yield child
+                yield from child.walk()
+
+    def eles(self, locator: str) -> List["Element"]:
+        """DrissionPage定位语法: '@data-testid=值' 或 '@data-testid^前缀'"""
+        name, op, value = _parse_locator(locator)
+        result = []
+        for element in self.walk():
+            attr = element.attrs.get(name)
+            if attr is not None and (attr == value if op == "=" else attr.startswith(value)):
+                result.append(element)
+        return result
+
+    def ele(self, locator: str) -> Optional["Element"]:
+        found = self.eles(locator)
+        return found[0] if found else None
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"a": self.attrs,
+                "c": [child if isinstance(child, str) else child.to_json() for child in self.children]}
+
+
+def _parse_locator(locator: str):
+    body = locator[1:]
+    for op in ("^", "="):
+        if op in body:
+            name, value = body.split(op, 1)
+            return name, op, value
+    raise ValueError(f"不支持的定位语法: {locator}")
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Element("#document", {})
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        element = Element(tag, {name: value or "" for name, value in attrs})
+        self.stack[-1].children.append(element)
+        if tag not in _VOID_TAGS:
+            self.stack.append(element)
+
+    def handle_endtag(self, tag):
+        for index in range(len(self.stack) - 1, 0, -1):
+            if self.stack[index].tag == tag:
+                del self.stack[index:]
+                return
+
+    def handle_data(self, data):
+        self.stack[-1].children.append(data)
+
+
+def load_page(page_html: str) -> Element:
+    """解析HTML，返回可作为page传给parse_orderbook_from_page的文档根元素"""
+    builder = _TreeBuilder()
+    builder.feed(page_html)
+    builder.close()
+    return builder.root
+
+
+# node中的最小DOM: querySelector/querySelectorAll (属性等值/前缀选择器)、textContent、isConnected，
+# 以及只在__setText修改文本时回调的MutationObserver
+_NODE_DOM = """
+const observers = [];
+class El {
+    constructor(n, parent) {
+        this.attrs = n.a;
+        this.parent = parent;
+        this.detached = false;
+        this.children = n.c.map((c) => typeof c === 'string' ? c : new El(c, this));
+    }
+    get textContent() {
+        return this.children.map((c) => typeof c === 'string' ? c : c.textContent).join('');
+    }
+    get isConnected() {
+        return !this.detached && (!this.parent || this.parent.isConnected);
+    }
+    *walk() {
+        for (const c of this.children) {
+            if (typeof c !== 'string') { yield c; yield* c.walk(); }
+        }
+    }
+    querySelectorAll(sel) {
+        const m = sel.match(/^\\[([\\w-]+)(\\^?)="([^"]*)"\\]$/);
+        const out = [];
+        for (const el of this.walk()) {
+            const v = el.attrs[m[1]];
+            if (v !== undefined && (m[2] ? v.startsWith(m[3]) : v === m[3])) out.push(el);
+        }
+        return out;
+    }
+    querySelector(sel) { return this.querySelectorAll(sel)[0] || null; }
+}
+class MutationObserver {
+    constructor(callback) { this.callback = callback; this.targets = []; }
+    observe(target) { this.targets.push(target); if (!observers.includes(this)) observers.push(this); }
+    disconnect() { this.targets = []; observers.splice(observers.indexOf(this), 1); }
+}
+const window = {};
+const document = new El(JSON.parse(require('fs').readFileSync(0, 'utf8')), null);
+// 修改档位字段文本并通知观察该档位祖先元素的MutationObserver
+const __setText = (row, field, text) => {
+    const el = document.querySelector('[data-testid="' + row + '"]');
+    const target = el.querySelector('[data-testid="' + field + '"]');
+    target.children = [text];
+    for (const o of observers.slice()) {
+        for (let node = target; node; node = node.parent) {
+            if (o.targets.includes(node)) { o.callback([{type: 'characterData', target: target}]); break; }
+        }
+    }
+};
+// 模拟页面重新渲染: 容器从文档中移除
+const __detach = (testid) => { document.querySelector('[data-testid="' + testid + '"]').detached = true; };
+"""
+
+
+def run_page_js(page: Element, script: str) -> Any:
+    """在node中对页面快照执行run_js脚本（函数体，以return返回结果），返回JSON结果"""
+    return run_page_scripts(page, [script])[0]
+
+
+def run_page_scripts(page: Element, scripts: List[str]) -> List[Any]:
+    """
+    在同一个node进程中依次执行多个run_js脚本（共享window和页面状态，返回Promise的脚本等待其完成）
+
+    脚本中可调用 __setText(档位testid, 字段testid, 文本) 修改页面并触发MutationObserver，__detach(testid) 移除容器
+    """
+    steps = ",\n".join("async () => {\n" + script + "\n}" for script in scripts)
+    source = _NODE_DOM + (
+        "(async () => {\n"
+        "    const results = [];\n"
+        "    for (const step of [" + steps + "]) results.push(await step());\n"
+        "    console.log(JSON.stringify(results.map((r) => r === undefined ? null : r)));\n"
+        "})();\n"
+    )
+    completed = subprocess.run([NODE, "-e", source], input=json.dumps(page.to_json()),
+                               capture_output=True, text=True, check=True, timeout=30)
+    return json.loads(completed.stdout)
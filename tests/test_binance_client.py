@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+币安组合流: 运行时订阅/取消订阅，取消后不再返回旧价格，没有订阅时不连接
+"""
+
+import json
+import time
+
+from benchmarks.replay_server import ReplayServer
+from core.binance_client import BinanceClient
+from tests.conftest import wait_until
+
+
+def ticker_frame(symbol, price):
+    return json.dumps({"stream": f"{symbol.lower()}@ticker",
+                       "data": {"e": "24hrTicker", "E": 1760659200000, "s": symbol, "c": str(price)}},
+                      separators=(",", ":"))
+
+
+def stream_server(price):
+    """记录每次连接的请求地址，按地址中的streams推送一条ticker"""
+    paths = []
+
+    async def handler(server, websocket):
+        path = websocket.request.path
+        paths.append(path)
+        for stream in path.partition("streams=")[2].split("/"):
+            if stream:
+                await websocket.send(ticker_frame(stream.split("@")[0].upper(), price))
+        async for message in websocket:
+            server.received.append(message)
+
+    return ReplayServer(ws_handler=handler), paths
+
+
+def test_unsubscribe_default_symbol_drops_last_price():
+    client = BinanceClient(None, symbols=["BTCUSDC", "ETHUSDC"])
+    client._on_message(None, ticker_frame("BTCUSDC", 106500.0))
+    assert client.get_current_data().price == 106500.0
+
+    client.unsubscribe(["BTCUSDC"])
+
+    assert client.get_current_data().price == 0.0
+    assert client.get_current_data("BTCUSDC") is None
+    # 已取消的交易对的消息不再更新任何数据
+    client._on_message(None, ticker_frame("BTCUSDC", 1.0))
+    assert client.get_current_data().price == 0.0
+
+    client.subscribe(["BTCUSDC"])
+    client._on_message(None, ticker_frame("BTCUSDC", 106600.0))
+    assert client.get_current_data().price == 106600.0
+    assert client.get_current_data() is client.get_current_data("BTCUSDC")
+
+
+def test_no_streams_stays_idle_until_subscribe(engine):
+    server, paths = stream_server(106500.0)
+    prices = []
+    with server:
+        client = BinanceClient(lambda data: prices.append((data.symbol, data.price)),
+                               symbols=["BTCUSDC"], ws_base_url=server.ws_url)
+        client.unsubscribe(["BTCUSDC"])
+        client.start(engine)
+        try:
+            time.sleep(0.2)
+            assert paths == []
+
+            client.subscribe(["ETHUSDC"])
+            assert wait_until(lambda: prices == [("ETHUSDC", 106500.0)])
+            assert paths == ["/stream?streams=ethusdc@ticker"]
+        finally:
+            client.stop()
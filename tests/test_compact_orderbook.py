@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+紧凑订单簿: 按值比较，copy/deepcopy/pickle经__reduce__重建，LevelView按下标/切片生成档位，与OrderBook接口一致；
+订单簿、档位视图和档位对象构建后都不能修改
+"""
+
+import copy
+import pickle
+from dataclasses import FrozenInstanceError
+from datetime import datetime
+
+import pytest
+
+from data.models import CompactOrderBook, OrderBook, OrderBookLevel, OrderType
+
+TIMESTAMP = datetime(2026, 10, 17, 8, 0, 0)
+ASKS = [(101.0, 1.0), (102.0, 2.0), (103.0, 3.0)]
+BIDS = [(100.0, 1.5), (99.0, 2.5)]
+
+
+@pytest.fixture
+def book():
+    return CompactOrderBook.from_pairs(ASKS, BIDS, TIMESTAMP)
+
+
+def test_equality_by_value(book):
+    same = CompactOrderBook.from_rows([[101.0, 1.0, 1.0], [102.0, 2.0, 3.0], [103.0, 3.0, 6.0]],
+                                      [[100.0, 1.5, 1.5], [99.0, 2.5, 4.0]], TIMESTAMP)
+
+    assert book == same and hash(book) == hash(same)
+    assert book != CompactOrderBook.from_pairs(ASKS, [(100.0, 1.6), (99.0, 2.5)], TIMESTAMP)
+    assert book != CompactOrderBook.from_pairs(ASKS, BIDS, datetime(2026, 10, 17, 8, 0, 1))
+    # 价格相同但买卖方向不同的单侧不相等
+    assert CompactOrderBook.from_pairs(BIDS, [], TIMESTAMP).asks != CompactOrderBook.from_pairs([], BIDS, TIMESTAMP).bids
+    assert book != book.to_orderbook()
+
+
+@pytest.mark.parametrize("clone", [copy.copy, copy.deepcopy, lambda book: pickle.loads(pickle.dumps(book))])
+def test_copy_and_pickle_rebuild(book, clone):
+    restored = clone(book)
+
+    assert restored == book
+    assert restored.asks.pairs() == book.asks.pairs()
+    assert (restored.best_bid, restored.best_ask, restored.mid_price, restored.spread, restored.spread_percent) == \
+        (book.best_bid, book.best_ask, book.mid_price, book.spread, book.spread_percent)
+    with pytest.raises(FrozenInstanceError):
+        restored.best_bid = 0.0
+
+
+def test_level_view_indexing(book):
+    asks = book.asks
+
+    assert len(asks) == 3
+    assert asks[0] == OrderBookLevel(price=101.0, size=1.0, total_size=1.0, order_type=OrderType.ASK)
+    assert asks[-1] == asks[2] == OrderBookLevel(price=103.0, size=3.0, total_size=6.0, order_type=OrderType.ASK)
+    assert asks[-3] == asks[0]
+    for index in (3, -4):
+        with pytest.raises(IndexError):
+            asks[index]
+    assert book.bids[1].order_type is OrderType.BID
+
+
+def test_level_view_slices(book):
+    asks = book.asks
+
+    assert [level.price for level in asks[1:]] == [102.0, 103.0]
+    assert [level.price for level in asks[::-1]] == [103.0, 102.0, 101.0]
+    assert [level.price for level in asks[:-1:2]] == [101.0]
+    assert asks[5:] == []
+    assert list(asks) == asks[:]
+
+
+def test_level_view_pairs_and_best_price(book):
+    assert book.asks.pairs() == tuple(ASKS)
+    assert book.asks.pairs(2) == tuple(ASKS[:2])
+    assert book.bids.pairs(0) == ()
+    assert book.bids.best_price == 100.0
+    assert CompactOrderBook.from_pairs([], [], TIMESTAMP).asks.best_price is None
+
+
+def test_derived_prices(book):
+    assert (book.best_bid, book.best_ask, book.mid_price, book.spread) == (100.0, 101.0, 100.5, 1.0)
+
+    one_sided = CompactOrderBook.from_pairs(ASKS, [], TIMESTAMP)
+    assert one_sided.best_bid is None and one_sided.mid_price is None and one_sided.spread is None
+
+
+def test_to_orderbook_matches(book):
+    orderbook = book.to_orderbook()
+
+    assert isinstance(orderbook, OrderBook)
+    assert list(orderbook.asks) == list(book.asks) and list(orderbook.bids) == list(book.bids)
+    assert (orderbook.best_bid, orderbook.best_ask, orderbook.mid_price, orderbook.spread,
+            orderbook.spread_percent, orderbook.timestamp) == \
+        (book.best_bid, book.best_ask, book.mid_price, book.spread, book.spread_percent, book.timestamp)
+
+
+def test_book_is_frozen(book):
+    with pytest.raises(FrozenInstanceError):
+        book.asks = book.bids
+    with pytest.raises(FrozenInstanceError):
+        del book.timestamp
+
+
+def test_levels_are_frozen(book):
+    level = book.asks[0]
+
+    with pytest.raises(FrozenInstanceError):
+        level.size = 0.0
+    with pytest.raises(FrozenInstanceError):
+        book.to_orderbook().bids[0].price = 0.0
+    assert hash(level) == hash(book.asks[0])
+
+
+def test_level_view_is_read_only(book):
+    view = book.asks
+
+    assert view.data.readonly
+    assert view.data.tolist() == [101.0, 1.0, 1.0, 102.0, 2.0, 3.0, 103.0, 3.0, 6.0]
+    with pytest.raises(TypeError):
+        view.data[1] = 0.0
+    for name in ("order_type", "_data", "data", "extra"):
+        with pytest.raises(FrozenInstanceError):
+            setattr(view, name, None)
+    with pytest.raises(FrozenInstanceError):
+        del view.order_type
+
+    assert view.pairs() == tuple(ASKS) and view.order_type is OrderType.ASK
+
+
+def test_level_view_pickle_round_trip(book):
+    restored = pickle.loads(pickle.dumps(book.bids))
+
+    assert restored == book.bids and restored.order_type is OrderType.BID
+    assert restored.data.readonly
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+深度订单簿客户端: REST快照 + 增量重放，以及丢失增量后的重新同步
+"""
+
+import json
+
+import pytest
+
+from benchmarks.replay_server import backpack_depth_server, binance_depth_server
+from core import backpack_depth_client, binance_depth_client
+from core.backpack_client import BackpackClient
+from core.backpack_depth_client import BackpackDepthClient
+from core.binance_depth_client import BinanceDepthClient
+from core.depth_book import LocalOrderBook
+from tests.conftest import wait_until
+
+
+def binance_events(frames):
+    return [json.loads(frame) for frame in frames]
+
+
+def backpack_events(frames):
+    return [json.loads(frame)['data'] for frame in frames]
+
+
+def replay_offline(snapshot, events, include_last_id):
+    """从快照开始按顺序应用全部增量，得到期望的最终订单簿"""
+    book = LocalOrderBook()
+    book.load_snapshot(snapshot['bids'], snapshot['asks'], int(snapshot['lastUpdateId']))
+    for event in events:
+        if event['u'] > book.last_update_id or (include_last_id and event['u'] == book.last_update_id):
+            book.apply(event['b'], event['a'])
+            book.last_update_id = event['u']
+    return book
+
+
+def final_snapshot(book):
+    """把本地订单簿做成REST快照，模拟缺口后重新拉取到的较新深度"""
+    return {
+        'lastUpdateId': book.last_update_id,
+        'bids': [[str(price), str(size)] for price, size in book.bids.top(len(book.bids))],
+        'asks': [[str(price), str(size)] for price, size in book.asks.top(len(book.asks))],
+    }
+
+
+class SnapshotRoute:
+    """第一次返回录制的快照，之后返回较新的快照，并记录请求次数"""
+
+    def __init__(self, first, later):
+        self.responses = [first, later]
+        self.calls = 0
+
+    def __call__(self, query):
+        self.calls += 1
+        return self.responses[min(self.calls, 2) - 1]
+
+
+def assert_same_book(orderbook, expected, depth):
+    reference = expected.to_orderbook(depth)
+    assert orderbook.asks.pairs() == reference.asks.pairs()
+    assert orderbook.bids.pairs() == reference.bids.pairs()
+
+
+@pytest.fixture(autouse=True)
+def no_snapshot_throttle(monkeypatch):
+    monkeypatch.setattr(binance_depth_client, 'SNAPSHOT_MIN_INTERVAL', 0)
+    monkeypatch.setattr(backpack_depth_client, 'SNAPSHOT_MIN_INTERVAL', 0)
+
+
+def start_binance(server, engine):
+    client = BinanceDepthClient(None, ws_base_url=server.ws_url, rest_base_url=server.http_url)
+    client.start(engine)
+    return client
+
+
+def start_backpack(server, engine):
+    client = BackpackClient(lambda data: None, ws_url=server.ws_url)
+    depth_client = BackpackDepthClient(client, None, rest_base_url=server.http_url)
+    depth_client.start()
+    client.start(engine)
+    return client, depth_client
+
+
+def test_binance_depth_matches_offline_replay(engine):
+    server = binance_depth_server(frame_interval=0.002)
+    events = binance_events(server.ws_frames)
+    expected = replay_offline(server.http_routes['/fapi/v1/depth'], events, include_last_id=True)
+
+    with server:
+        client = start_binance(server, engine)
+        try:
+            assert wait_until(lambda: client.book.last_update_id == events[-1]['u'])
+            assert client.resync_count == 0
+            assert_same_book(client.get_current_orderbook(), expected, client.depth)
+        finally:
+            client.stop()
+
+
+def test_binance_gap_triggers_resync(engine):
+    server = binance_depth_server(frame_interval=0.002)
+    events = binance_events(server.ws_frames)
+    snapshot = server.http_routes['/fapi/v1/depth']
+    expected = replay_offline(snapshot, events, include_last_id=True)
+
+    # 快照本身不触发回调，从倒数第二条增量的状态截取，让最后一条增量在新快照之上应用
+    later = final_snapshot(replay_offline(snapshot, events[:-1], include_last_id=True))
+    route = SnapshotRoute(snapshot, later)
+    server.http_routes['/fapi/v1/depth'] = route
+    server.ws_frames = server.ws_frames[:100] + server.ws_frames[101:]
+
+    with server:
+        client = start_binance(server, engine)
+        try:
+            assert wait_until(lambda: client.synced and client.book.last_update_id == events[-1]['u'])
+            assert client.resync_count >= 1
+            assert route.calls >= 2
+            assert_same_book(client.get_current_orderbook(), expected, client.depth)
+        finally:
+            client.stop()
+
+
+def test_backpack_depth_matches_offline_replay(engine):
+    server = backpack_depth_server(frame_interval=0.002)
+    events = backpack_events(server.ws_frames)
+    expected = replay_offline(server.http_routes['/api/v1/depth'], events, include_last_id=False)
+
+    with server:
+        client, depth_client = start_backpack(server, engine)
+        try:
+            assert wait_until(lambda: depth_client.book.last_update_id == events[-1]['u'])
+            assert depth_client.resync_count == 0
+            assert_same_book(depth_client.get_current_orderbook(), expected, depth_client.depth)
+        finally:
+            depth_client.stop()
+            client.stop()
+
+
+def test_backpack_gap_triggers_resync(engine):
+    server = backpack_depth_server(frame_interval=0.002)
+    events = backpack_events(server.ws_frames)
+    snapshot = server.http_routes['/api/v1/depth']
+    expected = replay_offline(snapshot, events, include_last_id=False)
+
+    # Backpack在下一条增量到达时才拉取快照，同样从倒数第二条增量的状态截取
+    later = final_snapshot(replay_offline(snapshot, events[:-1], include_last_id=False))
+    route = SnapshotRoute(snapshot, later)
+    server.http_routes['/api/v1/depth'] = route
+    server.ws_frames = server.ws_frames[:100] + server.ws_frames[101:]
+
+    with server:
+        client, depth_client = start_backpack(server, engine)
+        try:
+            assert wait_until(lambda: depth_client.synced and depth_client.book.last_update_id == events[-1]['u'])
+            assert depth_client.resync_count >= 1
+            assert route.calls >= 2
+            assert_same_book(depth_client.get_current_orderbook(), expected, depth_client.depth)
+        finally:
+            depth_client.stop()
+            client.stop()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+html抓取方式: 工作进程中解析订单簿HTML的结果与逐元素的parse_orderbook_from_page一致
+"""
+
+import pytest
+
+from benchmarks.replay_server import load_lighter_snapshots
+from core.html_orderbook_parser import (LXML_AVAILABLE, ORDERBOOK_HTML_JS, HtmlOrderBookParser,
+                                        extract_orderbook_levels, parse_orderbook_html, parse_orderbook_via_html)
+from core.orderbook_utils import parse_orderbook_from_page
+from tests.page_snapshot import load_page
+
+SNAPSHOTS = load_lighter_snapshots()
+ENGINES = ["regex"] + (["lxml"] if LXML_AVAILABLE else [])
+
+
+def rows(side):
+    return [[level.price, level.size, level.total_size] for level in side]
+
+
+def row(side, index, price, size, total):
+    return (f'<div data-testid="ob-{side}-{index}"><span data-testid="price">{price}</span>'
+            f'<span data-testid="size">{size}</span><span data-testid="total-size">{total}</span></div>')
+
+
+def containers(asks, bids):
+    return (f'<div data-testid="orderbook-asks">{"".join(asks)}</div>'
+            f'<div data-testid="orderbook-bids">{"".join(bids)}</div>')
+
+
+@pytest.fixture(scope="module")
+def worker_parser():
+    parser = HtmlOrderBookParser(workers=1, engine="regex")
+    yield parser
+    parser.close()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("name", sorted(SNAPSHOTS))
+def test_matches_dom_parser(name, engine):
+    page_html = SNAPSHOTS[name]["html"]
+    orderbook = parse_orderbook_html(page_html, engine=engine)
+    reference = parse_orderbook_from_page(load_page(page_html))
+
+    assert rows(orderbook.asks) == rows(reference.asks)
+    assert rows(orderbook.bids) == rows(reference.bids)
+    assert (orderbook.best_bid, orderbook.best_ask, orderbook.spread) == \
+        (reference.best_bid, reference.best_ask, reference.spread)
+
+
+@pytest.mark.parametrize("name", sorted(SNAPSHOTS))
+def test_worker_process_matches_dom_parser(worker_parser, name):
+    page_html = SNAPSHOTS[name]["html"]
+    orderbook = worker_parser.parse(page_html)
+    reference = parse_orderbook_from_page(load_page(page_html))
+
+    assert rows(orderbook.asks) == rows(reference.asks)
+    assert rows(orderbook.bids) == rows(reference.bids)
+
+
+def test_in_thread_parser_matches_worker(worker_parser):
+    page_html = SNAPSHOTS["btc_depth20"]["html"]
+    parser = HtmlOrderBookParser(workers=0)
+
+    assert parser.executor is None
+    assert parser.submit(page_html).result() == worker_parser.submit(page_html).result()
+
+
+def test_missing_field_does_not_borrow_from_next_row():
+    page_html = containers(
+        ['<div data-testid="ob-ask-0"><span data-testid="price">101</span><span data-testid="size">1</span></div>',
+         row("ask", 1, "102", "2", "3")],
+        [row("bid", 0, "100", "1", "1")],
+    )
+
+    asks, bids = extract_orderbook_levels(page_html, "regex")
+    assert asks == [[102.0, 2.0, 3.0]]
+    assert bids == [[100.0, 1.0, 1.0]]
+
+
+def test_cleans_text_like_dom_parser():
+    page_html = containers([row("ask", 0, "<b>60,123.5</b>", " 0.5 ", "&#48;.5")],
+                           [row("bid", 0, "60,100", "-", "1")])
+    reference = parse_orderbook_from_page(load_page(page_html))
+
+    asks, bids = extract_orderbook_levels(page_html, "regex")
+    # 千分位、空白、内部标签和字符实体与逐元素解析同样处理，无法解析的档位跳过
+    assert asks == [[60123.5, 0.5, 0.5]] == rows(reference.asks)
+    assert bids == [] == rows(reference.bids)
+
+
+def test_rows_outside_containers_are_ignored():
+    page_html = '<div data-testid="orderbook-asks">' + row("ask", 0, "101", "1", "1") + '</div>' + \
+        row("bid", 0, "100", "1", "1")
+
+    assert extract_orderbook_levels(page_html, "regex") == ([[101.0, 1.0, 1.0]], [])
+
+
+class HtmlPage:
+    """run_js按ORDERBOOK_HTML_JS返回保存的HTML"""
+
+    def __init__(self, page_html):
+        self.page_html = page_html
+
+    def run_js(self, script, *args, **kwargs):
+        assert script == ORDERBOOK_HTML_JS
+        return self.page_html
+
+
+def test_parse_orderbook_via_html():
+    parser = HtmlOrderBookParser(workers=0)
+    page_html = SNAPSHOTS["btc_depth50_placeholders"]["html"]
+
+    orderbook = parse_orderbook_via_html(HtmlPage(page_html), parser)
+
+    assert rows(orderbook.asks) == SNAPSHOTS["btc_depth50_placeholders"]["truth"]["asks"]
+    assert parse_orderbook_via_html(HtmlPage(""), parser) is None
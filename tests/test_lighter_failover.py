@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lighter热备: 只转发当前数据源，当前数据源停滞（按最近一次取得订单簿的时间判断）时切换，
+切换前后两个数据源的重复订单簿只转发一次
+"""
+
+import time
+
+import pytest
+
+from core import lighter_manager
+from core.lighter_manager import LighterManager
+from data.models import CompactOrderBook, LighterData
+from tests.conftest import wait_until
+
+
+def book(bid_size):
+    return CompactOrderBook.from_pairs([(101.0, 1.0)], [(100.0, bid_size)])
+
+
+class ClientDouble:
+    """主/备客户端替身: 发布订单簿时更新数据和last_book_time，与真实客户端一致"""
+
+    def __init__(self, start_ok=True):
+        self.data = LighterData()
+        self.last_book_time = 0.0
+        self.on_data_callback = None
+        self.start_ok = start_ok
+        self.stopped = False
+
+    def start(self, url):
+        return self.start_ok
+
+    def stop(self):
+        self.stopped = True
+
+    def publish(self, orderbook):
+        self.last_book_time = time.monotonic()
+        self.data = LighterData(orderbook=orderbook, connected=True)
+        self.on_data_callback(self.data)
+
+    def age(self, seconds):
+        """模拟seconds秒没有取得订单簿"""
+        self.last_book_time = time.monotonic() - seconds
+
+    def get_current_data(self):
+        return self.data
+
+    def is_connected(self):
+        return self.data.connected
+
+
+@pytest.fixture
+def failover(monkeypatch):
+    monkeypatch.setattr(lighter_manager, "LIGHTER_STALE_TIMEOUT", 0.5)
+    monkeypatch.setattr(lighter_manager, "LIGHTER_WATCHDOG_INTERVAL", 0.02)
+
+    managers = []
+
+    def start(primary_ok=True):
+        """以两个替身作为主/备客户端启动热备，返回 (管理器, 主, 备, 转发的数据)"""
+        received = []
+        manager = LighterManager(received.append, standby_type="native")
+        primary, standby = ClientDouble(primary_ok), ClientDouble()
+        manager.client = primary
+
+        def create_client(client_type, callback):
+            standby.on_data_callback = callback
+            return standby
+
+        monkeypatch.setattr(manager, "_create_client", create_client)
+        assert manager.start()
+        managers.append(manager)
+        return manager, primary, standby, received
+
+    yield start
+    for manager in managers:
+        manager.stop()
+
+
+def test_standby_ignored_while_primary_fresh(failover):
+    manager, primary, standby, received = failover()
+
+    primary.publish(book(1.0))
+    standby.publish(book(2.0))
+
+    assert [data.orderbook.bids[0].size for data in received] == [1.0]
+    assert manager.get_failover_stats()["active"] == "primary"
+    assert manager.get_current_data() is primary.data
+
+
+def test_stale_primary_switches_on_standby_data(failover):
+    manager, primary, standby, received = failover()
+    primary.publish(book(1.0))
+    primary.age(5.0)
+
+    standby.publish(book(1.0))  # 与已转发的订单簿相同，切换但不重复转发
+    standby.publish(book(2.0))
+
+    stats = manager.get_failover_stats()
+    assert (stats["active"], stats["switchovers"], stats["duplicates_dropped"]) == ("standby", 1, 1)
+    assert [data.orderbook.bids[0].size for data in received] == [1.0, 2.0]
+    assert stats["primary_age"] >= 5.0 and stats["standby_age"] < 0.5
+
+
+def test_unchanged_book_is_not_stale(failover):
+    manager, primary, standby, received = failover()
+    primary.publish(book(1.0))
+    primary.data.timestamp = primary.data.timestamp.replace(year=2000)  # 订单簿未变化，数据时间戳不前进
+
+    standby.publish(book(2.0))
+
+    # 按last_book_time判断: 主客户端仍在取得订单簿，不切换
+    assert manager.get_failover_stats()["active"] == "primary"
+    assert manager.get_failover_stats()["switchovers"] == 0
+
+
+def test_disconnected_source_has_no_age(failover):
+    manager, primary, standby, received = failover()
+    primary.publish(book(1.0))
+    primary.data.connected = False
+
+    stats = manager.get_failover_stats()
+    assert stats["primary_age"] is None and stats["standby_age"] is None
+
+
+def test_watchdog_switches_back_when_standby_stalls(failover):
+    manager, primary, standby, received = failover()
+    primary.publish(book(1.0))
+    primary.age(5.0)
+    standby.publish(book(2.0))
+    assert manager.active == "standby"
+
+    # 主客户端恢复、热备停滞: 没有新回调时由停滞检测切回
+    primary.last_book_time = time.monotonic()
+    standby.age(5.0)
+    assert wait_until(lambda: manager.active == "primary")
+    assert manager.get_failover_stats()["switchovers"] == 2
+
+
+def test_watchdog_keeps_source_when_both_stale(failover):
+    manager, primary, standby, received = failover()
+    primary.publish(book(1.0))
+    standby.publish(book(1.0))
+    primary.age(5.0)
+    standby.age(5.0)
+
+    time.sleep(0.1)
+    assert manager.active == "primary"
+
+
+def test_failed_primary_starts_on_standby(failover):
+    manager, primary, standby, received = failover(primary_ok=False)
+
+    assert manager.active == "standby"
+    standby.publish(book(1.0))
+    assert len(received) == 1
+
+    manager.stop()
+    assert primary.stopped and standby.stopped
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lighter客户端选择: 浏览器库未安装时自动退回无浏览器的原生WebSocket客户端
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from core import lighter_client, lighter_manager, lighter_selenium_client
+from core.lighter_manager import LighterManager, create_lighter_client
+from core.lighter_ws_client import LighterWSClient
+from data.models import CompactOrderBook, LighterData
+
+
+def test_availability_follows_client_modules():
+    # 客户端模块自己捕获ImportError，管理器不能只凭模块能导入就认为可用
+    assert lighter_manager.DRISSION_AVAILABLE is lighter_client.DRISSION_AVAILABLE
+    assert lighter_manager.SELENIUM_AVAILABLE is lighter_selenium_client.SELENIUM_AVAILABLE
+
+
+@pytest.fixture
+def no_browsers(monkeypatch):
+    monkeypatch.setattr(lighter_manager, "DRISSION_AVAILABLE", False)
+    monkeypatch.setattr(lighter_manager, "SELENIUM_AVAILABLE", False)
+
+
+def test_falls_back_to_native_without_browsers(no_browsers):
+    manager = LighterManager(lambda data: None)
+
+    assert manager.get_client_type() == "Native"
+    assert isinstance(manager.client, LighterWSClient)
+
+
+def test_forced_browser_type_unavailable_uses_auto_selection(no_browsers):
+    manager = create_lighter_client(lambda data: None, force_type="drissionpage", standby_type="")
+
+    assert manager.get_client_type() == "Native"
+
+
+def test_standby_of_unavailable_type_is_not_created(no_browsers):
+    manager = LighterManager(lambda data: None, standby_type="selenium")
+
+    assert manager._create_client("selenium", lambda data: None) is None
+    assert manager._create_client("native", lambda data: None).feed_name == "lighter_standby"
+
+
+def test_diff_callback_reaches_client(no_browsers):
+    on_diff = lambda diff: None
+
+    assert LighterManager(lambda data: None, on_diff_callback=on_diff).client.on_diff_callback is on_diff
+    forced = create_lighter_client(lambda data: None, force_type="native", standby_type="", on_diff_callback=on_diff)
+    assert forced.client.on_diff_callback is on_diff
+
+
+def test_manager_computes_diffs_for_clients_without_them(no_browsers):
+    diffs = []
+    manager = LighterManager(lambda data: None, standby_type="", on_diff_callback=diffs.append)
+    # 不计算差异的客户端（如Selenium）只有数据回调
+    manager.client = SimpleNamespace(on_data_callback=None, start=lambda url: True)
+
+    assert manager.start()
+    ask = [(101.0, 1.0)]
+    for bids in ([(100.0, 1.0)], [(100.0, 1.0)], [(100.0, 2.0)]):
+        manager.client.on_data_callback(LighterData(orderbook=CompactOrderBook.from_pairs(ask, bids)))
+
+    assert [diff.snapshot for diff in diffs] == [True, False]
+    assert diffs[1].bids == [(100.0, 2.0)] and diffs[1].asks == []
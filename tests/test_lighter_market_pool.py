@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lighter多市场标签页池: 每个市场独立抓取和抑制未变化的订单簿，按回收策略刷新、重开或预热替换标签页
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from core import lighter_market_pool
+from core.lighter_market_pool import LighterMarketPool, MarketTab
+from core.html_orderbook_parser import parse_orderbook_via_html
+from core.orderbook_utils import ORDERBOOK_EXTRACT_JS, parse_orderbook_via_js
+from core.tab_recycler import RECYCLE_REFRESH, RECYCLE_WARM, TabRecyclePolicy
+from tests.conftest import wait_until
+
+BOOK_A = [[[101.0, 1.0, 1.0]], [[100.0, 2.0, 2.0]]]
+BOOK_B = [[[101.0, 1.5, 1.5]], [[100.0, 2.0, 2.0]]]
+
+
+class FakeTab:
+    """按顺序返回预设的订单簿抓取结果（用完后重复最后一个），记录刷新和关闭"""
+
+    def __init__(self, *frames, js_heap_mb=50.0):
+        self.frames = list(frames)
+        self.js_heap_mb = js_heap_mb
+        self.refreshes = 0
+        self.closed = False
+        self.driver = SimpleNamespace(set_callback=lambda *args: None)
+
+    def run_js(self, script, *args, **kwargs):
+        if script != ORDERBOOK_EXTRACT_JS:
+            return None
+        return self.frames.pop(0) if len(self.frames) > 1 else self.frames[0]
+
+    def run_cdp(self, method, **kwargs):
+        if method == 'Performance.getMetrics':
+            return {"metrics": [{"name": "JSHeapUsedSize", "value": self.js_heap_mb * 1024 * 1024},
+                                {"name": "Nodes", "value": 1000}]}
+        return {}
+
+    def refresh(self):
+        self.refreshes += 1
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    """new_tab依次返回预设的标签页，用完后返回与最后一个内容相同的新标签页"""
+
+    def __init__(self, *tabs):
+        self.tabs = list(tabs)
+        self.last = tabs[-1]
+
+    def new_tab(self, *args, **kwargs):
+        return self.tabs.pop(0) if self.tabs else FakeTab(*self.last.frames)
+
+
+@pytest.fixture(autouse=True)
+def fast_pool(monkeypatch):
+    monkeypatch.setattr(lighter_market_pool, "SCRAPE_INTERVAL", 0.01)
+    monkeypatch.setattr(lighter_market_pool, "BROWSER_WAIT_TIME", 1.0)
+    monkeypatch.setattr(lighter_market_pool, "TAB_METRICS_INTERVAL", 0)
+
+
+# 只测试给定的回收条件，其余条件关闭
+def only(**limits):
+    policy = dict(max_age=0, max_scrapes=0, max_failures=0, max_js_heap_mb=0, max_dom_nodes=0,
+                  max_rss_mb=0, max_latency_drift=0)
+    policy.update(limits)
+    return TabRecyclePolicy(**policy)
+
+
+def run_pool(pool, tabs, browser=None):
+    """不启动浏览器，把预设标签页挂到池中并启动抓取线程"""
+    pool.browser = browser
+    pool.running = True
+    for symbol, tab in tabs.items():
+        market = MarketTab(pool, symbol, pool.url_template.format(symbol=symbol))
+        market.tab = tab
+        pool.tabs[symbol] = market
+    for market in pool.tabs.values():
+        market.start()
+    return pool
+
+
+def stop_pool(pool):
+    pool.browser = None
+    pool.stop()
+
+
+def test_markets_publish_changes_independently():
+    received = []
+    pool = LighterMarketPool(lambda data: received.append((data.symbol, data.orderbook.asks[0].size)),
+                             symbols=["BTC", "ETH"], recycle_policy=only())
+    run_pool(pool, {"BTC": FakeTab(BOOK_A, BOOK_A, BOOK_B), "ETH": FakeTab(BOOK_B)})
+    try:
+        assert wait_until(lambda: pool.get_stats()["BTC"]["suppressed"] >= 3
+                          and pool.get_stats()["ETH"]["suppressed"] >= 3)
+
+        assert [size for symbol, size in received if symbol == "BTC"] == [1.0, 1.5]
+        assert [size for symbol, size in received if symbol == "ETH"] == [1.5]
+        assert pool.get_current_data("ETH").orderbook.asks[0].size == 1.5
+        assert pool.get_current_data() is pool.tabs["BTC"].data
+        assert pool.get_current_data("SOL") is None
+        assert pool.is_connected()
+        assert pool.get_stats()["BTC"]["published"] == 2
+    finally:
+        stop_pool(pool)
+
+    assert not pool.is_connected()
+
+
+def test_consecutive_failures_reopen_tab():
+    received = []
+    replacement = FakeTab(BOOK_A)
+    pool = LighterMarketPool(lambda data: received.append(data.symbol), symbols=["BTC"],
+                             recycle_policy=only(max_failures=2, action=RECYCLE_WARM))
+    stale = FakeTab([[], []])
+    run_pool(pool, {"BTC": stale}, browser=FakeBrowser(replacement))
+    try:
+        assert wait_until(lambda: received == ["BTC"])
+
+        market = pool.tabs["BTC"]
+        # 连续失败总是同步重开，而不是按策略的预热替换
+        assert stale.closed and market.tab is replacement
+        assert market.state.recycle_count == 1
+        assert "连续2次抓取失败" in market.state.last_recycle_reason
+        assert market.data.connected
+    finally:
+        stop_pool(pool)
+
+
+def test_heap_budget_refreshes_and_republishes_same_book():
+    received = []
+    tab = FakeTab(BOOK_A, js_heap_mb=300.0)
+    pool = LighterMarketPool(lambda data: received.append(data.symbol), symbols=["BTC"],
+                             recycle_policy=only(max_js_heap_mb=200, action=RECYCLE_REFRESH))
+
+    def refresh():
+        tab.refreshes += 1
+        tab.js_heap_mb = 50.0
+
+    tab.refresh = refresh
+    run_pool(pool, {"BTC": tab})
+    try:
+        assert wait_until(lambda: len(received) == 2)
+
+        market = pool.tabs["BTC"]
+        assert tab.refreshes == 1
+        assert market.state.last_recycle_reason.startswith("JS堆300MB")
+        # 刷新后页面内容相同也重新发布全量，连接状态随之恢复
+        assert market.data.connected
+    finally:
+        stop_pool(pool)
+
+
+def test_warm_replace_switches_after_ready_and_closes_old_tab():
+    received = []
+    replacement = FakeTab(BOOK_B)
+    pool = LighterMarketPool(lambda data: received.append(data.orderbook.asks[0].size), symbols=["BTC"],
+                             recycle_policy=only(max_scrapes=3, action=RECYCLE_WARM))
+    old = FakeTab(BOOK_A)
+    run_pool(pool, {"BTC": old}, browser=FakeBrowser(replacement))
+    try:
+        assert wait_until(lambda: old.closed and received[-1:] == [1.5])
+
+        market = pool.tabs["BTC"]
+        assert market.tab is not old
+        assert market.state.recycle_count >= 1
+        assert market.data.connected
+    finally:
+        stop_pool(pool)
+
+
+def test_scrape_mode_selects_parser():
+    assert LighterMarketPool(None, scrape_mode="html").parse_orderbook is parse_orderbook_via_html
+    assert LighterMarketPool(None, scrape_mode="js").parse_orderbook is parse_orderbook_via_js
+
+
+@pytest.mark.skipif(lighter_market_pool.DRISSION_AVAILABLE, reason="已安装DrissionPage")
+def test_start_without_drissionpage():
+    pool = LighterMarketPool(None)
+
+    assert pool.start() is False
+    assert not pool.running and pool.tabs == {}
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lighter浏览器客户端的发布路径: network模式下抓取线程和CDP事件线程并发发布时，
+变化检测的计数不丢失，逐档差异按检测顺序回调且与同一次回调的订单簿对应；
+切换标签页、刷新后重新发布全量差异
+"""
+
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from core.lighter_client import LighterClient
+from core.orderbook_diff import diff_side
+from data.models import CompactOrderBook
+
+
+def book(index):
+    """第index份订单簿，相邻两份的买一数量不同"""
+    return CompactOrderBook.from_pairs([(101.0, 1.0), (102.0, 2.0)], [(100.0, 1.0 + index % 7), (99.0, 2.0)])
+
+
+@pytest.fixture
+def fast_switching():
+    """缩短线程切换间隔，放大并发发布时的竞争"""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_concurrent_publish_is_serialized(fast_switching):
+    published = []  # (回调时的订单簿, 差异)
+
+    def on_data(data):
+        time.sleep(0)  # 回调中让出线程，检测与回调之间不加锁时其它线程会插入
+
+    client = LighterClient(on_data, on_diff_callback=lambda diff: published.append((client.data.orderbook, diff)))
+    barrier = threading.Barrier(4)
+
+    def publisher(offset):
+        barrier.wait()
+        for index in range(offset, 2000, 4):
+            client._publish_orderbook(book(index))
+
+    threads = [threading.Thread(target=publisher, args=(offset,)) for offset in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = client.get_change_stats()
+    assert stats["published"] + stats["suppressed"] == 2000
+    assert len(published) == stats["published"]
+
+    # 每份差异都是相对上一次回调的订单簿计算的，并与本次回调的订单簿对应
+    for (previous, _), (current, diff) in zip(published, published[1:]):
+        assert diff.bids == diff_side(previous.bids.pairs(), current.bids.pairs())
+
+
+class FakeTab:
+    def __init__(self):
+        self.set = SimpleNamespace(activate=lambda: None)
+        self.closed = self.refreshed = False
+
+    def close(self):
+        self.closed = True
+
+    def refresh(self):
+        self.refreshed = True
+
+    def run_js(self, script, *args, **kwargs):
+        return None
+
+
+@pytest.mark.parametrize("recycle", ["swap", "refresh"])
+def test_recycled_page_republishes_snapshot(recycle, monkeypatch):
+    diffs = []
+    client = LighterClient(None, on_diff_callback=diffs.append)
+    client.tab, client.url = FakeTab(), "https://app.lighter.xyz/trade/BTC"
+    client._publish_orderbook(book(0))
+    client._publish_orderbook(book(0))
+
+    if recycle == "swap":
+        old = client.tab
+        client._swap_tab(FakeTab())
+        assert old.closed
+    else:
+        monkeypatch.setattr(client, "_wait_ready", lambda since: None)
+        monkeypatch.setattr(client, "_check_page_loaded", lambda: True)
+        client._refresh_page()
+        assert client.tab.refreshed
+    client._publish_orderbook(book(0))
+
+    # 页面内容相同也重新发布全量，差异消费者可以从新页面重建订单簿
+    assert [diff.snapshot for diff in diffs] == [True, True]
+    assert client.get_change_stats() == {"published": 2, "suppressed": 1}
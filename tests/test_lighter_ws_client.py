@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lighter原生客户端: 对本地模拟的 /stream 重放录制的order_book消息
+"""
+
+import json
+
+import pytest
+
+from benchmarks.replay_server import lighter_server
+from core.lighter_ws_client import LighterWSClient
+from core.lighter_ws_decoder import LighterOrderBookDecoder
+from core.orderbook_diff import OrderBookChangeDetector
+from tests.conftest import wait_until
+
+
+def offline_result(frames):
+    """不经过网络逐条解码，得到期望的最后一份订单簿和发布/抑制计数"""
+    decoder = LighterOrderBookDecoder(1)
+    detector = OrderBookChangeDetector()
+    last = None
+    for frame in frames:
+        orderbook = decoder.decode(frame)
+        if orderbook is not None and orderbook.asks and orderbook.bids:
+            detector.update(orderbook)
+            last = orderbook
+    return last, detector.get_stats()
+
+
+@pytest.fixture
+def server():
+    server = lighter_server(frame_interval=0.002)
+    yield server
+    server.stop()
+
+
+def run_client(server, engine, diffs=None):
+    books = []
+    client = LighterWSClient(books.append, ws_url=f"{server.ws_url}/stream",
+                             on_diff_callback=diffs.append if diffs is not None else None)
+    client.start(engine=engine)
+    return client, books
+
+
+def test_decodes_stream_and_counts_suppressed(server, engine):
+    expected_book, expected_stats = offline_result(server.ws_frames)
+    server.start()
+    client, books = run_client(server, engine)
+    try:
+        assert wait_until(lambda: client.decoder.updates == len(server.ws_frames) - 1)
+        assert client.get_change_stats() == {**expected_stats, "resyncs": 0}
+        assert len(books) == expected_stats["published"]
+        assert expected_stats["suppressed"] > 0
+
+        orderbook = client.get_current_data().orderbook
+        assert orderbook.asks.pairs() == expected_book.asks.pairs()
+        assert orderbook.bids.pairs() == expected_book.bids.pairs()
+        assert orderbook.best_bid < orderbook.best_ask
+    finally:
+        client.stop()
+
+    subscribe = json.loads(server.received[0])
+    assert subscribe == {"type": "subscribe", "channel": "order_book/1"}
+
+
+def test_gap_resubscribes_for_new_snapshot(server, engine):
+    server.ws_frames = server.ws_frames[:50] + server.ws_frames[51:]  # 丢失一条增量
+    server.start()
+    diffs = []
+    client, books = run_client(server, engine, diffs)
+    try:
+        assert wait_until(lambda: client.decoder.snapshots == 2)
+        # 重新订阅后的第一份订单簿作为全量差异发布，差异消费者据此重建
+        assert wait_until(lambda: [diff.snapshot for diff in diffs].count(True) == 2)
+        assert client.decoder.gaps == 1
+        assert client.get_change_stats()["resyncs"] == 1
+        assert client.decoder.synced
+        # 缺口之后的增量在新的全量到达前都不应用
+        assert client.decoder.updates == 49
+    finally:
+        client.stop()
+
+    messages = [json.loads(message)["type"] for message in server.received]
+    assert messages == ["subscribe", "unsubscribe", "subscribe"]
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+异步日志: 按键限流和采样、结构化字段、队列处理器与输出线程的装配
+"""
+
+import io
+import logging
+import queue
+import threading
+
+import pytest
+
+from core import logger as log_module
+from core.logger import (NonBlockingQueueHandler, RateLimitFilter, StructuredFormatter, get_logger, log_extra,
+                         setup_logging, shutdown_logging)
+
+
+def make_record(created, **extra):
+    record = logging.LogRecord("watchs.test", logging.INFO, __file__, 1, "消息", None, None)
+    record.created = created
+    for name, value in extra.items():
+        setattr(record, name, value)
+    return record
+
+
+def test_rate_limit_by_key_and_counts_suppressed():
+    rate_filter = RateLimitFilter(default_interval=10)
+    extra = log_extra(key="binance.error")
+
+    assert rate_filter.filter(make_record(100.0, **extra))
+    assert not rate_filter.filter(make_record(105.0, **extra))
+    assert not rate_filter.filter(make_record(109.0, **extra))
+    # 其它键和无键的日志不受影响
+    assert rate_filter.filter(make_record(106.0, **log_extra(key="backpack.error")))
+    assert rate_filter.filter(make_record(106.0))
+
+    record = make_record(111.0, **extra)
+    assert rate_filter.filter(record)
+    assert record.suppressed == 2
+
+
+def test_rate_limit_interval_override():
+    rate_filter = RateLimitFilter(default_interval=10)
+    extra = log_extra(key="tick", interval=1)
+
+    assert rate_filter.filter(make_record(100.0, **extra))
+    assert rate_filter.filter(make_record(101.5, **extra))
+
+
+def test_sampling():
+    rate_filter = RateLimitFilter()
+
+    assert not any(rate_filter.filter(make_record(100.0, **log_extra(sample=0))) for _ in range(100))
+    assert all(rate_filter.filter(make_record(100.0, **log_extra(sample=1))) for _ in range(100))
+
+
+def test_rate_limit_is_thread_safe():
+    rate_filter = RateLimitFilter(default_interval=10)
+    extra = log_extra(key="shared")
+    passed = []
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        for _ in range(1000):
+            if rate_filter.filter(make_record(100.0, **extra)):
+                passed.append(1)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(passed) == 1
+    record = make_record(200.0, **extra)
+    assert rate_filter.filter(record)
+    assert record.suppressed == 8 * 1000 - 1
+
+
+def test_structured_formatter_appends_fields_and_suppressed():
+    record = make_record(100.0, **log_extra(key="k", symbol="BTCUSDC", lag=3))
+    record.suppressed = 4
+
+    message = StructuredFormatter("%(message)s").format(record)
+
+    assert message == "消息 | symbol=BTCUSDC lag=3 (已省略4条同类日志)"
+
+
+def test_queue_handler_drops_when_full():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+
+    handler.emit(make_record(100.0))
+    handler.emit(make_record(100.0))
+
+    assert handler.dropped == 1
+
+
+def queue_handlers(root):
+    return [handler for handler in root.handlers if isinstance(handler, NonBlockingQueueHandler)]
+
+
+@pytest.fixture
+def async_logging():
+    setup_logging(level="INFO")
+    yield
+    shutdown_logging()
+
+
+def test_setup_logging_replaces_default_handler(async_logging):
+    root = logging.getLogger(log_module.LOGGER_NAME)
+
+    assert log_module._default_handler not in root.handlers
+    assert queue_handlers(root) == [log_module._queue_handler]
+    # 重复调用不会再装一个处理器
+    setup_logging()
+    assert queue_handlers(root) == [log_module._queue_handler]
+
+    output = io.StringIO()
+    log_module._listener.handlers[0].setStream(output)
+    get_logger("test").info("经过队列 %s", 1, extra=log_extra(symbol="BTC"))
+    # 停止时输出线程处理完队列中剩余的日志
+    shutdown_logging()
+
+    assert "经过队列 1 | symbol=BTC" in output.getvalue()
+
+
+def test_shutdown_restores_default_handler():
+    setup_logging()
+    shutdown_logging()
+
+    root = logging.getLogger(log_module.LOGGER_NAME)
+    assert log_module._default_handler in root.handlers
+    assert queue_handlers(root) == []
+    assert log_module._listener is None
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+单次run_js抓取: 页面内ORDERBOOK_EXTRACT_JS + parse_orderbook_arrays 与逐元素的parse_orderbook_from_page结果一致，
+并与保存的订单簿快照的标准答案一致
+"""
+
+import pytest
+
+from benchmarks.replay_server import load_lighter_snapshots
+from core.orderbook_utils import ORDERBOOK_EXTRACT_JS, parse_orderbook_arrays, parse_orderbook_from_page
+from data.models import OrderType
+from tests.page_snapshot import NODE, load_page, run_page_js
+
+SNAPSHOTS = load_lighter_snapshots()
+
+
+def rows(side):
+    return [[level.price, level.size, level.total_size] for level in side]
+
+
+@pytest.mark.parametrize("name", sorted(SNAPSHOTS))
+def test_dom_parser_matches_truth(name):
+    snapshot = SNAPSHOTS[name]
+    orderbook = parse_orderbook_from_page(load_page(snapshot["html"]))
+
+    assert rows(orderbook.asks) == snapshot["truth"]["asks"]
+    assert rows(orderbook.bids) == snapshot["truth"]["bids"]
+
+
+@pytest.mark.skipif(NODE is None, reason="需要node执行页面内脚本")
+@pytest.mark.parametrize("name", sorted(SNAPSHOTS))
+def test_extract_js_matches_dom_parser(name):
+    page = load_page(SNAPSHOTS[name]["html"])
+    raw_asks, raw_bids = run_page_js(page, ORDERBOOK_EXTRACT_JS)
+
+    orderbook = parse_orderbook_arrays(raw_asks, raw_bids)
+    reference = parse_orderbook_from_page(page)
+
+    assert rows(orderbook.asks) == rows(reference.asks)
+    assert rows(orderbook.bids) == rows(reference.bids)
+    assert (orderbook.best_bid, orderbook.best_ask, orderbook.spread) == \
+        (reference.best_bid, reference.best_ask, reference.spread)
+
+
+@pytest.mark.skipif(NODE is None, reason="需要node执行页面内脚本")
+def test_extract_js_returns_null_for_empty_fields():
+    page = load_page(SNAPSHOTS["btc_depth20_empty_spans"]["html"])
+    raw_asks, raw_bids = run_page_js(page, ORDERBOOK_EXTRACT_JS)
+
+    # 空白字段为null而不是0，整档在Python侧跳过
+    assert [row for row in raw_asks + raw_bids if None in row]
+    assert not [row for row in raw_asks + raw_bids if 0 in row]
+
+
+@pytest.mark.skipif(NODE is None, reason="需要node执行页面内脚本")
+def test_extract_js_without_orderbook_containers():
+    page = load_page("<html><body><div data-testid=\"ob-ask-0\"></div></body></html>")
+
+    assert run_page_js(page, ORDERBOOK_EXTRACT_JS) == [[], []]
+
+
+def test_parse_orderbook_arrays_sorts_and_skips_invalid_rows():
+    orderbook = parse_orderbook_arrays(
+        [[101.0, 1.0, 1.0], [100.5, 2.0, 3.0], [None, 1.0, 4.0]],
+        [[99.0, 1.0, 1.0], [99.5, None, 2.0], [99.8, 3.0, 4.0]],
+    )
+
+    assert rows(orderbook.asks) == [[100.5, 2.0, 3.0], [101.0, 1.0, 1.0]]
+    assert rows(orderbook.bids) == [[99.8, 3.0, 4.0], [99.0, 1.0, 1.0]]
+    assert orderbook.asks[0].order_type is OrderType.ASK
+    assert (orderbook.best_bid, orderbook.best_ask) == (99.8, 100.5)
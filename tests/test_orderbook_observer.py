@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+observer模式: 页面内MutationObserver累计变化，长轮询脚本在变化时返回档位、安静时超时返回[0]、
+容器被替换时返回null；Python侧wait_orderbook_update按返回值区分三种情况
+"""
+
+import time
+
+import pytest
+
+from benchmarks.replay_server import load_lighter_snapshots
+from core.orderbook_utils import ORDERBOOK_OBSERVER_JS, ORDERBOOK_WAIT_JS, wait_orderbook_update
+from tests.page_snapshot import NODE, load_page, run_page_scripts
+
+pytestmark = pytest.mark.skipif(NODE is None, reason="需要node执行页面内脚本")
+
+
+@pytest.fixture
+def page():
+    return load_page(load_lighter_snapshots()["btc_depth20"]["html"])
+
+
+def wait_js(timeout_ms):
+    return ORDERBOOK_WAIT_JS % timeout_ms
+
+
+def test_quiet_book_times_out(page):
+    installed, result = run_page_scripts(page, [ORDERBOOK_OBSERVER_JS, wait_js(50)])
+
+    assert installed is True
+    assert result == [0]
+
+
+def test_change_before_poll_returns_levels(page):
+    _, _, result = run_page_scripts(page, [
+        ORDERBOOK_OBSERVER_JS,
+        "__setText('ob-ask-0', 'size', '9.9'); __setText('ob-ask-0', 'total-size', '9.9');",
+        wait_js(5000),
+    ])
+
+    count, asks, bids = result
+    assert count == 2
+    assert [60123.5, 9.9, 9.9] in asks
+    assert len(asks) == 20 and len(bids) == 20
+
+
+def test_change_during_poll_wakes_waiter(page):
+    started = time.monotonic()
+    _, result = run_page_scripts(page, [
+        ORDERBOOK_OBSERVER_JS,
+        "setTimeout(() => __setText('ob-bid-0', 'price', '60123.4'), 20);\n" + wait_js(10000),
+    ])
+
+    assert result[0] == 1
+    assert time.monotonic() - started < 5
+
+
+def test_reinstall_is_idempotent_and_changes_are_consumed(page):
+    _, again, _, first, second = run_page_scripts(page, [
+        ORDERBOOK_OBSERVER_JS,
+        ORDERBOOK_OBSERVER_JS,
+        "__setText('ob-ask-1', 'size', '1.0');",
+        wait_js(1000),
+        wait_js(50),
+    ])
+
+    assert again is True
+    # 重复安装不会叠加观察器: 一次修改只计一次
+    assert first[0] == 1
+    assert second == [0]
+
+
+def test_detached_container_reports_lost_observer(page):
+    results = run_page_scripts(page, [
+        ORDERBOOK_OBSERVER_JS,
+        "__detach('orderbook-asks');",
+        wait_js(50),
+    ])
+
+    assert results[2] is None
+
+
+def test_observer_not_installed_before_render():
+    page = load_page("<html><body><div id=\"__next\"></div></body></html>")
+
+    assert run_page_scripts(page, [ORDERBOOK_OBSERVER_JS, wait_js(50)]) == [False, None]
+
+
+class ScriptedPage:
+    """按顺序返回预设的run_js结果"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = []
+
+    def run_js(self, script, timeout=None):
+        self.calls.append(timeout)
+        return self.results.pop(0)
+
+
+def test_wait_orderbook_update_results():
+    page = ScriptedPage(None, [0], [3, [[101.0, 1.0, 1.0]], [[100.0, 2.0, 2.0]]])
+
+    assert wait_orderbook_update(page, 2.0) == (False, None)
+    assert wait_orderbook_update(page, 2.0) == (True, None)
+    alive, orderbook = wait_orderbook_update(page, 2.0)
+
+    assert alive
+    assert (orderbook.best_bid, orderbook.best_ask) == (100.0, 101.0)
+    # run_js的超时比页面内的长轮询更长
+    assert all(timeout > 2.0 for timeout in page.calls)
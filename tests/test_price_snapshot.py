@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+BTC价格快照: 不可变、写时复制，读者拿到的版本不受后续更新和客户端原地修改影响
+"""
+
+from dataclasses import FrozenInstanceError, replace
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.update_bus import ConflatingUpdateBus
+from data.models import BackpackData, BinanceData, BTCPriceData
+
+
+def test_snapshot_is_frozen():
+    snapshot = BTCPriceData()
+
+    with pytest.raises(FrozenInstanceError):
+        snapshot.binance = BinanceData()
+
+
+def test_with_update_creates_new_version():
+    first_time = datetime(2026, 1, 1, 8, 0, 0)
+    binance = BinanceData(price=106500.0, timestamp=first_time)
+    first = BTCPriceData(timestamp=first_time).with_update(first_time, binance=binance)
+
+    later = first_time + timedelta(seconds=1)
+    backpack = BackpackData(price=106480.0, timestamp=later)
+    second = first.with_update(later, backpack=backpack)
+
+    assert first.backpack is None and first.timestamp == first_time
+    assert second.binance is binance and second.backpack is backpack
+    assert second.timestamp == later
+    assert first.to_dict()["prices"] == {
+        "binance": {"symbol": "BTCUSDC", "price": 106500.0, "timestamp": first_time.isoformat()}
+    }
+
+
+def test_producer_copy_isolates_snapshot_from_client_mutation():
+    """客户端原地更新自己的数据对象，发布到总线的是replace()生成的副本"""
+    bus = ConflatingUpdateBus()
+    client_data = BinanceData(price=106500.0)
+    bus.publish("binance", replace(client_data))
+    snapshot = BTCPriceData().with_update(datetime.now(), binance=bus.latest("binance"))
+
+    client_data.price = 1.0
+
+    assert snapshot.binance is not client_data
+    assert snapshot.binance.price == 106500.0
+    assert snapshot.to_dict()["prices"]["binance"]["price"] == 106500.0
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+重连监督器: 抖动指数退避、正常关闭立即重连、按连接器区分的统计
+"""
+
+import time
+
+import pytest
+
+from benchmarks.replay_server import ReplayServer
+from core import reconnect_supervisor
+from core.async_engine import WebSocketConnector
+from core.reconnect_supervisor import ReconnectSupervisor
+from tests.conftest import wait_until
+
+
+@pytest.fixture
+def max_jitter(monkeypatch):
+    """抖动取上限，使退避时间可预期"""
+    monkeypatch.setattr(reconnect_supervisor.random, 'uniform', lambda a, b: b)
+
+
+def test_clean_close_reconnects_immediately_once(max_jitter):
+    supervisor = ReconnectSupervisor(base_delay=1, max_delay=30, stable_after=60)
+    supervisor.on_connected("feed")
+
+    assert supervisor.on_disconnected("feed", 1001) == 0.0
+    # 未稳定就再次断开：即使是正常关闭也开始退避
+    supervisor.on_connected("feed")
+    assert supervisor.on_disconnected("feed", 1000) == 2
+
+
+def test_backoff_doubles_up_to_max(max_jitter):
+    supervisor = ReconnectSupervisor(base_delay=1, max_delay=10, stable_after=60)
+
+    delays = [supervisor.on_disconnected("feed", 1011) for _ in range(6)]
+
+    assert delays == [1, 2, 4, 8, 10, 10]
+    assert supervisor.get_stats()["feed"]["consecutive_failures"] == 6
+
+
+def test_backoff_survives_long_outage(max_jitter):
+    supervisor = ReconnectSupervisor(base_delay=0.2, max_delay=30, stable_after=60)
+
+    delays = [supervisor.on_disconnected("feed", None) for _ in range(5000)]
+
+    assert delays[-1] == 30
+    assert supervisor.get_stats()["feed"]["consecutive_failures"] == 5000
+
+
+def test_stable_connection_resets_backoff(max_jitter):
+    supervisor = ReconnectSupervisor(base_delay=1, max_delay=10, stable_after=60)
+    for _ in range(3):
+        supervisor.on_disconnected("feed", None)
+
+    supervisor.on_connected("feed")
+    supervisor.feeds["feed"].connected_at -= 61
+
+    assert supervisor.on_disconnected("feed", 1011) == 1
+
+
+def test_register_separates_connectors_with_same_name():
+    supervisor = ReconnectSupervisor()
+    first, second = object(), object()
+
+    assert supervisor.register("binance", owner=first).name == "binance"
+    assert supervisor.register("binance", owner=second).name == "binance#2"
+    assert supervisor.register("binance", owner=first).name == "binance"
+    assert set(supervisor.get_stats()) == {"binance", "binance#2"}
+
+
+class IdleConnector(WebSocketConnector):
+    """不处理消息的最小连接器"""
+
+    exchange_name = "测试"
+    feed_name = "test"
+
+    def _on_message(self, ws, message):
+        pass
+
+
+def closing_server(code):
+    """每个连接建立后立即以指定关闭码断开，并记录连接时间"""
+    connects = []
+
+    async def handler(server, websocket):
+        connects.append(time.monotonic())
+        await websocket.close(code=code)
+
+    return ReplayServer(ws_handler=handler), connects
+
+
+def run_until_connects(engine, code, count):
+    server, connects = closing_server(code)
+    engine.supervisor = ReconnectSupervisor(base_delay=0.2, max_delay=1, stable_after=60)
+    with server:
+        connector = IdleConnector(server.ws_url)
+        connector.start(engine)
+        try:
+            assert wait_until(lambda: len(connects) >= count)
+        finally:
+            connector.stop()
+    gaps = [later - earlier for earlier, later in zip(connects, connects[1:])]
+    return connector, gaps
+
+
+def test_going_away_reconnects_without_delay(engine, max_jitter):
+    connector, gaps = run_until_connects(engine, 1001, 3)
+
+    assert gaps[0] < 0.15
+    assert gaps[1] >= 0.35
+    stats = engine.supervisor.get_stats()[connector.feed_key]
+    assert stats["last_close_code"] == 1001
+    assert stats["reconnect_count"] >= 2
+
+
+def test_error_close_backs_off(engine, max_jitter):
+    connector, gaps = run_until_connects(engine, 1011, 3)
+
+    assert 0.15 <= gaps[0] < 0.35
+    assert 0.35 <= gaps[1] < 0.6
+    assert engine.supervisor.get_stats()[connector.feed_key]["last_close_code"] == 1011
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+标签页回收策略: 各项资源预算、存活时间、抓取次数和连续失败的阈值，回收动作，以及回收后的重新计数
+"""
+
+import time
+
+import pytest
+
+from core.lighter_client import LighterClient
+from core.tab_recycler import (LATENCY_BASELINE_SAMPLES, RECYCLE_REFRESH, RECYCLE_REOPEN, RECYCLE_WARM,
+                               TabRecyclePolicy, TabState)
+from config import PAGE_REFRESH_INTERVAL
+
+DISABLED = dict(max_age=0, max_scrapes=0, max_failures=0, max_js_heap_mb=0, max_dom_nodes=0,
+                max_rss_mb=0, max_latency_drift=0)
+
+
+def only(**limits):
+    """只启用给定条件的策略"""
+    return TabRecyclePolicy(**{**DISABLED, **limits})
+
+
+def drifted_state(baseline, recent, samples):
+    """前LATENCY_BASELINE_SAMPLES次耗时为baseline，之后samples次为recent"""
+    state = TabState()
+    for _ in range(LATENCY_BASELINE_SAMPLES):
+        state.record_scrape(True, baseline)
+    for _ in range(samples):
+        state.record_scrape(True, recent)
+    return state
+
+
+def test_fresh_tab_is_not_recycled():
+    assert TabRecyclePolicy().check(TabState()) is None
+    assert TabRecyclePolicy().max_age == PAGE_REFRESH_INTERVAL
+
+
+@pytest.mark.parametrize("limit, metrics, reason", [
+    ({"max_js_heap_mb": 512}, {"js_heap_mb": 512.0}, "JS堆512MB超过512MB"),
+    ({"max_dom_nodes": 50000}, {"dom_nodes": 50000}, "DOM节点50000超过50000"),
+    ({"max_rss_mb": 1500}, {"rss_mb": 1500.0}, "进程内存1500MB超过1500MB"),
+])
+def test_resource_budget_thresholds(limit, metrics, reason):
+    state = TabState()
+    policy = only(**limit)
+    below = {name: value - 1 for name, value in metrics.items()}  # 达到阈值即回收
+
+    state.record_metrics(**below)
+    assert policy.check(state) is None
+    state.record_metrics(**metrics)
+    assert policy.check(state) == reason
+    # 0表示不按该项回收
+    assert only().check(state) is None
+
+
+def test_unsampled_metrics_keep_previous_values():
+    state = TabState()
+    state.record_metrics(js_heap_mb=100.0, dom_nodes=2000)
+    state.record_metrics(rss_mb=300.0)
+
+    assert (state.js_heap_mb, state.dom_nodes, state.rss_mb) == (100.0, 2000, 300.0)
+
+
+def test_latency_drift_needs_baseline():
+    state = TabState()
+    for _ in range(LATENCY_BASELINE_SAMPLES):
+        state.record_scrape(True, 0.01)
+    assert state.latency_drift() is None
+
+    state.record_scrape(True, 0.01)
+    assert state.latency_drift() == pytest.approx(1.0)
+
+
+def test_latency_drift_threshold():
+    policy = only(max_latency_drift=3.0)
+
+    assert policy.check(drifted_state(0.01, 0.02, 100)) is None
+    assert policy.check(drifted_state(0.01, 0.05, 100)) == "抓取耗时为基线的5.0倍"
+
+
+def test_failed_scrapes_do_not_move_latency():
+    state = drifted_state(0.01, 0.01, 5)
+    state.record_scrape(False, 10.0)
+
+    assert state.latency_drift() == pytest.approx(1.0)
+    assert state.consecutive_failures == 1
+
+
+def test_age_and_scrape_count_thresholds():
+    state = TabState()
+    state.opened_at -= 3601
+    assert only(max_age=3600).check(state) == "运行超过3600秒"
+
+    state = TabState()
+    for _ in range(9):
+        state.record_scrape(True)
+    assert only(max_scrapes=10).check(state) is None
+    state.record_scrape(True)
+    assert only(max_scrapes=10).check(state) == "抓取超过10次"
+
+
+def test_consecutive_failures_reopen_and_reset_on_success():
+    policy = only(max_failures=3, max_js_heap_mb=512, action=RECYCLE_WARM)
+    state = TabState()
+    state.record_metrics(js_heap_mb=600.0)
+    for _ in range(2):
+        state.record_scrape(False)
+    assert policy.action_for(state) == RECYCLE_WARM
+
+    state.record_scrape(False)
+    # 连续失败优先于资源预算，且总是重开
+    assert policy.check(state) == "连续3次抓取失败"
+    assert policy.action_for(state) == RECYCLE_REOPEN
+
+    state.record_scrape(True)
+    assert state.consecutive_failures == 0
+    assert policy.action_for(state) == RECYCLE_WARM
+
+
+def test_policy_action_for_other_reasons():
+    state = TabState()
+    state.record_metrics(dom_nodes=60000)
+
+    assert only(max_dom_nodes=50000, action=RECYCLE_REFRESH).action_for(state) == RECYCLE_REFRESH
+
+
+def test_recycle_resets_counters():
+    state = drifted_state(0.01, 0.05, 30)
+    state.record_metrics(js_heap_mb=600.0, dom_nodes=60000, rss_mb=2000.0)
+    state.record_scrape(False)
+    state.record_ready(1.5)
+    state.opened_at -= 100
+
+    state.record_recycle("JS堆600MB超过512MB")
+
+    assert TabRecyclePolicy().check(state) is None
+    assert (state.scrapes, state.consecutive_failures, state.recycle_count) == (0, 0, 1)
+    assert state.last_recycle_reason == "JS堆600MB超过512MB"
+    assert state.ready_time is None and state.latency_drift() is None
+    assert time.monotonic() - state.opened_at < 1
+    stats = state.to_dict()
+    assert (stats["js_heap_mb"], stats["dom_nodes"], stats["rss_mb"]) == (None, None, None)
+
+
+def test_record_ready_measures_from_open():
+    state = TabState()
+    state.opened_at -= 2.0
+    state.record_ready()
+
+    assert 2.0 <= state.ready_time < 3.0
+    state.record_ready(0.25)
+    assert state.to_dict()["ready_time"] == 0.25
+
+
+def test_browser_client_policy():
+    client = LighterClient(None, refresh_interval=1800)
+
+    # 单页面客户端的连续失败由抓取循环重连处理，存活时间按refresh_interval兜底
+    assert client.recycle_policy.max_failures == 0
+    assert client.recycle_policy.max_age == 1800
+    assert LighterClient(None).recycle_policy.max_age == PAGE_REFRESH_INTERVAL
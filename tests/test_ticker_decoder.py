@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ticker解码器: 快速提取与完整JSON解析的结果一致，非常规消息回退到完整解析
+"""
+
+import json
+
+import pytest
+
+from benchmarks.replay_server import load_fixture_frames
+from core.ticker_decoder import FastTickerDecoder, JsonTickerDecoder, TickerFields, get_ticker_decoder
+
+FRAMES = load_fixture_frames('ticker_frames.jsonl')
+
+
+@pytest.mark.parametrize("name", ["fast", "orjson", "json"])
+def test_decoders_match_json_on_recorded_frames(name):
+    reference = JsonTickerDecoder()
+    decoder = get_ticker_decoder(name)
+
+    for frame in FRAMES:
+        assert decoder.decode(frame) == reference.decode(frame), frame
+
+
+def test_fast_decoder_accepts_bytes():
+    decoder = FastTickerDecoder()
+    frame = FRAMES[0]
+
+    assert decoder.decode(frame.encode('utf-8')) == decoder.decode(frame)
+
+
+def test_fast_decoder_reads_book_ticker_quotes_only():
+    frame = next(frame for frame in FRAMES if '"bookTicker"' in frame)
+    fields = FastTickerDecoder().decode(frame)
+
+    assert fields.price is None
+    assert fields.bid < fields.ask
+    assert fields.stream.startswith("bookTicker.")
+
+
+@pytest.mark.parametrize("message", [
+    json.dumps(json.loads(FRAMES[0]), indent=1),      # 带空格的JSON
+    json.dumps(json.loads(FRAMES[1]), separators=(", ", ": ")),
+    '{"result": null, "id": 1}',                       # 订阅应答
+])
+def test_fast_decoder_falls_back_on_unusual_frames(message):
+    assert FastTickerDecoder().decode(message) == JsonTickerDecoder().decode(message)
+
+
+def test_subscription_reply_has_no_fields():
+    assert FastTickerDecoder().decode('{"result":null,"id":1}') == TickerFields()
+
+
+def test_unknown_decoder_name():
+    with pytest.raises(ValueError):
+        get_ticker_decoder("simdjson")
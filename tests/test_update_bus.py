@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+合并更新总线: 槽位合并、按数据源过滤、消费者的最小处理间隔和发布唤醒
+"""
+
+import threading
+import time
+
+from core.update_bus import ConflatingUpdateBus
+from tests.conftest import wait_until
+
+
+def test_drain_delivers_only_latest_value_per_feed():
+    bus = ConflatingUpdateBus()
+    received = []
+    consumer = bus.subscribe("test", lambda feed, value: received.append((feed, value)), interval=0)
+
+    for price in range(100):
+        bus.publish("binance", price)
+    bus.publish("backpack", -1)
+
+    assert consumer.drain() == 2
+    assert sorted(received) == [("backpack", -1), ("binance", 99)]
+    # 没有新发布时不重复处理
+    assert consumer.drain() == 0
+    assert bus.get_stats() == {"published": {"binance": 100, "backpack": 1}, "consumers": {"test": 2}}
+
+
+def test_consumer_feed_filter():
+    bus = ConflatingUpdateBus()
+    received = []
+    consumer = bus.subscribe("lighter-only", lambda feed, value: received.append(feed), interval=0,
+                             feeds=["lighter"])
+
+    bus.publish("binance", 1)
+    bus.publish("lighter", 2)
+
+    assert consumer.drain() == 1
+    assert received == ["lighter"]
+
+
+def test_immediate_consumer_wakes_on_publish():
+    bus = ConflatingUpdateBus()
+    received = []
+    bus.subscribe("push", lambda feed, value: received.append(value), interval=0)
+    bus.start()
+    try:
+        bus.publish("binance", 1)
+        assert wait_until(lambda: received == [1], timeout=1)
+        bus.publish("binance", 2)
+        assert wait_until(lambda: received == [1, 2], timeout=1)
+    finally:
+        bus.stop()
+
+
+def test_interval_consumer_conflates_bursts():
+    bus = ConflatingUpdateBus()
+    received = []
+    bus.subscribe("recorder", lambda feed, value: received.append(value), interval=0.3)
+    bus.start()
+    try:
+        bus.publish("binance", 0)
+        assert wait_until(lambda: received == [0], timeout=1)
+        # 间隔期内的发布合并为一次处理，只取最新值
+        for price in range(1, 50):
+            bus.publish("binance", price)
+        time.sleep(0.1)
+        assert received == [0]
+        assert wait_until(lambda: received == [0, 49], timeout=1)
+    finally:
+        bus.stop()
+
+
+def test_stop_wakes_idle_consumer_and_drains_last_update():
+    bus = ConflatingUpdateBus()
+    received = []
+    consumer = bus.subscribe("slow", lambda feed, value: received.append(value), interval=60)
+    bus.start()
+
+    bus.publish("binance", 1)
+    assert wait_until(lambda: received == [1], timeout=1)
+    bus.publish("binance", 2)
+
+    started = time.monotonic()
+    bus.stop()
+    assert time.monotonic() - started < 1
+    assert not consumer.thread.is_alive()
+    assert received == [1, 2]
+
+
+def test_wait_for_publish_returns_new_version():
+    bus = ConflatingUpdateBus()
+    threading.Timer(0.05, bus.publish, args=("binance", 1)).start()
+
+    assert bus.wait_for_publish(0, timeout=2) == 1
+    # 已经看到的版本且无新发布时等到超时
+    assert bus.wait_for_publish(1, timeout=0.05) == 1